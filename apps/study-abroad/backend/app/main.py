@@ -2,14 +2,26 @@
 Study Abroad FastAPI Application
 Main entry point for the backend API server.
 """
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.database import close_db, warm_up_db
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm the database pool on startup and dispose it on shutdown"""
+    await warm_up_db()
+    yield
+    await close_db()
+
 
 app = FastAPI(
     title="Study Abroad API",
     description="Backend API for Study Abroad RAG Application",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # CORS configuration
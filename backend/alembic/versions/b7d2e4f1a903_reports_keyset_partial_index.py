@@ -0,0 +1,57 @@
+"""reports_keyset_partial_index
+
+Add a composite partial index backing keyset pagination of a user's
+active reports (newest first).
+
+Indexes:
+- idx_reports_user_created_active: (user_id, created_at DESC, report_id DESC)
+  WHERE status <> 'expired'
+
+report_id is the keyset tie-breaker, so including it lets every page be
+served as a single index range scan regardless of depth.
+
+Revision ID: b7d2e4f1a903
+Revises: 6f815ac9ca51
+Create Date: 2026-10-19 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d2e4f1a903'
+down_revision: Union[str, Sequence[str], None] = '6f815ac9ca51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Built CONCURRENTLY so the reports table stays writable during the build.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_reports_user_created_active',
+            'reports',
+            ['user_id', sa.text('created_at DESC'), sa.text('report_id DESC')],
+            unique=False,
+            postgresql_where=sa.text("status <> 'expired'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'idx_reports_user_created_active',
+            table_name='reports',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,104 @@
+"""retention_and_payments_indexes
+
+Composite indexes matching the filter and sort columns of the
+retention jobs and payment history queries. They were chosen from the
+queries' WHERE/ORDER BY clauses, not from measured plans; confirm them
+with scripts/index_advisor.py against a seeded database.
+
+Indexes:
+- idx_reports_status_expires_at: (status, expires_at)
+  Serves expire_old_reports and delete_expired_reports (status filter +
+  expires_at range), which otherwise scan all reports nightly.
+- idx_payments_user_id_created_at: (user_id, created_at DESC)
+  Serves PaymentRepository.find_by_user (newest first) without a sort.
+
+Each supersedes a single-column index on its leading column
+(idx_reports_status, idx_payments_user_id), which are dropped.
+
+Revision ID: d41c8a6e2f57
+Revises: b7d2e4f1a903
+Create Date: 2026-10-19 14:03:27.530912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd41c8a6e2f57'
+down_revision: Union[str, Sequence[str], None] = 'b7d2e4f1a903'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """
+    Upgrade schema.
+
+    Built CONCURRENTLY so the tables stay writable during the build; the
+    old indexes are dropped only once their replacements exist.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_reports_status_expires_at',
+            'reports',
+            ['status', 'expires_at'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_payments_user_id_created_at',
+            'payments',
+            ['user_id', sa.text('created_at DESC')],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_reports_status',
+            table_name='reports',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'idx_payments_user_id',
+            table_name='payments',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'idx_reports_status',
+            'reports',
+            ['status'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.create_index(
+            'idx_payments_user_id',
+            'payments',
+            ['user_id'],
+            unique=False,
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+        op.drop_index(
+            'idx_reports_status_expires_at',
+            table_name='reports',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
+        op.drop_index(
+            'idx_payments_user_id_created_at',
+            table_name='payments',
+            postgresql_concurrently=True,
+            if_exists=True,
+        )
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Middleware Stack Benchmark
+
+Compares the per-request and per-SSE-chunk overhead of:
+
+- layered: the previous stack, a BaseHTTPMiddleware rate limiter plus the
+  correlation-ID and request-logging `@app.middleware("http")` layers
+  (reproduced here, as they were removed from main.py).
+- fused: RequestContextMiddleware (one pure ASGI pass).
+
+Both run the same RateLimiter, correlation context, query tracking,
+identity map and access log events (logs are dropped after the structlog
+context is merged, so formatting and I/O are not measured). Requests are
+driven straight through the ASGI callables, without a server or network.
+
+Usage:
+    PYTHONPATH=.:src python scripts/benchmark_middleware.py --requests 5000 --chunks 200
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import structlog
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from database.identity_map import identity_map
+from database.instrumentation import track_queries
+from logging_lib.correlation import CorrelationContext
+from logging_lib.sanitizer import sanitize_log_data
+from src.middleware.rate_limiter import RateLimiter
+from src.middleware.request_context import RequestContextMiddleware
+
+logger = structlog.get_logger("benchmark")
+
+
+def drop_event(logger, method_name, event_dict):
+    raise structlog.DropEvent
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware limiter"""
+
+    def __init__(self, app, limiter: RateLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request, call_next):
+        identifier = self.limiter.get_identifier(request.scope, dict(request.scope["headers"]))
+        decision = await self.limiter.check(identifier, request.url.path)
+        response = await call_next(request)
+        for name, value in self.limiter.headers(decision):
+            response.headers[name.decode()] = value.decode()
+        return response
+
+
+async def legacy_correlation(request, call_next):
+    correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
+    with CorrelationContext(correlation_id):
+        response = await call_next(request)
+        response.headers["X-Correlation-ID"] = correlation_id
+        return response
+
+
+async def legacy_request_logging(request, call_next):
+    structlog.contextvars.clear_contextvars()
+    structlog.contextvars.bind_contextvars(
+        method=request.method,
+        path=request.url.path,
+        client_host=request.client.host if request.client else None,
+    )
+    start_time = time.time()
+    logger.info("request_started", query_params=sanitize_log_data(dict(request.query_params)))
+    with track_queries(n_plus_one_threshold=0) as queries, identity_map() as entities:
+        response = await call_next(request)
+    structlog.contextvars.bind_contextvars(
+        status_code=response.status_code,
+        duration_ms=round((time.time() - start_time) * 1000, 2),
+        db_queries=queries.count,
+        db_time_ms=round(queries.total_ms, 2),
+        db_identity_hits=entities.hits,
+    )
+    logger.info("request_completed")
+    if "X-Request-ID" not in response.headers:
+        response.headers["X-Request-ID"] = str(uuid.uuid4())
+    return response
+
+
+def build_apps(chunks: int) -> dict[str, Starlette]:
+    async def item(request):
+        return JSONResponse({"id": "report_1", "status": "completed"})
+
+    async def events(request):
+        async def generate():
+            for n in range(chunks):
+                yield f'data: {{"type": "section", "section_num": {n}}}\n\n'
+
+        return StreamingResponse(generate(), media_type="text/event-stream")
+
+    routes = [Route("/reports/item", item), Route("/stream/events", events)]
+    limit = 10**9
+    return {
+        "bare": Starlette(routes=routes),
+        "layered": Starlette(
+            routes=routes,
+            middleware=[
+                # Outermost first, as main.py registered them
+                Middleware(BaseHTTPMiddleware, dispatch=legacy_request_logging),
+                Middleware(BaseHTTPMiddleware, dispatch=legacy_correlation),
+                Middleware(LegacyRateLimitMiddleware, limiter=RateLimiter(limit)),
+            ],
+        ),
+        "fused": Starlette(
+            routes=routes,
+            middleware=[Middleware(RequestContextMiddleware, rate_limiter=RateLimiter(limit))],
+        ),
+    }
+
+
+async def call(app, path: str) -> int:
+    """One request through the ASGI app; returns the number of body messages"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [(b"host", b"bench"), (b"x-user-id", b"user_1")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("bench", 80),
+    }
+    body_messages = 0
+    request_sent = False
+    disconnected = asyncio.Event()
+
+    async def receive():
+        # Like a server: the (empty) body once, then block until the client goes away
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal body_messages
+        if message["type"] == "http.response.body":
+            body_messages += 1
+
+    await app(scope, receive, send)
+    disconnected.set()
+    return body_messages
+
+
+async def time_requests(app, path: str, count: int) -> list[float]:
+    """Wall time per request (microseconds), sampled in batches of 10"""
+    for _ in range(50):
+        await call(app, path)
+    samples = []
+    for _ in range(count // 10):
+        start = time.perf_counter()
+        for _ in range(10):
+            await call(app, path)
+        samples.append((time.perf_counter() - start) / 10 * 1_000_000)
+    return samples
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--streams", type=int, default=200)
+    parser.add_argument("--chunks", type=int, default=200, help="SSE chunks per stream")
+    args = parser.parse_args()
+
+    structlog.configure(processors=[structlog.contextvars.merge_contextvars, drop_event])
+    apps = build_apps(args.chunks)
+
+    request_us = {}
+    stream_us = {}
+    for name, app in apps.items():
+        request_us[name] = statistics.median(
+            await time_requests(app, "/reports/item", args.requests)
+        )
+        stream_us[name] = statistics.median(
+            await time_requests(app, "/stream/events", args.streams)
+        )
+
+    print(f"{'stack':<8} {'request':>10} {'overhead':>10} {'per chunk':>10} {'overhead':>10}")
+    for name in apps:
+        chunk_us = stream_us[name] / args.chunks
+        print(
+            f"{name:<8} {request_us[name]:>8.1f}us "
+            f"{request_us[name] - request_us['bare']:>8.1f}us "
+            f"{chunk_us:>8.2f}us "
+            f"{chunk_us - stream_us['bare'] / args.chunks:>8.2f}us"
+        )
+
+    layered = request_us["layered"] - request_us["bare"]
+    fused = request_us["fused"] - request_us["bare"]
+    layered_chunk = (stream_us["layered"] - stream_us["bare"]) / args.chunks
+    fused_chunk = (stream_us["fused"] - stream_us["bare"]) / args.chunks
+    print(f"request overhead: {layered / fused:.1f}x lower with the fused middleware")
+    print(f"per-chunk overhead: {layered_chunk:.2f}us layered vs {fused_chunk:.2f}us fused")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Pooler Latency Benchmark
+
+Compares direct and pooled (PgBouncer / Supabase pooler) latency for the
+hot repository queries, once per pooler mode.
+
+Usage:
+    PYTHONPATH=src python scripts/benchmark_pooler.py \\
+        --direct postgresql+asyncpg://...@db.<ref>.supabase.co:5432/postgres \\
+        --pooled postgresql+asyncpg://...@aws-0-<region>.pooler.supabase.com:6543/postgres \\
+        --iterations 500
+
+The database must contain at least one report. Each target/mode pair is
+warmed up first, then every query is timed for --iterations rounds and
+p50/p95/p99 latencies (ms) are printed.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections.abc import Awaitable, Callable
+
+from sqlalchemy import select
+
+from database.adapters.supabase import SupabaseAdapter
+from database.engines import engine_registry
+from database.models.report import Report
+from database.pooler import PoolerMode
+from database.repositories import ReportRepository
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of unsorted values"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def time_query(
+    query: Callable[[], Awaitable[object]], iterations: int, warmup: int
+) -> list[float]:
+    """Run `query` and return per-call latencies in milliseconds"""
+    for _ in range(warmup):
+        await query()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await query()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+async def bench_target(label: str, url: str, mode: PoolerMode, iterations: int, warmup: int) -> None:
+    """Benchmark the hot repository queries against one URL in one pooler mode"""
+    adapter = SupabaseAdapter(url, service_role_key="benchmark", pooler_mode=mode)
+    repo = ReportRepository(adapter)
+
+    async with await adapter.get_session() as session:
+        sample = (await session.execute(select(Report.report_id, Report.user_id).limit(1))).first()
+    if sample is None:
+        print("No reports found; seed the database first", file=sys.stderr)
+        sys.exit(1)
+    report_id, user_id = str(sample.report_id), str(sample.user_id)
+
+    queries = {
+        "find_by_id": lambda: repo.find_by_id(report_id),
+        "list_summaries_by_user": lambda: repo.list_summaries_by_user(user_id, limit=20),
+        "list_summary_page_by_user": lambda: repo.list_summary_page_by_user(user_id, limit=20),
+        "find_many_by_ids": lambda: repo.find_many_by_ids([report_id]),
+    }
+
+    for name, query in queries.items():
+        latencies = await time_query(query, iterations, warmup)
+        print(
+            f"{label:<8} {mode.value:<21} {name:<27} "
+            f"p50={percentile(latencies, 50):7.2f} "
+            f"p95={percentile(latencies, 95):7.2f} "
+            f"p99={percentile(latencies, 99):7.2f} "
+            f"mean={statistics.fmean(latencies):7.2f}"
+        )
+
+    await adapter.close()
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--direct", help="Direct database URL")
+    parser.add_argument("--pooled", help="Pooler URL (transaction mode)")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument(
+        "--pooled-modes",
+        nargs="+",
+        default=[PoolerMode.TRANSACTION.value, PoolerMode.TRANSACTION_PREPARED.value],
+        choices=[mode.value for mode in PoolerMode if mode is not PoolerMode.AUTO],
+        help="Pooler modes to try against --pooled",
+    )
+    args = parser.parse_args()
+
+    if not (args.direct or args.pooled):
+        parser.error("pass --direct and/or --pooled")
+
+    if args.direct:
+        await bench_target("direct", args.direct, PoolerMode.DIRECT, args.iterations, args.warmup)
+    if args.pooled:
+        for mode in args.pooled_modes:
+            await bench_target("pooled", args.pooled, PoolerMode(mode), args.iterations, args.warmup)
+
+    await engine_registry.dispose_all()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter Bucket Storage Benchmark
+
+Charges one request each from many distinct client IPs (the worst case
+for bucket storage) and reports the per-request cost, how it grows with
+the number of buckets, and memory per bucket:
+
+- legacy: plain dict of unslotted buckets, with the previous full-dict
+  cleanup scan after every allowed request once 1000+ buckets exist
+  (reproduced here; it is O(n) per request, so it runs on fewer IPs).
+- lru: InMemoryBackend, buckets in last-access order with amortised O(1)
+  expiry of refilled buckets (cap out of reach).
+- lru-cap: InMemoryBackend at 1 request/min, where buckets stay partial
+  long enough that the --max-buckets LRU cap bounds memory.
+
+Usage:
+    PYTHONPATH=.:src python scripts/benchmark_rate_limiter.py --ips 1000000 --legacy-ips 5000
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import tracemalloc
+
+import structlog
+
+from src.middleware.rate_limit_backend import BucketResult, InMemoryBackend, TokenBucket
+
+
+class LegacyTokenBucket:
+    """The previous bucket: instance __dict__, wall-clock time"""
+
+    def __init__(self, capacity: int, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.last_refill = time.time()
+
+    def consume(self, tokens: int = 1) -> bool:
+        now = time.time()
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + (elapsed * self.refill_rate))
+        self.last_refill = now
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+
+class LegacyBackend:
+    """The previous storage: dict, cleanup scanning every bucket"""
+
+    def __init__(self, capacity: int, refill_rate: float):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.buckets: dict[str, LegacyTokenBucket] = {}
+
+    async def consume(self, identifier: str, tokens: int = 1) -> BucketResult:
+        if identifier not in self.buckets:
+            self.buckets[identifier] = LegacyTokenBucket(self.capacity, self.refill_rate)
+        bucket = self.buckets[identifier]
+        if bucket.consume(tokens):
+            self._cleanup_old_buckets()
+            return BucketResult(allowed=True, remaining=int(bucket.tokens))
+        return BucketResult(allowed=False, remaining=0)
+
+    def _cleanup_old_buckets(self):
+        if len(self.buckets) < 1000:
+            return
+        now = time.time()
+        to_remove = [
+            identifier
+            for identifier, bucket in self.buckets.items()
+            if bucket.tokens >= bucket.capacity and now - bucket.last_refill > 600
+        ]
+        for identifier in to_remove:
+            del self.buckets[identifier]
+
+
+def client_ips(count: int) -> list[str]:
+    return [f"ip:10.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}" for n in range(count)]
+
+
+async def run(backend, ips: list[str]) -> dict:
+    """One request per IP; per-request cost overall and over the last 10%"""
+    tail_from = len(ips) - len(ips) // 10
+    peak = 0
+    start = time.perf_counter()
+    for ips_done, identifier in enumerate(ips):
+        if ips_done == tail_from:
+            tail_start = time.perf_counter()
+        await backend.consume(identifier)
+        if ips_done % 1000 == 0:
+            peak = max(peak, len(backend.buckets))
+    end = time.perf_counter()
+    return {
+        "per_request_us": (end - start) / len(ips) * 1_000_000,
+        "tail_per_request_us": (end - tail_start) / (len(ips) - tail_from) * 1_000_000,
+        "peak_buckets": max(peak, len(backend.buckets)),
+        "evicted": getattr(backend, "evicted", 0),
+    }
+
+
+def bytes_per_bucket(bucket_class, count: int = 100_000) -> float:
+    tracemalloc.start()
+    buckets = [bucket_class(100, 100 / 60.0) for _ in range(count)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del buckets
+    return size / count
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--ips", type=int, default=1_000_000)
+    parser.add_argument("--legacy-ips", type=int, default=5000)
+    parser.add_argument("--max-buckets", type=int, default=100_000)
+    args = parser.parse_args()
+
+    # Cap warnings are expected here
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.ERROR))
+    ips = client_ips(args.ips)
+    runs = {
+        # 100/min: a bucket charged once is full again after 0.6s
+        "legacy": (LegacyBackend(100, 100 / 60.0), ips[: args.legacy_ips]),
+        # No effective cap: expiry alone bounds the buckets kept
+        "lru": (InMemoryBackend(100, 100 / 60.0, max_buckets=args.ips), ips),
+        # 1/min: buckets stay partial for a minute, so the cap does the work
+        "lru-cap": (InMemoryBackend(1, 1 / 60.0, max_buckets=args.max_buckets), ips),
+    }
+
+    print(f"{'storage':<8} {'ips':>9} {'us/req':>8} {'last 10%':>9} {'peak':>9} {'evicted':>9}")
+    for name, (backend, sample) in runs.items():
+        result = await run(backend, sample)
+        print(
+            f"{name:<8} {len(sample):>9} {result['per_request_us']:>8.2f} "
+            f"{result['tail_per_request_us']:>9.2f} {result['peak_buckets']:>9} "
+            f"{result['evicted']:>9}"
+        )
+
+    print(
+        f"bytes per bucket: {bytes_per_bucket(LegacyTokenBucket):.0f} legacy, "
+        f"{bytes_per_bucket(TokenBucket):.0f} slotted"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Report Read Path Benchmark
+
+Compares CPU per GET /reports/{id} read for:
+
+- validated: decode the Supabase response (content as JSON objects),
+  build Report(**row) (section and citation validators), then validate
+  and serialize it again as FastAPI's response_model does.
+- trusted: decode the response with content_json as a string and splice
+  it into the body (CachedReport.from_row), no Pydantic models.
+
+Usage:
+    PYTHONPATH=.:src python scripts/benchmark_report_read.py --iterations 2000
+
+No database is needed: both paths start from the same PostgREST-style
+response bytes for a full 10-section report.
+"""
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+
+from pydantic import TypeAdapter
+
+from src.api.models.report import (
+    REQUIRED_SECTIONS,
+    Citation,
+    Report,
+    ReportContent,
+    ReportSection,
+)
+from src.api.services.report_cache import CachedReport
+
+
+def build_content(citations_per_section: int, paragraph_words: int) -> ReportContent:
+    """A valid report of realistic size"""
+    now = datetime.now(timezone.utc)
+    paragraph = " ".join(["word"] * paragraph_words)
+    sections = [
+        ReportSection(
+            heading=heading,
+            content=paragraph,
+            citations=[
+                Citation(
+                    title=f"{heading} source {n}",
+                    url=f"https://example.com/{index}/{n}",
+                    snippet="Snippet of the cited page.",
+                    accessed_at=now,
+                )
+                for n in range(citations_per_section)
+            ],
+        )
+        for index, heading in enumerate(REQUIRED_SECTIONS)
+    ]
+    return ReportContent(
+        query="Studying Computer Science in the UK",
+        summary=paragraph,
+        sections=sections,
+        total_citations=citations_per_section * len(sections),
+        generated_at=now,
+    )
+
+
+def build_payloads(content: ReportContent) -> tuple[bytes, bytes]:
+    """Supabase response bodies for the old (JSONB) and new (content_json) selects"""
+    now = datetime.now(timezone.utc)
+    row = {
+        "id": "7d0f5c9e-8a52-4c55-9a43-0c1e4f1d2b3a",
+        "user_id": "user_2abc",
+        "query": content.query,
+        "status": "completed",
+        "error": None,
+        "expires_at": (now + timedelta(days=30)).isoformat(),
+        "created_at": now.isoformat(),
+        "updated_at": now.isoformat(),
+        "deleted_at": None,
+    }
+    content_json = content.model_dump_json()
+    validated = json.dumps([{**row, "content": json.loads(content_json)}]).encode()
+    trusted = json.dumps([{**row, "content_json": content_json}]).encode()
+    return validated, trusted
+
+
+response_adapter = TypeAdapter(Report)
+
+
+def validated_read(payload: bytes) -> bytes:
+    row = json.loads(payload)[0]
+    report = Report(**row)
+    # FastAPI response_model: validate, dump to JSON-able python, JSONResponse.render
+    content = response_adapter.dump_python(response_adapter.validate_python(report), mode="json")
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def trusted_read(payload: bytes) -> bytes:
+    return CachedReport.from_row(json.loads(payload)[0]).body
+
+
+def cpu_per_read(read: Callable[[bytes], bytes], payload: bytes, iterations: int) -> list[float]:
+    """Process CPU time (microseconds) per read, sampled in batches of 10"""
+    for _ in range(50):
+        read(payload)
+    samples = []
+    for _ in range(iterations // 10):
+        start = time.process_time()
+        for _ in range(10):
+            read(payload)
+        samples.append((time.process_time() - start) / 10 * 1_000_000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--citations", type=int, default=5, help="Citations per section")
+    parser.add_argument("--paragraph-words", type=int, default=250)
+    args = parser.parse_args()
+
+    validated_payload, trusted_payload = build_payloads(
+        build_content(args.citations, args.paragraph_words)
+    )
+    print(f"report body: {len(trusted_read(trusted_payload)):,} bytes")
+
+    results = {}
+    for name, read, payload in (
+        ("validated", validated_read, validated_payload),
+        ("trusted", trusted_read, trusted_payload),
+    ):
+        samples = cpu_per_read(read, payload, args.iterations)
+        results[name] = statistics.median(samples)
+        print(
+            f"{name:<10} cpu/read median={results[name]:8.1f}us "
+            f"mean={statistics.fmean(samples):8.1f}us"
+        )
+
+    print(f"reduction: {results['validated'] / results['trusted']:.1f}x less CPU per read")
+
+
+if __name__ == "__main__":
+    main()
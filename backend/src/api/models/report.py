@@ -129,6 +129,35 @@ class Report(BaseModel):
         from_attributes = True
 
 
+class ReportSearchResult(BaseModel):
+    """Full-text search match with a highlighted snippet"""
+
+    id: str
+    query: str
+    status: ReportStatus
+    created_at: datetime
+    expires_at: datetime
+    rank: float
+    # Matching fragments, terms wrapped in <mark></mark>
+    snippet: str = ""
+
+
+class ReportSectionSummary(BaseModel):
+    """Section entry in a report's sections index (no body or citations)"""
+
+    section_num: int
+    heading: str
+    citation_count: int
+
+
+class ReportSectionsIndex(BaseModel):
+    """Headings and citation counts of a report's sections"""
+
+    report_id: str
+    status: ReportStatus
+    sections: List[ReportSectionSummary] = []
+
+
 class CreateReportRequest(BaseModel):
     """Request to create a new report"""
 
@@ -5,7 +5,7 @@ Comprehensive health checks for all services (database, AI, payments).
 """
 
 from datetime import datetime
-from typing import Dict
+from typing import Any, Dict
 from fastapi import APIRouter, Request, Depends
 from pydantic import BaseModel
 import structlog
@@ -14,7 +14,9 @@ from dependencies import get_config, get_feature_flags, get_db
 from config.environment import EnvironmentConfig
 from feature_flags.evaluator import FeatureFlagEvaluator
 from feature_flags.types import Feature
+from database.telemetry import PRESSURE_THRESHOLD
 from database.types import DatabaseAdapter
+from src.middleware.stream_limiter import StreamLimiter
 
 router = APIRouter()
 logger = structlog.get_logger()
@@ -26,6 +28,7 @@ class ServiceStatus(BaseModel):
     status: str  # "up", "down", "degraded", "disabled"
     message: str | None = None
     response_time_ms: float | None = None
+    details: Dict[str, Any] | None = None
 
 
 class HealthResponse(BaseModel):
@@ -40,7 +43,11 @@ class HealthResponse(BaseModel):
 
 async def check_database_health(db: DatabaseAdapter) -> ServiceStatus:
     """
-    Check database connectivity and response time
+    Check database connectivity, response time and pool pressure
+
+    Runs a cached SELECT 1 probe and reports the pool snapshot. A pool
+    near capacity reports "degraded" before requests start timing out
+    on checkout.
 
     Args:
         db: Database adapter
@@ -48,21 +55,39 @@ async def check_database_health(db: DatabaseAdapter) -> ServiceStatus:
     Returns:
         Service status with connection info
     """
-    import time
-
     try:
-        start_time = time.time()
-
-        # Simple connectivity check (will depend on adapter implementation)
-        # For now, we'll assume if adapter is available, it's connected
-        # TODO: Implement actual ping/health check in adapters
+        probe = await db.ping()
+        stats = db.pool_stats()
+        details = {"probe_cached": probe.cached}
+        if stats is not None:
+            details["pool"] = stats.to_dict()
+
+        if not probe.ok:
+            logger.error("database_probe_failed", error=probe.error)
+            return ServiceStatus(
+                status="down",
+                message=f"Database error: {probe.error}",
+                details=details,
+            )
 
-        response_time_ms = (time.time() - start_time) * 1000
+        if stats is not None and stats.utilization >= PRESSURE_THRESHOLD:
+            logger.warning(
+                "database_pool_pressure",
+                utilization=stats.utilization,
+                checked_out=stats.checked_out,
+            )
+            return ServiceStatus(
+                status="degraded",
+                message=f"Connection pool {stats.utilization:.0%} in use",
+                response_time_ms=probe.rtt_ms,
+                details=details,
+            )
 
         return ServiceStatus(
             status="up",
             message="Database connected",
-            response_time_ms=round(response_time_ms, 2),
+            response_time_ms=probe.rtt_ms,
+            details=details,
         )
     except Exception as e:
         logger.error("database_health_check_failed", error=str(e))
@@ -146,6 +171,33 @@ async def check_payments_health(
         )
 
 
+def check_streams_health(stream_limiter: StreamLimiter | None) -> ServiceStatus:
+    """
+    Report open SSE streams against the worker's caps
+
+    Args:
+        stream_limiter: The app's stream limiter (None when disabled)
+
+    Returns:
+        Service status with active-stream gauges
+    """
+    if stream_limiter is None:
+        return ServiceStatus(status="disabled", message="Stream limits disabled")
+
+    stats = stream_limiter.stats()
+    if stats.utilization >= PRESSURE_THRESHOLD:
+        return ServiceStatus(
+            status="degraded",
+            message=f"{stats.active}/{stats.max_concurrent} stream slots in use",
+            details=stats.to_dict(),
+        )
+    return ServiceStatus(
+        status="up",
+        message=f"{stats.active} streams open",
+        details=stats.to_dict(),
+    )
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check(
     request: Request,
@@ -159,6 +211,7 @@ async def health_check(
     - Database connectivity and response time
     - AI service availability (Gemini API)
     - Payment service availability (Stripe)
+    - Open SSE streams (active-stream gauges)
 
     Returns:
         Health status with service details
@@ -185,6 +238,9 @@ async def health_check(
     # Payments check
     services["payments"] = await check_payments_health(config, feature_flags)
 
+    # Open SSE streams
+    services["streams"] = check_streams_health(getattr(request.app.state, "stream_limiter", None))
+
     # Determine overall status
     service_statuses = [s.status for s in services.values()]
 
@@ -5,21 +5,32 @@ Handles report creation, generation, and retrieval
 Integrates with dependency injection for database, logging, and feature flags.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Request
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Request, Response
+from typing import List, Optional
+import json
 import structlog
 
 from api.models.report import (
     CreateReportRequest,
     CreateReportResponse,
+    REQUIRED_SECTIONS,
     Report,
     ReportListItem,
+    ReportSearchResult,
+    ReportSection,
+    ReportSectionsIndex,
 )
 from api.services.auth_service import get_current_user_id
+from api.services.report_cache import CachedReport, accepts_gzip, etag_matches
 from api.services.report_service import (
     create_report,
-    get_report,
+    get_cached_report,
+    get_report_document,
+    get_report_section,
+    get_report_sections_index,
     list_user_reports,
+    report_quota,
+    search_user_reports,
     soft_delete_report,
 )
 from api.services.payment_service import create_checkout_session
@@ -30,6 +41,7 @@ from dependencies import (
     get_correlation_id,
 )
 from database.types import DatabaseAdapter
+from database.pagination import InvalidCursorError, encode_cursor
 from feature_flags.evaluator import FeatureFlagEvaluator
 from feature_flags.types import Feature
 
@@ -51,7 +63,7 @@ async def initiate_report(
     Creates report record and Stripe checkout session
 
     Flow:
-    1. Check feature flags (payments enabled/disabled)
+    1. Check feature flags (payments enabled/disabled) and the daily report quota
     2. Create report with status=pending
     3. Create Stripe payment intent (if payments enabled)
     4. Return payment details to frontend
@@ -64,9 +76,28 @@ async def initiate_report(
         query_length=len(request_data.query),
     )
 
+    # Rolling 24h cap on report creation, before anything reaches Gemini
+    quota_enforced = feature_flags.is_enabled(Feature.RATE_LIMITING)
+    if quota_enforced:
+        quota = await report_quota.acquire(user_id)
+        if not quota.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=(
+                    f"Daily report limit reached ({quota.limit} per 24 hours). "
+                    f"Please retry after {quota.retry_after} seconds."
+                ),
+                headers={"Retry-After": str(quota.retry_after)},
+            )
+
     try:
         # Create report record
-        report_response = await create_report(user_id, request_data.query)
+        try:
+            report_response = await create_report(user_id, request_data.query)
+        except Exception:
+            if quota_enforced:
+                report_quota.release(quota.reservation)
+            raise
 
         logger.info(
             "report_created",
@@ -121,9 +152,55 @@ async def initiate_report(
         raise HTTPException(status_code=500, detail=f"Failed to initiate report: {str(e)}")
 
 
+def _cached_report_response(
+    document: CachedReport, if_none_match: Optional[str], accept_encoding: Optional[str] = None
+) -> Response:
+    """
+    200 with the pre-serialized body, or 304 if the client already has it
+
+    Clients accepting gzip get the precompressed body as-is (no
+    per-request compression). Each encoding has its own strong ETag; a
+    client holding either one is up to date.
+    """
+    use_gzip = document.body_gzip is not None and accepts_gzip(accept_encoding)
+    etag = document.gzip_etag if use_gzip else document.etag
+    # Clients revalidate every time (cheap 304) so deletions are seen immediately
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+
+    for current in (etag, document.etag, document.gzip_etag):
+        if etag_matches(if_none_match, current):
+            headers["ETag"] = current
+            return Response(status_code=304, headers=headers)
+
+    if use_gzip:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=document.body_gzip, media_type="application/json", headers=headers)
+    return Response(content=document.body, media_type="application/json", headers=headers)
+
+
+@router.get("/search", response_model=List[ReportSearchResult])
+async def search_reports(
+    q: str = Query(min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    user_id: str = Depends(get_current_user_id),
+    logger: structlog.BoundLogger = Depends(get_request_logger),
+):
+    """
+    Search the authenticated user's reports (best match first)
+
+    Matches the query, section headings, summary and section text.
+    Snippets highlight matching terms with <mark></mark>.
+    Declared before /{report_id} so "search" is not taken as an ID.
+    """
+    results = await search_user_reports(user_id, q, limit)
+    logger.info("reports_searched", user_id=user_id, query_length=len(q), count=len(results))
+    return results
+
+
 @router.get("/{report_id}", response_model=Report)
 async def get_report_by_id(
     report_id: str,
+    request: Request,
     user_id: str = Depends(get_current_user_id),
     db: DatabaseAdapter = Depends(get_db),
     logger: structlog.BoundLogger = Depends(get_request_logger),
@@ -131,32 +208,113 @@ async def get_report_by_id(
     """
     Get report by ID
     Only returns reports owned by the authenticated user
+
+    Completed reports are served from the report cache with a strong ETag
+    (gzip-encoded when the client accepts it); If-None-Match with a
+    current ETag gets 304 without a database query.
+    On a miss the stored JSON is sent as-is (validated when written), so
+    response_model only documents the shape.
     """
     logger.info("fetching_report", report_id=report_id, user_id=user_id)
+    if_none_match = request.headers.get("if-none-match")
+
+    document = await get_cached_report(report_id, user_id)
+    cache = "hit"
+    if document is None:
+        document = await get_report_document(report_id, user_id)
+        cache = "miss"
+
+    if document is None:
+        logger.warning("report_not_found", report_id=report_id, user_id=user_id)
+        raise HTTPException(status_code=404, detail="Report not found")
+
+    logger.info("report_fetched", report_id=report_id, status=document.status, cache=cache)
+    return _cached_report_response(
+        document, if_none_match, request.headers.get("accept-encoding")
+    )
+
 
-    report = await get_report(report_id, user_id)
+@router.get("/{report_id}/sections", response_model=ReportSectionsIndex)
+async def get_report_sections(
+    report_id: str,
+    user_id: str = Depends(get_current_user_id),
+    logger: structlog.BoundLogger = Depends(get_request_logger),
+):
+    """
+    Get the sections index of a report: headings and citation counts only
+
+    Lets clients render the outline first and fetch sections on demand via
+    GET /reports/{report_id}/sections/{section_num}.
+    """
+    index = await get_report_sections_index(report_id, user_id)
 
-    if not report:
+    if index is None:
         logger.warning("report_not_found", report_id=report_id, user_id=user_id)
         raise HTTPException(status_code=404, detail="Report not found")
 
-    logger.info("report_fetched", report_id=report_id, status=report.status)
-    return report
+    logger.info("report_sections_fetched", report_id=report_id, sections=len(index.sections))
+    return index
+
+
+@router.get("/{report_id}/sections/{section_num}", response_model=ReportSection)
+async def get_report_section_by_num(
+    report_id: str,
+    section_num: int = Path(ge=1, le=len(REQUIRED_SECTIONS)),
+    user_id: str = Depends(get_current_user_id),
+    logger: structlog.BoundLogger = Depends(get_request_logger),
+):
+    """
+    Get a single report section (1-based, as in the sections index)
+
+    Only the requested section is read from the database. Content was
+    validated when it was written, so it is sent as stored and
+    response_model only documents the shape.
+    """
+    section = await get_report_section(report_id, user_id, section_num)
+
+    if section is None:
+        logger.warning(
+            "report_section_not_found",
+            report_id=report_id,
+            section_num=section_num,
+            user_id=user_id,
+        )
+        raise HTTPException(status_code=404, detail="Section not found")
+
+    logger.info("report_section_fetched", report_id=report_id, section_num=section_num)
+    return Response(
+        content=json.dumps(section, ensure_ascii=False, separators=(",", ":")),
+        media_type="application/json",
+    )
 
 
 @router.get("/", response_model=List[ReportListItem])
 async def list_reports(
+    response: Response,
     limit: int = 50,
+    cursor: Optional[str] = None,
     user_id: str = Depends(get_current_user_id),
     db: DatabaseAdapter = Depends(get_db),
     logger: structlog.BoundLogger = Depends(get_request_logger),
 ):
     """
-    List all reports for authenticated user
+    List reports for authenticated user (newest first)
+
+    Cursor pagination: when more results may exist, the X-Next-Cursor
+    response header carries an opaque cursor to pass as ?cursor= for the
+    next page.
     """
-    logger.info("listing_reports", user_id=user_id, limit=limit)
+    logger.info("listing_reports", user_id=user_id, limit=limit, paginated=cursor is not None)
+
+    try:
+        reports = await list_user_reports(user_id, limit, cursor)
+    except InvalidCursorError as e:
+        logger.warning("list_reports_invalid_cursor", user_id=user_id)
+        raise HTTPException(status_code=400, detail=str(e))
 
-    reports = await list_user_reports(user_id, limit)
+    if reports and len(reports) >= limit:
+        last = reports[-1]
+        response.headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
 
     logger.info("reports_listed", user_id=user_id, count=len(reports))
     return reports
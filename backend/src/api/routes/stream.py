@@ -7,28 +7,89 @@ Integrates with dependency injection for database, logging, and feature flags.
 
 import json
 import asyncio
-from fastapi import APIRouter, Depends, HTTPException
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
+from starlette.types import Receive, Scope, Send
 import structlog
 
 from api.services.auth_service import get_current_user_id
 from api.services.ai_service import generate_report_stream
-from api.services.report_service import get_report, update_report_status
+from api.services.report_service import get_report_state, update_report_status
 from dependencies import (
     get_db,
     get_request_logger,
 )
 from database.types import DatabaseAdapter
+from src.middleware.stream_limiter import StreamLimiter, StreamSlot
 
 router = APIRouter(prefix="/stream", tags=["Streaming"])
 
 
+def acquire_stream_slot(
+    request: Request,
+    user_id: str = Depends(get_current_user_id),
+) -> Optional[StreamSlot]:
+    """
+    Take one of the authenticated user's concurrent-stream slots
+
+    Keyed by the user ID from the verified token, so a client cannot get
+    more streams by changing headers or IP. The route releases the slot
+    when the stream generator finishes (or when no stream is started).
+
+    Returns:
+        The slot, or None when streams are not capped
+
+    Raises:
+        HTTPException: 429 when the user or this worker has too many streams open
+    """
+    limiter: Optional[StreamLimiter] = getattr(request.app.state, "stream_limiter", None)
+    if limiter is None:
+        return None
+
+    identifier = f"user:{user_id}"
+    rejected = limiter.acquire(identifier)
+    if rejected is not None:
+        raise HTTPException(
+            status_code=429,
+            detail=limiter.exceeded_detail(rejected),
+            headers=limiter.headers(),
+        )
+    return StreamSlot(limiter, identifier)
+
+
+def _release(slot: Optional[StreamSlot]) -> None:
+    if slot is not None:
+        slot.release()
+
+
+class SlotStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that also releases its stream slot when the response ends
+
+    The generator releases the slot when it finishes; a client that
+    disconnects before the first chunk never starts it, so the slot is
+    released here as well (release is idempotent).
+    """
+
+    def __init__(self, *args, slot: Optional[StreamSlot] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.slot = slot
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            _release(self.slot)
+
+
 @router.get("/reports/{report_id}")
 async def stream_report_generation(
     report_id: str,
     user_id: str = Depends(get_current_user_id),
     db: DatabaseAdapter = Depends(get_db),
     logger: structlog.BoundLogger = Depends(get_request_logger),
+    slot: Optional[StreamSlot] = Depends(acquire_stream_slot),
 ):
     """
     Stream report generation progress using Server-Sent Events (SSE)
@@ -43,17 +104,19 @@ async def stream_report_generation(
     - data: {"type": "error", "message": "..."}
 
     Frontend uses EventSource API or Vercel AI SDK to consume stream
+
+    Each user may hold a limited number of streams open at once (429 beyond it).
     """
     try:
         # Verify report exists and user has access
-        report = await get_report(report_id, user_id)
+        report = await get_report_state(report_id, user_id)
         if not report:
             raise HTTPException(status_code=404, detail="Report not found")
 
         # Check if report is ready to generate
-        if report.status not in ["pending", "generating"]:
+        if report["status"] not in ["pending", "generating"]:
             raise HTTPException(
-                status_code=400, detail=f"Report status is '{report.status}', cannot stream"
+                status_code=400, detail=f"Report status is '{report['status']}', cannot stream"
             )
 
         async def event_generator():
@@ -67,7 +130,7 @@ async def stream_report_generation(
 
                 # Stream report generation
                 section_count = 0
-                async for chunk in generate_report_stream(report_id, report.query):
+                async for chunk in generate_report_stream(report_id, report["query"]):
                     chunk_data = json.loads(chunk)
 
                     if chunk_data.get("type") == "section":
@@ -92,7 +155,11 @@ async def stream_report_generation(
                 # Update report status to failed
                 await update_report_status(report_id, "failed", error=str(e))
 
-        return StreamingResponse(
+            finally:
+                # Completed, failed or closed on client disconnect
+                _release(slot)
+
+        return SlotStreamingResponse(
             event_generator(),
             media_type="text/event-stream",
             headers={
@@ -101,10 +168,13 @@ async def stream_report_generation(
                 "X-Accel-Buffering": "no",  # Disable nginx buffering for SSE
                 "Access-Control-Allow-Origin": "*",  # Will be restricted by CORS middleware
             },
+            slot=slot,
         )
 
     except HTTPException:
+        _release(slot)
         raise
     except Exception as e:
+        _release(slot)
         logger.error("stream_setup_error", report_id=report_id, error=str(e))
         raise HTTPException(status_code=500, detail=f"Failed to setup streaming: {str(e)}")
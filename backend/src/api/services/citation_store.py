@@ -0,0 +1,341 @@
+"""
+Normalized citation store
+
+Report content used to embed every citation in full, so a source could
+only be found, re-validated or invalidated by scanning every report. At
+completion, each distinct source is now upserted into the `citations`
+table keyed by the hash of its normalized URL and each citation is linked
+to it through `report_citations`; the queryable JSONB content keeps only
+{"citation_id": ...} references.
+
+- `citations` holds each source once: URL identity, the URL, title and
+  snippet it was first cited with, and verification state. Later
+  reports never overwrite those fields.
+- `report_citations` holds, per position, the citation and accessed_at,
+  plus only the fields that differ from the shared row (NULL means
+  "as in citations"). Expanded citations are exactly those in the
+  stored body (content_json / body_gzip), however many other reports
+  cite the same source.
+- One insert for all of a report's distinct sources, one read of their
+  shared fields, one upsert for its references (no per-citation round
+  trips).
+- Readers of the JSONB content expand the references with one lookup.
+- Rows written before the store existed still hold full citations and
+  are returned as they are.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Query parameters that identify a campaign or click, not the page
+_TRACKING_PARAMS = {"gclid", "fbclid", "mc_cid", "mc_eid"}
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+# report_citations override column -> citations column it defaults to
+_SHARED_FIELDS = {"title": "title", "url": "cited_url", "snippet": "snippet"}
+
+# report_citations columns plus the shared row, enough to build a Citation
+_EXPAND_COLUMNS = (
+    "section_num, position, accessed_at, title, url, snippet, "
+    "citations(cited_url, title, snippet)"
+)
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL, so trivially different links share one row
+
+    Lowercases the scheme and host, drops "www.", default ports, the
+    fragment, tracking parameters (utm_*, gclid, ...) and a trailing
+    slash, and sorts the query parameters. The path keeps its case.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{port}"
+
+    path = parts.path.rstrip("/")
+    query = urlencode(
+        sorted(
+            (key, value)
+            for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith("utm_") and key.lower() not in _TRACKING_PARAMS
+        )
+    )
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def url_hash(url: str) -> str:
+    """Citation key: SHA-256 (hex) of the normalized URL"""
+    return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+
+@dataclass(frozen=True)
+class CitationRef:
+    """One citation of a report: its position, source and what was cited"""
+
+    section_num: int
+    position: int
+    url_hash: str
+    # As cited (url is the original, not the normalized form)
+    title: str
+    url: str
+    snippet: Optional[str]
+    accessed_at: str
+
+
+def collect_citations(content: dict[str, Any]) -> tuple[dict[str, dict], list[CitationRef]]:
+    """
+    Distinct sources and citations of serialized report content
+
+    Args:
+        content: ReportContent as JSON (model_dump(mode="json"))
+
+    Returns:
+        (source rows by url_hash, references in content order)
+    """
+    rows: dict[str, dict] = {}
+    refs: list[CitationRef] = []
+    for section_num, section in enumerate(content.get("sections") or [], start=1):
+        for position, citation in enumerate(section.get("citations") or []):
+            key = url_hash(citation["url"])
+            refs.append(
+                CitationRef(
+                    section_num,
+                    position,
+                    key,
+                    title=citation["title"],
+                    url=citation["url"],
+                    snippet=citation.get("snippet"),
+                    accessed_at=citation["accessed_at"],
+                )
+            )
+            if key not in rows:
+                rows[key] = {
+                    "url_hash": key,
+                    "url": normalize_url(citation["url"]),
+                    "cited_url": citation["url"],
+                    "title": citation["title"],
+                    "snippet": citation.get("snippet"),
+                }
+    return rows, refs
+
+
+def compact_content(content: dict[str, Any], citation_ids: dict[str, str]) -> dict[str, Any]:
+    """Content with each citation replaced by a {"citation_id": ...} reference"""
+    return {
+        **content,
+        "sections": [
+            {
+                **section,
+                "citations": [
+                    {"citation_id": citation_ids[url_hash(citation["url"])]}
+                    for citation in section.get("citations") or []
+                ],
+            }
+            for section in content.get("sections") or []
+        ],
+    }
+
+
+def _overrides(ref: CitationRef, source: dict[str, Any]) -> dict[str, Optional[str]]:
+    """report_citations override columns: NULL where the citation matches its source"""
+    overrides: dict[str, Optional[str]] = {}
+    for field, column in _SHARED_FIELDS.items():
+        value = getattr(ref, field)
+        if value == source[column]:
+            overrides[field] = None
+        else:
+            # NULL already means "as in citations", so a missing snippet is ''
+            overrides[field] = "" if value is None else value
+    return overrides
+
+
+def _resolve(row: dict[str, Any], source: dict[str, Any], accessed_at: str) -> dict[str, Any]:
+    """Citation from report_citations overrides falling back to the shared row"""
+    citation = {
+        field: source[column] if row.get(field) is None else row[field]
+        for field, column in _SHARED_FIELDS.items()
+    }
+    return {
+        "title": citation["title"],
+        "url": citation["url"],
+        "snippet": citation["snippet"] or None,
+        "accessed_at": accessed_at,
+    }
+
+
+def store_citations(supabase: Any, report_id: str, content: dict[str, Any]) -> dict[str, Any]:
+    """
+    Upsert a completed report's citations and link them to the report
+
+    Args:
+        supabase: Supabase client
+        report_id: Report ID
+        content: ReportContent as JSON (model_dump(mode="json"))
+
+    Returns:
+        Compacted content to store in reports.content
+    """
+    rows, refs = collect_citations(content)
+    if not rows:
+        return content
+
+    # Existing sources keep the fields they were first cited with
+    supabase.table("citations").upsert(
+        list(rows.values()), on_conflict="url_hash", ignore_duplicates=True
+    ).execute()
+    stored = (
+        supabase.table("citations")
+        .select("id, url_hash, " + ", ".join(_SHARED_FIELDS.values()))
+        .in_("url_hash", list(rows))
+        .execute()
+    )
+    sources = {row["url_hash"]: row for row in stored.data}
+    citation_ids = {key: row["id"] for key, row in sources.items()}
+
+    supabase.table("report_citations").upsert(
+        [
+            {
+                "report_id": report_id,
+                "section_num": ref.section_num,
+                "position": ref.position,
+                "citation_id": citation_ids[ref.url_hash],
+                "accessed_at": ref.accessed_at,
+                **_overrides(ref, sources[ref.url_hash]),
+            }
+            for ref in refs
+        ],
+        on_conflict="report_id,section_num,position",
+    ).execute()
+
+    return compact_content(content, citation_ids)
+
+
+def _is_reference(citation: dict[str, Any]) -> bool:
+    return "citation_id" in citation and "url" not in citation
+
+
+def _shared_citations(supabase: Any, citation_ids: set[str]) -> dict[str, dict[str, Any]]:
+    """
+    Citations built from the shared rows alone, by citation ID
+
+    For references whose report_citations row is missing: the source is
+    shown as first cited, with the time it was first stored standing in
+    for accessed_at.
+    """
+    result = (
+        supabase.table("citations")
+        .select("id, created_at, " + ", ".join(_SHARED_FIELDS.values()))
+        .in_("id", sorted(citation_ids))
+        .execute()
+    )
+    return {row["id"]: _resolve({}, row, row["created_at"]) for row in result.data}
+
+
+def expand_sections(
+    supabase: Any, report_id: str, sections: list[dict[str, Any]], first_section_num: int = 1
+) -> list[dict[str, Any]]:
+    """
+    Sections with citation references replaced by the report's citations
+
+    One query for all referenced positions; sections holding full
+    citations (stored before the citation store) are returned unchanged.
+    References with no report_citations row fall back to their shared
+    citations row (one more query), and are kept as stored if that is
+    missing too; either way they are logged, never dropped.
+
+    Args:
+        supabase: Supabase client
+        report_id: Report the sections belong to
+        sections: Consecutive sections of the report's JSONB content
+        first_section_num: 1-based number of sections[0]
+    """
+    section_nums = [
+        section_num
+        for section_num, section in enumerate(sections, start=first_section_num)
+        if any(_is_reference(citation) for citation in section.get("citations") or [])
+    ]
+    if not section_nums:
+        return sections
+
+    result = (
+        supabase.table("report_citations")
+        .select(_EXPAND_COLUMNS)
+        .eq("report_id", report_id)
+        .in_("section_num", section_nums)
+        .execute()
+    )
+    by_position = {
+        (row["section_num"], row["position"]): _resolve(
+            row, row["citations"], row["accessed_at"]
+        )
+        for row in result.data
+    }
+
+    missing = {
+        citation["citation_id"]
+        for section_num, section in enumerate(sections, start=first_section_num)
+        for position, citation in enumerate(section.get("citations") or [])
+        if _is_reference(citation) and (section_num, position) not in by_position
+    }
+    by_id = _shared_citations(supabase, missing) if missing else {}
+
+    expanded = []
+    unresolved = 0
+    for section_num, section in enumerate(sections, start=first_section_num):
+        citations = []
+        for position, citation in enumerate(section.get("citations") or []):
+            if not _is_reference(citation):
+                citations.append(citation)
+            elif (section_num, position) in by_position:
+                citations.append(by_position[(section_num, position)])
+            else:
+                unresolved += 1
+                citations.append(by_id.get(citation["citation_id"], citation))
+        expanded.append({**section, "citations": citations})
+
+    if unresolved:
+        logger.warning(
+            "citation_refs_unresolved",
+            report_id=report_id,
+            unresolved=unresolved,
+            missing_sources=len(missing - by_id.keys()),
+        )
+    return expanded
+
+
+def expand_content(
+    supabase: Any, report_id: str, content: Optional[dict[str, Any]]
+) -> Optional[dict[str, Any]]:
+    """Report content with its citation references expanded"""
+    if not content or not content.get("sections"):
+        return content
+    sections = expand_sections(supabase, report_id, content["sections"])
+    if sections is content["sections"]:
+        return content
+    return {**content, "sections": sections}
+
+
+def find_reports_citing(supabase: Any, url: str) -> list[str]:
+    """IDs of the reports citing a URL (any variant with the same normalized form)"""
+    result = (
+        supabase.table("report_citations")
+        .select("report_id, citations!inner(url_hash)")
+        .eq("citations.url_hash", url_hash(url))
+        .execute()
+    )
+    return sorted({row["report_id"] for row in result.data})
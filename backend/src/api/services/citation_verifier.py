@@ -0,0 +1,363 @@
+"""
+Citation URL verification
+
+The AI is asked for real, verifiable sources; this checks that the cited
+pages exist. Runs in the background once a report is stored as
+completed, so checks never delay completion.
+
+- All of a report's URLs are checked concurrently through one pooled
+  httpx client: HEAD first, GET (headers only) when HEAD is refused.
+- At most `per_host` requests run against the same host at once, each
+  bounded by a timeout; redirects are followed up to `max_redirects`.
+- Cited URLs come from model output, so only http(s) URLs whose host
+  resolves to public addresses are requested; the check runs before
+  every request, redirect hops included (no SSRF into the private
+  network or cloud metadata endpoints).
+- Results are cached by normalized URL for `ttl_seconds` (a day by
+  default), in-process and optionally in a shared tier (Redis), so a
+  popular source is checked once a day rather than once per report.
+  Inconclusive results (timeouts, 5xx, 429) are cached briefly.
+- Only 404/410 or an unusable URL count as broken; verification never
+  raises, so it cannot fail a report.
+"""
+
+import asyncio
+import ipaddress
+import json
+import socket
+from collections import Counter, OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import AsyncIterator, Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+import structlog
+
+from src.api.services.citation_store import url_hash
+from src.api.services.report_cache import SharedReportStore
+
+logger = structlog.get_logger(__name__)
+
+KEY_PREFIX = "citation:"
+
+# Statuses that mean the page is gone (others may be transient or bot blocking)
+_BROKEN_STATUSES = {404, 410}
+# HEAD refused or unsupported: retry with GET
+_HEAD_FALLBACK_STATUSES = {403, 405, 501}
+
+_USER_AGENT = "StudyAbroadCitationVerifier/1.0"
+
+_ALLOWED_SCHEMES = ("http", "https")
+
+
+class BlockedURLError(Exception):
+    """A request target that is not a public http(s) address"""
+
+
+async def ensure_public_url(url: httpx.URL) -> None:
+    """
+    Reject URLs that are not http(s) or whose host resolves to a
+    private, loopback, link-local, reserved or multicast address
+
+    The connection resolves the host again, so a DNS answer changed in
+    between (rebinding) is not caught; it stops plain links and redirects
+    into internal addresses.
+
+    Raises:
+        BlockedURLError: If the URL must not be requested
+        OSError: If the host does not resolve
+    """
+    if url.scheme not in _ALLOWED_SCHEMES or not url.host:
+        raise BlockedURLError(f"scheme not allowed: {url.scheme}")
+    port = url.port or (443 if url.scheme == "https" else 80)
+    infos = await asyncio.get_running_loop().getaddrinfo(
+        url.host, port, type=socket.SOCK_STREAM
+    )
+    for *_, sockaddr in infos:
+        address = ipaddress.ip_address(sockaddr[0])
+        if not address.is_global or address.is_multicast or address.is_reserved:
+            raise BlockedURLError(f"{url.host} resolves to non-public address {address}")
+
+
+class VerificationStatus(str, Enum):
+    """Outcome of checking a citation URL"""
+
+    OK = "ok"
+    BROKEN = "broken"
+    UNKNOWN = "unknown"
+
+
+@dataclass(frozen=True)
+class VerificationResult:
+    """Result of checking one URL"""
+
+    url: str
+    status: VerificationStatus
+    checked_at: datetime
+    http_status: Optional[int] = None
+    final_url: Optional[str] = None
+    error: Optional[str] = None
+
+    def dumps(self) -> bytes:
+        """Encoding for the shared tier"""
+        data = asdict(self)
+        data["status"] = self.status.value
+        data["checked_at"] = self.checked_at.isoformat()
+        return json.dumps(data).encode()
+
+    @classmethod
+    def loads(cls, data: bytes) -> "VerificationResult":
+        fields = json.loads(data)
+        fields["status"] = VerificationStatus(fields["status"])
+        fields["checked_at"] = datetime.fromisoformat(fields["checked_at"])
+        return cls(**fields)
+
+
+class VerificationCache:
+    """
+    TTL cache of verification results by normalized URL
+
+    In-process LRU with an optional shared tier; shared-tier errors are
+    logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 86400,
+        unknown_ttl_seconds: int = 300,
+        max_entries: int = 10000,
+        shared: Optional[SharedReportStore] = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.unknown_ttl_seconds = unknown_ttl_seconds
+        self.max_entries = max_entries
+        self.shared = shared
+        self._entries: "OrderedDict[str, VerificationResult]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, result: VerificationResult) -> int:
+        if result.status == VerificationStatus.UNKNOWN:
+            return self.unknown_ttl_seconds
+        return self.ttl_seconds
+
+    def _is_fresh(self, result: VerificationResult) -> bool:
+        age = datetime.now(timezone.utc) - result.checked_at
+        return age < timedelta(seconds=self.ttl_for(result))
+
+    async def get(self, url: str) -> Optional[VerificationResult]:
+        key = url_hash(url)
+        result = self._entries.get(key)
+        if result is not None:
+            if self._is_fresh(result):
+                self._entries.move_to_end(key)
+                return result
+            del self._entries[key]
+
+        if self.shared is None:
+            return None
+        try:
+            data = await self.shared.get(KEY_PREFIX + key)
+        except Exception as e:
+            logger.warning("citation_cache_shared_get_failed", url=url, error=str(e))
+            return None
+        if data is None:
+            return None
+
+        result = VerificationResult.loads(data)
+        if not self._is_fresh(result):
+            return None
+        self._remember(key, result)
+        return result
+
+    async def put(self, result: VerificationResult) -> None:
+        key = url_hash(result.url)
+        self._remember(key, result)
+        if self.shared is not None:
+            try:
+                await self.shared.set(KEY_PREFIX + key, result.dumps(), self.ttl_for(result))
+            except Exception as e:
+                logger.warning("citation_cache_shared_set_failed", url=result.url, error=str(e))
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _remember(self, key: str, result: VerificationResult) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+class CitationVerifier:
+    """
+    Concurrent, cached URL checker
+
+    Args:
+        cache: Result cache (a private in-process one by default)
+        timeout_seconds: Per-request timeout (connect, read and pool)
+        per_host: Concurrent requests allowed against one host
+        max_connections: Connection pool size of the shared client
+        max_redirects: Redirects followed before giving up
+        client: httpx client to use instead of the verifier's own
+        allow_private_addresses: Skip the public-address check (local testing only)
+    """
+
+    def __init__(
+        self,
+        cache: Optional[VerificationCache] = None,
+        timeout_seconds: float = 5.0,
+        per_host: int = 4,
+        max_connections: int = 100,
+        max_redirects: int = 5,
+        client: Optional[httpx.AsyncClient] = None,
+        allow_private_addresses: bool = False,
+    ):
+        self.cache = cache or VerificationCache()
+        self.timeout_seconds = timeout_seconds
+        self.per_host = per_host
+        self.max_connections = max_connections
+        self.max_redirects = max_redirects
+        self.allow_private_addresses = allow_private_addresses
+        self._client = client
+        if client is not None:
+            self._install_guard(client)
+        # Only hosts with requests in flight are kept
+        self._host_limits: dict[str, asyncio.Semaphore] = {}
+        self._host_users: Counter[str] = Counter()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Pooled client, created on first use"""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                follow_redirects=True,
+                max_redirects=self.max_redirects,
+                timeout=httpx.Timeout(self.timeout_seconds),
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                headers={"User-Agent": _USER_AGENT},
+            )
+            self._install_guard(self._client)
+        return self._client
+
+    def _install_guard(self, client: httpx.AsyncClient) -> None:
+        """Check every outgoing request, including each redirect hop"""
+        if self.allow_private_addresses:
+            return
+        hooks = client.event_hooks
+        hooks["request"] = [*hooks.get("request", []), self._guard]
+        client.event_hooks = hooks
+
+    @staticmethod
+    async def _guard(request: httpx.Request) -> None:
+        await ensure_public_url(request.url)
+
+    @asynccontextmanager
+    async def _host_slot(self, host: str) -> AsyncIterator[None]:
+        """Hold one of the host's `per_host` slots; idle hosts are forgotten"""
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = self._host_limits[host] = asyncio.Semaphore(self.per_host)
+        self._host_users[host] += 1
+        try:
+            async with limit:
+                yield
+        finally:
+            self._host_users[host] -= 1
+            if self._host_users[host] <= 0:
+                del self._host_users[host]
+                del self._host_limits[host]
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def verify_all(self, urls: Iterable[str]) -> dict[str, VerificationResult]:
+        """
+        Verify URLs concurrently
+
+        Args:
+            urls: URLs to check (duplicates are checked once)
+
+        Returns:
+            Result for each distinct URL
+        """
+        distinct = list(dict.fromkeys(urls))
+        results = await asyncio.gather(*(self.verify(url) for url in distinct))
+        return dict(zip(distinct, results))
+
+    async def verify(self, url: str) -> VerificationResult:
+        """Verify one URL, from the cache when a fresh result exists"""
+        cached = await self.cache.get(url)
+        if cached is not None:
+            return cached
+
+        # Concurrent checks of the same source (e.g. within one report) share one request
+        key = url_hash(url)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._check(url)
+            await self.cache.put(result)
+            future.set_result(result)
+            return result
+        finally:
+            del self._inflight[key]
+            if not future.done():
+                future.cancel()
+
+    async def _check(self, url: str) -> VerificationResult:
+        now = datetime.now(timezone.utc)
+        parts = urlsplit(url)
+        if parts.scheme not in _ALLOWED_SCHEMES or not parts.hostname:
+            return VerificationResult(url, VerificationStatus.BROKEN, now, error="invalid url")
+
+        try:
+            async with self._host_slot(parts.hostname):
+                # Redirect hops share the overall deadline
+                async with asyncio.timeout(self.timeout_seconds * 2):
+                    response = await self._request(url)
+        except BlockedURLError as e:
+            logger.warning("citation_url_blocked", url=url, reason=str(e))
+            return VerificationResult(url, VerificationStatus.BROKEN, now, error="blocked url")
+        except (httpx.HTTPError, httpx.InvalidURL, TimeoutError, OSError) as e:
+            return VerificationResult(
+                url, VerificationStatus.UNKNOWN, now, error=type(e).__name__
+            )
+
+        if response.status_code < 400:
+            status = VerificationStatus.OK
+        elif response.status_code in _BROKEN_STATUSES:
+            status = VerificationStatus.BROKEN
+        else:
+            status = VerificationStatus.UNKNOWN
+        return VerificationResult(
+            url,
+            status,
+            now,
+            http_status=response.status_code,
+            final_url=str(response.url),
+        )
+
+    async def _request(self, url: str) -> httpx.Response:
+        client = self._get_client()
+        response = await client.head(url)
+        if response.status_code in _HEAD_FALLBACK_STATUSES:
+            # Headers are enough; the body is never read
+            async with client.stream("GET", url) as streamed:
+                response = streamed
+        return response
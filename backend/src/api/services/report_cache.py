@@ -0,0 +1,402 @@
+"""
+Completed report cache
+
+Completed reports never change until they expire or are deleted, so
+GET /reports/{id} serves them from here instead of querying Supabase,
+re-validating the full Report/ReportContent model and re-serializing
+the JSON on every request.
+
+- Entries hold the serialized JSON body and a strong ETag computed once,
+  when the report is first cached (normally at completion).
+- Rows read from the database are rendered by the trusted path
+  (CachedReport.from_row): the stored content JSON text is spliced into
+  the body without being decoded or re-validated.
+- In-process LRU, with an optional shared tier (Redis) so other workers
+  can answer without a database query.
+- Entries are dropped on soft delete and stop being served once the
+  report's expires_at passes. With a shared tier, a local entry is only
+  trusted for `local_ttl_seconds` before it is re-read from the shared
+  tier, so a soft delete on another worker is seen within that window.
+- Bodies are also kept gzip-compressed (stored that way at completion,
+  or compressed once when cached), so clients sending
+  `Accept-Encoding: gzip` get precompressed bytes with no per-request
+  compression.
+"""
+
+import gzip
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from typing import Any, Optional, Protocol
+
+import structlog
+
+from src.api.models.report import Report, ReportStatus
+
+logger = structlog.get_logger(__name__)
+
+KEY_PREFIX = "report:"
+
+# Report fields in response order; content is spliced in last
+_ENVELOPE_FIELDS = [name for name in Report.model_fields if name != "content"]
+
+
+def compress_body(body: bytes) -> bytes:
+    """Deterministic gzip (mtime=0), so the same body always has the same ETag"""
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+def _decode_bytea(value: str) -> bytes:
+    """PostgREST returns bytea columns as hex text (\\x...)"""
+    return bytes.fromhex(value[2:] if value.startswith("\\x") else value)
+
+
+def encode_bytea(value: bytes) -> str:
+    """Hex text form of a bytea value for PostgREST writes"""
+    return "\\x" + value.hex()
+
+
+def _utc(value: datetime) -> datetime:
+    """Treat naive timestamps (datetime.utcnow()) as UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass(frozen=True)
+class CachedReport:
+    """Serialized report body with its ETag"""
+
+    report_id: str
+    user_id: str
+    status: str
+    body: bytes
+    etag: str
+    expires_at: datetime
+    body_gzip: Optional[bytes] = None
+
+    @property
+    def gzip_etag(self) -> str:
+        """Strong ETag of the gzip representation (must differ from the identity one)"""
+        return self.etag[:-1] + '-gzip"'
+
+    def with_gzip(self) -> "CachedReport":
+        """This entry with its gzip representation (compressed once, here)"""
+        if self.body_gzip is not None:
+            return self
+        return replace(self, body_gzip=compress_body(self.body))
+
+    @classmethod
+    def from_report(cls, report: Report) -> "CachedReport":
+        """Serialize a validated Report model"""
+        return cls._build(
+            report_id=report.id,
+            user_id=report.user_id,
+            status=report.status.value,
+            body=report.model_dump_json().encode(),
+            expires_at=_utc(report.expires_at),
+        )
+
+    @classmethod
+    def from_row(cls, row: dict[str, Any]) -> "CachedReport":
+        """
+        Trusted path: render a stored reports row without Pydantic
+
+        Content was validated when it was written, so its JSON text
+        (content_json, or content::text for older rows) is spliced into
+        the body verbatim. The remaining fields are plain JSON scalars.
+
+        Args:
+            row: reports row with `body_gzip` (the full body, stored at
+                completion), or `content_json` and/or `content_text`
+                (content::text) instead of the decoded `content`
+        """
+        if row.get("body_gzip"):
+            body_gzip = _decode_bytea(row["body_gzip"])
+            entry = cls._build(
+                report_id=str(row["id"]),
+                user_id=str(row["user_id"]),
+                status=row["status"],
+                body=gzip.decompress(body_gzip),
+                expires_at=_utc(datetime.fromisoformat(row["expires_at"])),
+            )
+            return replace(entry, body_gzip=body_gzip)
+
+        content = row.get("content_json") or row.get("content_text") or "null"
+        envelope = json.dumps(
+            {field: row.get(field) for field in _ENVELOPE_FIELDS}, separators=(",", ":")
+        )
+        return cls._build(
+            report_id=str(row["id"]),
+            user_id=str(row["user_id"]),
+            status=row["status"],
+            body=f'{envelope[:-1]},"content":{content}}}'.encode(),
+            expires_at=_utc(datetime.fromisoformat(row["expires_at"])),
+        )
+
+    @classmethod
+    def _build(
+        cls, report_id: str, user_id: str, status: str, body: bytes, expires_at: datetime
+    ) -> "CachedReport":
+        return cls(
+            report_id=report_id,
+            user_id=user_id,
+            status=status,
+            body=body,
+            etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"',
+            expires_at=expires_at,
+        )
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return (now or datetime.now(timezone.utc)) >= self.expires_at
+
+    def ttl_seconds(self) -> int:
+        return max(0, int((self.expires_at - datetime.now(timezone.utc)).total_seconds()))
+
+    def dumps(self) -> bytes:
+        """Encoding for the shared tier (the gzip body when there is one)"""
+        meta = {
+            "user_id": self.user_id,
+            "status": self.status,
+            "etag": self.etag,
+            "expires_at": self.expires_at.isoformat(),
+            "gzip": self.body_gzip is not None,
+        }
+        return json.dumps(meta).encode() + b"\n" + (self.body_gzip or self.body)
+
+    @classmethod
+    def loads(cls, report_id: str, data: bytes) -> "CachedReport":
+        meta, payload = data.split(b"\n", 1)
+        fields = json.loads(meta)
+        compressed = fields.get("gzip", False)
+        return cls(
+            report_id=report_id,
+            user_id=fields["user_id"],
+            status=fields["status"],
+            body=gzip.decompress(payload) if compressed else payload,
+            etag=fields["etag"],
+            expires_at=datetime.fromisoformat(fields["expires_at"]),
+            body_gzip=payload if compressed else None,
+        )
+
+
+class SharedReportStore(Protocol):
+    """Cross-process tier (e.g. Redis)"""
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None: ...
+
+    async def delete(self, key: str) -> None: ...
+
+
+class RedisReportStore:
+    """SharedReportStore backed by Redis (requires the `redis` package)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "REPORT_CACHE_REDIS_URL is set but the 'redis' package is not installed "
+                "(install the backend's [redis] extra)"
+            ) from e
+        self._client = redis.from_url(url)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl_seconds: int) -> None:
+        await self._client.set(key, value, ex=ttl_seconds)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(key)
+
+
+class ReportCache:
+    """
+    LRU of completed reports with an optional shared tier
+
+    Shared-tier errors are logged and treated as misses; the database
+    remains the source of truth.
+
+    Args:
+        max_entries: In-process LRU size (0 disables the local tier)
+        shared: Cross-process tier, if any
+        local_ttl_seconds: With a shared tier, how long a local entry is
+            served before the shared tier is checked again (it is the
+            record of invalidations made by other workers)
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        shared: Optional[SharedReportStore] = None,
+        local_ttl_seconds: float = 5.0,
+    ):
+        self.max_entries = max_entries
+        self.shared = shared
+        self.local_ttl_seconds = local_ttl_seconds
+        self._entries: "OrderedDict[str, CachedReport]" = OrderedDict()
+        self._checked_at: dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    async def get(self, report_id: str) -> Optional[CachedReport]:
+        """
+        Cached report, if present and not expired
+
+        Args:
+            report_id: Report ID
+
+        Returns:
+            CachedReport or None (the caller must still check ownership)
+        """
+        entry = self._entries.get(report_id)
+        if entry is not None:
+            if entry.is_expired():
+                self._forget(report_id)
+                return None
+            if self.shared is None or not self._needs_check(report_id):
+                self._entries.move_to_end(report_id)
+                return entry
+
+        if self.shared is None:
+            return None
+        try:
+            data = await self.shared.get(KEY_PREFIX + report_id)
+        except Exception as e:
+            logger.warning("report_cache_shared_get_failed", report_id=report_id, error=str(e))
+            return None
+        if data is None:
+            # Invalidated (or evicted) in the shared tier
+            self._forget(report_id)
+            return None
+
+        entry = CachedReport.loads(report_id, data)
+        if entry.is_expired():
+            return None
+        self._remember(entry)
+        return entry
+
+    async def put(self, report: Report) -> Optional[CachedReport]:
+        """
+        Cache a report if it is completed, not deleted and not expired
+
+        Args:
+            report: Validated report
+
+        Returns:
+            CachedReport, or None if the report is not cacheable
+        """
+        if report.deleted_at is not None:
+            return None
+        return await self.put_entry(CachedReport.from_report(report))
+
+    async def put_entry(self, entry: CachedReport) -> Optional[CachedReport]:
+        """
+        Cache a rendered report if it is completed and not expired
+
+        Args:
+            entry: Rendered report (from_report or from_row)
+
+        Returns:
+            The cached entry (with its gzip body), or None if not cacheable
+        """
+        if entry.status != ReportStatus.COMPLETED.value or entry.is_expired():
+            return None
+
+        entry = entry.with_gzip()
+        self._remember(entry)
+        if self.shared is not None:
+            try:
+                await self.shared.set(
+                    KEY_PREFIX + entry.report_id, entry.dumps(), entry.ttl_seconds()
+                )
+            except Exception as e:
+                logger.warning(
+                    "report_cache_shared_set_failed", report_id=entry.report_id, error=str(e)
+                )
+        return entry
+
+    async def invalidate(self, report_id: str) -> None:
+        """Drop a report (soft delete) from both tiers"""
+        self._forget(report_id)
+        if self.shared is not None:
+            try:
+                await self.shared.delete(KEY_PREFIX + report_id)
+            except Exception as e:
+                logger.warning(
+                    "report_cache_shared_delete_failed", report_id=report_id, error=str(e)
+                )
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._checked_at.clear()
+
+    def _needs_check(self, report_id: str) -> bool:
+        """Whether a local entry is older than local_ttl_seconds"""
+        checked_at = self._checked_at.get(report_id, 0.0)
+        return time.monotonic() - checked_at >= self.local_ttl_seconds
+
+    def _forget(self, report_id: str) -> None:
+        self._entries.pop(report_id, None)
+        self._checked_at.pop(report_id, None)
+
+    def _remember(self, entry: CachedReport) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[entry.report_id] = entry
+        self._entries.move_to_end(entry.report_id)
+        self._checked_at[entry.report_id] = time.monotonic()
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._checked_at.pop(evicted, None)
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """
+    Whether an Accept-Encoding header allows gzip
+
+    gzip (or x-gzip) with q > 0 counts, as does `*` when gzip is not
+    explicitly refused with q=0.
+    """
+    if not accept_encoding:
+        return False
+    qualities = {}
+    for part in accept_encoding.lower().split(","):
+        coding, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[coding.strip()] = quality
+    for coding in ("gzip", "x-gzip"):
+        if coding in qualities:
+            return qualities[coding] > 0
+    return qualities.get("*", 0) > 0
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against a strong ETag
+
+    Handles `*`, comma-separated lists and weak (W/) client tags, which
+    match by weak comparison as RFC 9110 requires for If-None-Match.
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
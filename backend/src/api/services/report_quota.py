@@ -0,0 +1,215 @@
+"""
+Daily report quota
+
+Enforces RATE_LIMIT_REPORTS_PER_DAY: at most that many reports created
+per user in any rolling 24 hours. POST /reports/initiate checks it before
+the report exists, so an abusive client is stopped before any Gemini run.
+
+Counts are sliding-window counters held in memory: one counter per hour
+of the window, so a check is a handful of dict operations and no query.
+The reports table is the persistent record. A user's counter is loaded
+from the created_at of their recent reports when first seen and again
+every `resync_seconds`, so restarts do not reset quotas and reports
+created through other instances are picked up. Soft-deleted reports
+still count. If loading fails the user is counted locally from zero and
+the load is retried after `load_retry_seconds`.
+"""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+
+@dataclass(frozen=True)
+class QuotaReservation:
+    """Where an allowed acquire() was counted, so release() undoes exactly that"""
+
+    user_id: str
+    counter: "SlidingWindowCounter"
+    slot: int
+
+
+@dataclass(frozen=True)
+class QuotaDecision:
+    """Outcome of a quota check"""
+
+    allowed: bool
+    used: int
+    limit: int
+    # Seconds until a report can be created (when not allowed)
+    retry_after: int = 0
+    # Pass to release() if the report is then not created
+    reservation: Optional[QuotaReservation] = None
+
+
+class SlidingWindowCounter:
+    """
+    Events over a rolling window, counted in fixed slots
+
+    Strict: an event is counted until its whole slot has left the window,
+    so the count never under-reports (it may keep an event up to one slot
+    longer than the window).
+    """
+
+    __slots__ = ("window_slots", "slot_seconds", "counts", "loaded_at", "fresh_for")
+
+    def __init__(
+        self,
+        window_seconds: float,
+        slots: int,
+        loaded_at: float = 0.0,
+        fresh_for: float = float("inf"),
+    ):
+        self.window_slots = slots
+        self.slot_seconds = window_seconds / slots
+        # Slot number (epoch seconds // slot_seconds) -> events in that slot
+        self.counts: Dict[int, int] = {}
+        self.loaded_at = loaded_at
+        # Seconds after loaded_at that the counts are trusted
+        self.fresh_for = fresh_for
+
+    def add(self, at: float, n: int = 1) -> int:
+        """Count `n` events at `at`; returns the slot they were counted in"""
+        slot = int(at // self.slot_seconds)
+        self.counts[slot] = self.counts.get(slot, 0) + n
+        return slot
+
+    def remove(self, slot: int) -> None:
+        """Uncount one event from `slot` (no-op once the slot has aged out)"""
+        count = self.counts.get(slot, 0)
+        if count > 1:
+            self.counts[slot] = count - 1
+        elif count == 1:
+            del self.counts[slot]
+
+    def total(self, now: float) -> int:
+        """Events within the window ending now (drops older slots)"""
+        oldest = int(now // self.slot_seconds) - self.window_slots
+        for slot in [slot for slot in self.counts if slot < oldest]:
+            del self.counts[slot]
+        return sum(self.counts.values())
+
+    def seconds_until_below(self, limit: int, now: float) -> float:
+        """How long until fewer than `limit` events remain in the window"""
+        excess = self.total(now) - limit + 1
+        if excess <= 0:
+            return 0.0
+        for slot in sorted(self.counts):
+            excess -= self.counts[slot]
+            if excess <= 0:
+                # The slot leaves the window once the current slot is window_slots past it
+                return (slot + self.window_slots + 1) * self.slot_seconds - now
+        return 0.0
+
+
+class ReportQuota:
+    """Rolling per-user cap on report creation"""
+
+    def __init__(
+        self,
+        limit: int,
+        load_recent: Callable[[str, datetime], Awaitable[List[datetime]]],
+        window_seconds: float = 86400,
+        slots: int = 24,
+        resync_seconds: float = 300,
+        load_retry_seconds: float = 30,
+        max_users: int = 10_000,
+    ):
+        """
+        Args:
+            limit: Reports allowed per user per window
+            load_recent: Creation times of a user's reports since a given time
+            window_seconds: Rolling window (24h)
+            slots: Counters per window (hourly)
+            resync_seconds: How long a loaded counter is trusted before reloading
+            load_retry_seconds: How long a counter is trusted when loading failed
+            max_users: Counters kept in memory (least recently used dropped)
+        """
+        self.limit = limit
+        self.load_recent = load_recent
+        self.window_seconds = window_seconds
+        self.slots = slots
+        self.resync_seconds = resync_seconds
+        self.load_retry_seconds = load_retry_seconds
+        self.max_users = max_users
+        self._users: "OrderedDict[str, SlidingWindowCounter]" = OrderedDict()
+
+    async def acquire(self, user_id: str) -> QuotaDecision:
+        """
+        Count one report creation, if the user is under the quota
+
+        Call release() with the decision's reservation if the report is
+        then not created.
+        """
+        counter = await self._counter(user_id)
+        now = time.time()
+        used = counter.total(now)
+        if used >= self.limit:
+            retry_after = int(counter.seconds_until_below(self.limit, now)) + 1
+            logger.warning(
+                "report_quota_exceeded",
+                user_id=user_id,
+                used=used,
+                limit=self.limit,
+                retry_after=retry_after,
+            )
+            return QuotaDecision(False, used, self.limit, retry_after)
+
+        slot = counter.add(now)
+        return QuotaDecision(
+            True, used + 1, self.limit, reservation=QuotaReservation(user_id, counter, slot)
+        )
+
+    def release(self, reservation: Optional[QuotaReservation]) -> None:
+        """
+        Undo an acquire() whose report was not created
+
+        Only the counter and slot the creation was counted in are changed.
+        A counter reloaded since then was rebuilt from the reports table,
+        which never held this report, so there is nothing to undo.
+        """
+        if reservation is None:
+            return
+        if self._users.get(reservation.user_id) is reservation.counter:
+            reservation.counter.remove(reservation.slot)
+
+    async def _counter(self, user_id: str) -> SlidingWindowCounter:
+        stale = self._users.get(user_id)
+        now = time.time()
+        if stale is not None and now - stale.loaded_at < stale.fresh_for:
+            self._users.move_to_end(user_id)
+            return stale
+
+        counter = SlidingWindowCounter(
+            self.window_seconds, self.slots, loaded_at=now, fresh_for=self.resync_seconds
+        )
+        since = datetime.fromtimestamp(
+            now - self.window_seconds - counter.slot_seconds, timezone.utc
+        )
+        try:
+            for created_at in await self.load_recent(user_id, since):
+                if created_at.tzinfo is None:
+                    created_at = created_at.replace(tzinfo=timezone.utc)
+                counter.add(created_at.timestamp())
+        except Exception as e:
+            # Count from zero (locally) rather than block report creation,
+            # and try the database again soon
+            counter.fresh_for = self.load_retry_seconds
+            logger.warning("report_quota_load_failed", user_id=user_id, error=str(e))
+
+        # A concurrent request may have loaded (and counted) meanwhile
+        existing = self._users.get(user_id)
+        if existing is not None and existing is not stale:
+            return existing
+
+        self._users[user_id] = counter
+        self._users.move_to_end(user_id)
+        if len(self._users) > self.max_users:
+            self._users.popitem(last=False)
+        return counter
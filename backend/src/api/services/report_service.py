@@ -3,26 +3,98 @@ Report service for managing report lifecycle
 Handles creation, generation, and retrieval
 """
 
+import asyncio
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Optional, List
+
+import structlog
+
 from src.config import settings
 from src.api.models.report import (
     Report,
     ReportStatus,
     CreateReportResponse,
     ReportListItem,
+    ReportSearchResult,
     ReportContent,
     ReportSection,
+    ReportSectionSummary,
+    ReportSectionsIndex,
     Citation,
 )
 from src.api.services.ai_service import generate_report
+from src.api.services.citation_store import (
+    expand_content,
+    expand_sections,
+    find_reports_citing,
+    store_citations,
+    url_hash,
+)
+from src.api.services.citation_verifier import (
+    CitationVerifier,
+    VerificationCache,
+    VerificationStatus,
+)
+from src.api.services.report_cache import (
+    CachedReport,
+    RedisReportStore,
+    ReportCache,
+    encode_bytea,
+)
+from src.api.services.report_quota import ReportQuota
 from src.feature_flags import feature_flags, Feature
+from database.pagination import InvalidCursorError, decode_cursor
+
+logger = structlog.get_logger(__name__)
 
 # Note: get_supabase is imported dynamically in _get_supabase() to avoid
 # initialization errors when Supabase is disabled
 
 
+def _create_report_cache() -> ReportCache:
+    """Completed-report cache, with a Redis tier when REPORT_CACHE_REDIS_URL is set"""
+    shared = None
+    if settings.REPORT_CACHE_REDIS_URL:
+        shared = RedisReportStore(settings.REPORT_CACHE_REDIS_URL)
+    return ReportCache(
+        max_entries=settings.REPORT_CACHE_MAX_ENTRIES,
+        shared=shared,
+        local_ttl_seconds=settings.REPORT_CACHE_LOCAL_TTL_SEC,
+    )
+
+
+report_cache = _create_report_cache()
+
+
+def _create_citation_verifier() -> CitationVerifier:
+    """Citation URL checker; results share the report cache's Redis tier when configured"""
+    cache = VerificationCache(
+        ttl_seconds=settings.CITATION_VERIFY_CACHE_TTL_SEC, shared=report_cache.shared
+    )
+    return CitationVerifier(
+        cache=cache,
+        timeout_seconds=settings.CITATION_VERIFY_TIMEOUT_SEC,
+        per_host=settings.CITATION_VERIFY_PER_HOST,
+    )
+
+
+citation_verifier = _create_citation_verifier()
+# Citation checks running after report completion (referenced until done)
+_verification_tasks: set[asyncio.Task] = set()
+
+# Report model columns (never search_tsv or the stored body copies)
+_REPORT_COLUMNS = (
+    "id, user_id, query, status, content, error, expires_at, created_at, updated_at, deleted_at"
+)
+
+# Trusted read path columns: the stored body or content JSON text, not the decoded JSONB
+_DOCUMENT_COLUMNS = (
+    "id, user_id, query, status, error, expires_at, created_at, updated_at, deleted_at, "
+    "content_json, body_gzip"
+)
+
+
 def _is_supabase_enabled() -> bool:
     """Check if Supabase is enabled via feature flag"""
     return feature_flags.is_enabled(Feature.SUPABASE)
@@ -202,7 +274,9 @@ async def trigger_report_generation(report_id: str) -> None:
 
     try:
         # Get report
-        report_result = supabase.table("reports").select("*").eq("id", report_id).execute()
+        report_result = (
+            supabase.table("reports").select(_REPORT_COLUMNS).eq("id", report_id).execute()
+        )
 
         if not report_result.data or len(report_result.data) == 0:
             raise Exception(f"Report {report_id} not found")
@@ -221,14 +295,33 @@ async def trigger_report_generation(report_id: str) -> None:
         # Generate report using AI
         report_content = await generate_report(query)
 
-        # Store generated content
-        supabase.table("reports").update(
-            {
-                "status": ReportStatus.COMPLETED.value,
-                "content": report_content.dict(),
-                "updated_at": datetime.utcnow().isoformat(),
-            }
-        ).eq("id", report_id).execute()
+        # Store generated content, with citations moved to the shared citation store
+        content = report_content.model_dump(mode="json")
+        citations_stored = False
+        try:
+            content = store_citations(supabase, report_id, content)
+            citations_stored = True
+        except Exception as e:
+            # The citation store is an index; keep full citations rather than fail the report
+            logger.warning("citation_store_failed", report_id=report_id, error=str(e))
+
+        update_data = {
+            "status": ReportStatus.COMPLETED.value,
+            "content": content,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        content_json = report_content.model_dump_json()
+        if settings.REPORT_CONTENT_COMPRESSION == "gzip":
+            # The full GET /reports/{id} body, compressed once; replaces content_json
+            document = CachedReport.from_row(
+                {**report_data, **update_data, "content_json": content_json}
+            )
+            update_data["body_gzip"] = encode_bytea(document.with_gzip().body_gzip)
+        else:
+            # Canonical serialized content, spliced into the body on read
+            update_data["content_json"] = content_json
+
+        completed = supabase.table("reports").update(update_data).eq("id", report_id).execute()
 
     except Exception as e:
         # Handle generation failure
@@ -242,6 +335,70 @@ async def trigger_report_generation(report_id: str) -> None:
 
         raise e
 
+    # Cache the stored row now so the ETag is computed once, at completion
+    if completed.data:
+        await report_cache.put_entry(CachedReport.from_row(completed.data[0]))
+
+    # Checking cited URLs takes network round trips; the report is already served
+    if citations_stored and settings.CITATION_VERIFY_ENABLED:
+        task = asyncio.get_running_loop().create_task(
+            _verify_citations_in_background(supabase, report_id, report_content)
+        )
+        _verification_tasks.add(task)
+        task.add_done_callback(_verification_tasks.discard)
+
+
+async def _verify_citations_in_background(
+    supabase, report_id: str, content: ReportContent
+) -> None:
+    """Run _verify_citations after completion; failures are logged, never raised"""
+    try:
+        await _verify_citations(supabase, report_id, content)
+    except Exception as e:
+        logger.warning("citation_verify_failed", report_id=report_id, error=str(e))
+
+
+def cancel_citation_verification() -> None:
+    """Cancel citation checks still running (on shutdown)"""
+    for task in list(_verification_tasks):
+        task.cancel()
+
+
+async def _verify_citations(supabase, report_id: str, content: ReportContent) -> None:
+    """
+    Check a report's cited URLs and record the outcome once per source
+
+    Broken sources are invalidated and sources found working again are
+    re-validated, for every report citing them. Inconclusive checks
+    leave the source as it was.
+    """
+    urls = [citation.url for section in content.sections for citation in section.citations]
+    if not urls:
+        return
+
+    results = await citation_verifier.verify_all(urls)
+    by_status: dict[VerificationStatus, set[str]] = {status: set() for status in VerificationStatus}
+    for url, result in results.items():
+        by_status[result.status].add(url_hash(url))
+
+    now = datetime.now(timezone.utc).isoformat()
+    for status, invalidated_at in (
+        (VerificationStatus.BROKEN, now),
+        (VerificationStatus.OK, None),
+    ):
+        if by_status[status]:
+            supabase.table("citations").update({"invalidated_at": invalidated_at}).in_(
+                "url_hash", sorted(by_status[status])
+            ).execute()
+
+    logger.info(
+        "citations_verified",
+        report_id=report_id,
+        sources=len(results),
+        broken=len(by_status[VerificationStatus.BROKEN]),
+        unknown=len(by_status[VerificationStatus.UNKNOWN]),
+    )
+
 
 async def get_report(report_id: str, user_id: str) -> Optional[Report]:
     """
@@ -268,7 +425,7 @@ async def get_report(report_id: str, user_id: str) -> Optional[Report]:
 
     result = (
         supabase.table("reports")
-        .select("*")
+        .select(_REPORT_COLUMNS)
         .eq("id", report_id)
         .eq("user_id", user_id)
         .is_("deleted_at", "null")
@@ -276,13 +433,207 @@ async def get_report(report_id: str, user_id: str) -> Optional[Report]:
     )
 
     if result.data and len(result.data) > 0:
-        return Report(**result.data[0])
+        row = result.data[0]
+        return Report(
+            **{**row, "content": expand_content(supabase, report_id, row.get("content"))}
+        )
     return None
 
 
-async def list_user_reports(user_id: str, limit: int = 50) -> List[ReportListItem]:
+async def get_report_state(report_id: str, user_id: str) -> Optional[dict]:
+    """
+    Get a report's status and query (with ownership check)
+
+    For callers that only need ownership and state, such as the stream
+    endpoint: content is neither selected nor expanded.
+
+    Returns:
+        {"user_id", "status", "query"}, or None if not found
+    """
+    if not _is_supabase_enabled():
+        report = await get_report(report_id, user_id)
+        return {"user_id": report.user_id, "status": report.status.value, "query": report.query}
+
+    supabase = _get_supabase()
+
+    result = (
+        supabase.table("reports")
+        .select("user_id, status, query")
+        .eq("id", report_id)
+        .eq("user_id", user_id)
+        .is_("deleted_at", "null")
+        .execute()
+    )
+    return result.data[0] if result.data else None
+
+
+async def get_cached_report(report_id: str, user_id: str) -> Optional[CachedReport]:
+    """
+    Get a completed report from the cache (no database query)
+
+    Returns None on a miss or when the report belongs to another user;
+    callers then fall back to get_report().
+    """
+    cached = await report_cache.get(report_id)
+    if cached is None or cached.user_id != user_id:
+        return None
+    return cached
+
+
+async def get_report_document(report_id: str, user_id: str) -> Optional[CachedReport]:
+    """
+    Get a report as a ready-to-send JSON body (with ownership check)
+
+    Trusted read path for GET /reports/{id}: content was validated when
+    it was written, so the stored JSON text is used as-is instead of
+    building Report/ReportContent models. Completed reports are cached.
+
+    Returns:
+        CachedReport (serialized body + ETag), or None if not found
+    """
+    # In dev mode without Supabase, serialize the mock report
+    if not _is_supabase_enabled():
+        report = await get_report(report_id, user_id)
+        if report is None:
+            return None
+        return await report_cache.put(report) or CachedReport.from_report(report)
+
+    supabase = _get_supabase()
+
+    result = (
+        supabase.table("reports")
+        .select(_DOCUMENT_COLUMNS)
+        .eq("id", report_id)
+        .eq("user_id", user_id)
+        .is_("deleted_at", "null")
+        .execute()
+    )
+    if not result.data:
+        return None
+
+    row = result.data[0]
+    if (
+        row.get("content_json") is None
+        and not row.get("body_gzip")
+        and row["status"] == ReportStatus.COMPLETED.value
+    ):
+        # Completed before content_json/body_gzip existed: read the JSONB as text, undecoded
+        legacy = (
+            supabase.table("reports")
+            .select("content_text:content::text")
+            .eq("id", report_id)
+            .execute()
+        )
+        if legacy.data:
+            row["content_text"] = legacy.data[0]["content_text"]
+
+    entry = CachedReport.from_row(row)
+    return await report_cache.put_entry(entry) or entry
+
+
+async def get_report_sections_index(
+    report_id: str, user_id: str
+) -> Optional[ReportSectionsIndex]:
+    """
+    Get section headings and citation counts (with ownership check)
+
+    Computed in the database by report_sections_index() with JSONB
+    operators, so section bodies and citations are never transferred.
+
+    Returns:
+        ReportSectionsIndex (empty sections until content exists), or None if not found
+    """
+    # In dev mode without Supabase, index the mock report
+    if not _is_supabase_enabled():
+        report = await get_report(report_id, user_id)
+        if report is None:
+            return None
+        sections = report.content.sections if report.content else []
+        return ReportSectionsIndex(
+            report_id=report_id,
+            status=report.status,
+            sections=[
+                ReportSectionSummary(
+                    section_num=num,
+                    heading=section.heading,
+                    citation_count=len(section.citations),
+                )
+                for num, section in enumerate(sections, start=1)
+            ],
+        )
+
+    supabase = _get_supabase()
+
+    result = supabase.rpc(
+        "report_sections_index", {"p_report_id": report_id, "p_user_id": user_id}
+    ).execute()
+    if not result.data:
+        return None
+
+    return ReportSectionsIndex(
+        report_id=report_id,
+        status=result.data[0]["status"],
+        sections=[
+            ReportSectionSummary(**{key: row[key] for key in ReportSectionSummary.model_fields})
+            for row in result.data
+            if row["section_num"] is not None
+        ],
+    )
+
+
+async def get_report_section(report_id: str, user_id: str, section_num: int) -> Optional[dict]:
     """
-    List all reports for a user
+    Get one section of a report (with ownership check)
+
+    Selects content->sections->n, so only that section leaves the
+    database. Content was validated when it was written and is returned
+    as stored.
+
+    Args:
+        section_num: 1-based section number (as in the sections index)
+
+    Returns:
+        Section JSON (heading, content, citations), or None if the report
+        or the section does not exist
+    """
+    if section_num < 1:
+        return None
+
+    # In dev mode without Supabase, slice the mock report
+    if not _is_supabase_enabled():
+        report = await get_report(report_id, user_id)
+        if report is None or report.content is None:
+            return None
+        if section_num > len(report.content.sections):
+            return None
+        return report.content.sections[section_num - 1].model_dump(mode="json")
+
+    supabase = _get_supabase()
+
+    result = (
+        supabase.table("reports")
+        .select(f"section:content->sections->{section_num - 1}")
+        .eq("id", report_id)
+        .eq("user_id", user_id)
+        .is_("deleted_at", "null")
+        .execute()
+    )
+    if not result.data or result.data[0]["section"] is None:
+        return None
+    return expand_sections(supabase, report_id, [result.data[0]["section"]], section_num)[0]
+
+
+async def list_user_reports(
+    user_id: str, limit: int = 50, cursor: Optional[str] = None
+) -> List[ReportListItem]:
+    """
+    List reports for a user, newest first
+
+    Keyset-paginated on (created_at, id): pass the cursor of the last item of
+    the previous page to continue. Every page costs the same regardless of depth.
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
     """
     # In dev mode without Supabase, return empty list
     if not _is_supabase_enabled():
@@ -290,19 +641,79 @@ async def list_user_reports(user_id: str, limit: int = 50) -> List[ReportListIte
 
     supabase = _get_supabase()
 
-    result = (
+    query = (
         supabase.table("reports")
         .select("id, query, status, created_at, expires_at")
         .eq("user_id", user_id)
         .is_("deleted_at", "null")
-        .order("created_at", desc=True)
-        .limit(limit)
-        .execute()
     )
 
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        # The id is spliced into the PostgREST filter, so only a UUID may pass
+        try:
+            last_id = uuid.UUID(last_id)
+        except ValueError as e:
+            raise InvalidCursorError(f"Invalid pagination cursor: {cursor!r}") from e
+        ts = created_at.isoformat()
+        query = query.or_(f'created_at.lt."{ts}",and(created_at.eq."{ts}",id.lt.{last_id})')
+
+    result = query.order("created_at", desc=True).order("id", desc=True).limit(limit).execute()
+
     return [ReportListItem(**item) for item in result.data]
 
 
+async def get_recent_report_times(user_id: str, since: datetime) -> List[datetime]:
+    """
+    Creation times of a user's reports since a point in time
+
+    Loads the daily report quota; soft-deleted reports are included so
+    deleting a report does not give back quota.
+    """
+    if not _is_supabase_enabled():
+        return []
+
+    supabase = _get_supabase()
+    result = (
+        supabase.table("reports")
+        .select("created_at")
+        .eq("user_id", user_id)
+        .gte("created_at", since.isoformat())
+        .execute()
+    )
+    return [datetime.fromisoformat(row["created_at"]) for row in result.data]
+
+
+report_quota = ReportQuota(settings.RATE_LIMIT_REPORTS_PER_DAY, load_recent=get_recent_report_times)
+
+
+async def search_user_reports(
+    user_id: str, query: str, limit: int = 20
+) -> List[ReportSearchResult]:
+    """
+    Full-text search over a user's reports, best match first
+
+    Ranking and snippets (ts_headline) are computed by search_reports()
+    against the GIN-indexed search_tsv column; report bodies never leave
+    the database.
+
+    Args:
+        query: Search terms (web search syntax: "quoted phrases", -exclude, or)
+        limit: Maximum number of results
+    """
+    # In dev mode without Supabase, there is nothing to search
+    if not _is_supabase_enabled():
+        return []
+
+    supabase = _get_supabase()
+
+    result = supabase.rpc(
+        "search_reports", {"p_user_id": user_id, "p_query": query, "p_limit": limit}
+    ).execute()
+
+    return [ReportSearchResult(**row) for row in result.data]
+
+
 async def update_report_status(report_id: str, status: str, error: Optional[str] = None) -> None:
     """
     Update report status (used by streaming endpoint)
@@ -347,4 +758,31 @@ async def soft_delete_report(report_id: str, user_id: str) -> bool:
         .execute()
     )
 
-    return len(result.data) > 0
+    if not result.data:
+        return False
+
+    await report_cache.invalidate(report_id)
+    return True
+
+
+async def invalidate_citation(url: str, invalidated: bool = True) -> List[str]:
+    """
+    Mark a cited source invalid (or valid again) for every report citing it
+
+    Args:
+        url: Cited URL (any variant with the same normalized form)
+        invalidated: False to clear a previous invalidation
+
+    Returns:
+        IDs of the reports citing the source
+    """
+    if not _is_supabase_enabled():
+        return []
+
+    supabase = _get_supabase()
+
+    supabase.table("citations").update(
+        {"invalidated_at": datetime.now(timezone.utc).isoformat() if invalidated else None}
+    ).eq("url_hash", url_hash(url)).execute()
+
+    return find_reports_citing(supabase, url)
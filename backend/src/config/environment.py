@@ -24,6 +24,7 @@ PaymentStatus = Literal[
     "bypassed",
 ]
 ReportStatus = Literal["generating", "completed", "failed"]
+PoolerModeName = Literal["auto", "direct", "session", "transaction", "transaction_prepared"]
 
 
 class DatabaseConfig(BaseModel):
@@ -36,10 +37,31 @@ class DatabaseConfig(BaseModel):
         None, description="Supabase service role key (backend only)"
     )
     DATABASE_POOL_MAX: int = Field(20, ge=1, le=100, description="Maximum connection pool size")
+    DATABASE_POOL_MIN: int = Field(
+        2, ge=0, le=100, description="Connections opened at startup (pool warm-up)"
+    )
     DATABASE_IDLE_TIMEOUT_MS: int = Field(
         30000, ge=1000, description="Connection idle timeout (ms)"
     )
     DATABASE_CONNECTION_TIMEOUT_MS: int = Field(2000, ge=500, description="Connection timeout (ms)")
+    DATABASE_REPLICA_URLS: list[str] = Field(
+        default=[], description="Read replica connection URLs (reads use the primary if empty)"
+    )
+    DATABASE_REPLICA_MAX_LAG_MS: int = Field(
+        5000, ge=100, description="Replication lag beyond which a replica is ejected (ms)"
+    )
+    DATABASE_POOLER_MODE: PoolerModeName = Field(
+        "auto", description="Connection pooler in front of Supabase (auto-detected from URL)"
+    )
+    DATABASE_QUERY_CACHE_SIZE: int = Field(
+        1200, ge=0, description="Compiled SQL statement cache (LRU) size"
+    )
+    DATABASE_SLOW_QUERY_MS: int = Field(
+        200, ge=1, description="Statements slower than this are logged as slow queries (ms)"
+    )
+    DATABASE_N_PLUS_ONE_THRESHOLD: int = Field(
+        5, ge=0, description="Repeats of one SELECT per request flagged as N+1 in dev/test (0 disables)"
+    )
 
 
 class LoggingConfig(BaseModel):
@@ -145,8 +167,15 @@ class EnvironmentConfig(BaseSettings):
         None, description="Supabase service role key (backend only)"
     )
     DATABASE_POOL_MAX: int = Field(20, ge=1, le=100)
+    DATABASE_POOL_MIN: int = Field(2, ge=0, le=100)
     DATABASE_IDLE_TIMEOUT_MS: int = Field(30000, ge=1000)
     DATABASE_CONNECTION_TIMEOUT_MS: int = Field(2000, ge=500)
+    DATABASE_REPLICA_URLS: list[str] = Field(default=[])
+    DATABASE_REPLICA_MAX_LAG_MS: int = Field(5000, ge=100)
+    DATABASE_POOLER_MODE: PoolerModeName = Field("auto")
+    DATABASE_QUERY_CACHE_SIZE: int = Field(1200, ge=0)
+    DATABASE_SLOW_QUERY_MS: int = Field(200, ge=1)
+    DATABASE_N_PLUS_ONE_THRESHOLD: int = Field(5, ge=0)
 
     # Logging (LOG_LEVEL default is None, set by validator based on ENVIRONMENT_MODE)
     LOG_LEVEL: LogLevel = Field(None, description="Logging level")
@@ -194,11 +223,60 @@ class EnvironmentConfig(BaseSettings):
 
     # Report Settings
     REPORT_EXPIRY_DAYS: int = Field(30, ge=1, le=365, description="Days until report expires")
+    REPORT_CACHE_MAX_ENTRIES: int = Field(
+        1000, ge=0, description="Completed reports kept in the in-process cache (0 disables)"
+    )
+    REPORT_CACHE_REDIS_URL: str | None = Field(
+        None, description="Redis URL for the shared completed-report cache tier"
+    )
+    REPORT_CACHE_LOCAL_TTL_SEC: float = Field(
+        5.0,
+        ge=0,
+        description="With a shared tier, seconds a local entry is served before re-checking it",
+    )
+    REPORT_CONTENT_COMPRESSION: Literal["gzip", "none"] = Field(
+        "gzip", description="Store completed report bodies gzip-compressed (body_gzip)"
+    )
+
+    # Citation Verification
+    CITATION_VERIFY_ENABLED: bool = Field(True, description="Check cited URLs after generation")
+    CITATION_VERIFY_TIMEOUT_SEC: float = Field(5.0, gt=0, le=60)
+    CITATION_VERIFY_PER_HOST: int = Field(4, ge=1, le=50)
+    CITATION_VERIFY_CACHE_TTL_SEC: int = Field(
+        86400, ge=0, description="How long a URL check result is reused"
+    )
 
     # Rate Limiting
     RATE_LIMIT_MAX: int = Field(100, ge=1)
     RATE_LIMIT_WINDOW_SEC: int = Field(60, ge=1)
     RATE_LIMIT_REPORTS_PER_DAY: int = Field(10, ge=1)
+    RATE_LIMIT_STREAM_MAX: int = Field(
+        20, ge=1, description="SSE stream connections per minute per user (own bucket)"
+    )
+    RATE_LIMIT_INITIATE_COST: int = Field(
+        10, ge=1, description="Tokens charged for POST /reports/initiate"
+    )
+    RATE_LIMIT_MAX_DELAY_SEC: float = Field(
+        0.0, ge=0, le=10, description="Hold requests over the limit up to this long (0: reject)"
+    )
+    RATE_LIMIT_MAX_QUEUED: int = Field(
+        5, ge=1, description="Requests held at once per user while delaying"
+    )
+    STREAM_MAX_CONCURRENT_PER_USER: int = Field(
+        3, ge=1, description="SSE streams one user may hold open at once"
+    )
+    STREAM_MAX_CONCURRENT: int = Field(
+        100, ge=1, description="SSE streams one worker holds open at once"
+    )
+    RATE_LIMIT_REDIS_URL: str | None = Field(
+        None, description="Redis URL for rate-limit buckets shared by all instances"
+    )
+    RATE_LIMIT_LEASE_TOKENS: int = Field(
+        5, ge=1, description="Tokens taken from the shared store per call (local lease)"
+    )
+    RATE_LIMIT_MAX_BUCKETS: int = Field(
+        100_000, ge=1, description="In-process buckets kept (least recently used evicted past it)"
+    )
 
     # Cron Security
     CRON_SECRET: str | None = Field(None, description="Secret for cron job authentication")
@@ -8,7 +8,9 @@ This module provides:
 - Database models (User, Report, Payment)
 - Repository pattern with soft delete support
 - Database adapters (PostgreSQL, Supabase)
-- Transaction support
+- Transaction support (UnitOfWork across repositories, savepoints)
+- Request-scoped identity map for primary-key lookups
+- Keyset (cursor) pagination
 
 Usage:
     from database import get_database_adapter, UserRepository
@@ -19,17 +21,27 @@ Usage:
     user = await user_repo.find_by_id(user_id)
 """
 
-from database.types import DatabaseAdapter, Repository
+from database.types import ConcurrentUpdateError, DatabaseAdapter, Repository
+from database.pagination import InvalidCursorError, Page, decode_cursor, encode_cursor
 from database.adapters import PostgreSQLAdapter, SupabaseAdapter, get_database_adapter
 from database.repositories import UserRepository, ReportRepository, PaymentRepository
+from database.unit_of_work import UnitOfWork
+from database.identity_map import identity_map
 
 __all__ = [
     "DatabaseAdapter",
     "Repository",
+    "ConcurrentUpdateError",
+    "Page",
+    "InvalidCursorError",
+    "encode_cursor",
+    "decode_cursor",
     "PostgreSQLAdapter",
     "SupabaseAdapter",
     "get_database_adapter",
     "UserRepository",
     "ReportRepository",
     "PaymentRepository",
+    "UnitOfWork",
+    "identity_map",
 ]
@@ -37,6 +37,11 @@ def get_database_adapter() -> DatabaseAdapter:
             service_role_key=config.SUPABASE_SERVICE_ROLE_KEY,
             pool_size=config.DATABASE_POOL_MAX,
             pool_timeout=config.DATABASE_IDLE_TIMEOUT_MS // 1000,
+            replica_urls=config.DATABASE_REPLICA_URLS,
+            max_replica_lag_seconds=config.DATABASE_REPLICA_MAX_LAG_MS / 1000,
+            slow_query_ms=config.DATABASE_SLOW_QUERY_MS,
+            pooler_mode=config.DATABASE_POOLER_MODE,
+            query_cache_size=config.DATABASE_QUERY_CACHE_SIZE,
         )
     else:
         # Dev mode: Use local PostgreSQL
@@ -44,4 +49,7 @@ def get_database_adapter() -> DatabaseAdapter:
             database_url=config.DATABASE_URL,
             pool_size=config.DATABASE_POOL_MAX,
             pool_timeout=config.DATABASE_IDLE_TIMEOUT_MS // 1000,
+            replica_urls=config.DATABASE_REPLICA_URLS,
+            max_replica_lag_seconds=config.DATABASE_REPLICA_MAX_LAG_MS / 1000,
+            slow_query_ms=config.DATABASE_SLOW_QUERY_MS,
         )
@@ -4,14 +4,8 @@ PostgreSQL Database Adapter
 Local PostgreSQL implementation for development mode.
 """
 
-from typing import Any
-from sqlalchemy.ext.asyncio import (
-    create_async_engine,
-    AsyncSession,
-    async_sessionmaker,
-    AsyncEngine,
-)
-from sqlalchemy import text
+from database.instrumentation import DEFAULT_SLOW_QUERY_MS
+from database.telemetry import InstrumentedQueuePool
 from database.types import DatabaseAdapter
 
 
@@ -23,7 +17,15 @@ class PostgreSQLAdapter(DatabaseAdapter):
     Uses asyncpg driver for async operations.
     """
 
-    def __init__(self, database_url: str, pool_size: int = 20, pool_timeout: int = 30):
+    def __init__(
+        self,
+        database_url: str,
+        pool_size: int = 20,
+        pool_timeout: int = 30,
+        replica_urls: list[str] | None = None,
+        max_replica_lag_seconds: float = 5.0,
+        slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+    ):
         """
         Initialize PostgreSQL adapter
 
@@ -31,44 +33,21 @@ class PostgreSQLAdapter(DatabaseAdapter):
             database_url: PostgreSQL connection string
             pool_size: Maximum connection pool size
             pool_timeout: Connection timeout in seconds
+            replica_urls: Read replica connection strings (reads use the primary if empty)
+            max_replica_lag_seconds: Replication lag beyond which a replica is ejected
+            slow_query_ms: Statements at or above this duration are logged as slow
         """
-        self.database_url = database_url
-        self.engine: AsyncEngine = create_async_engine(
-            database_url,
+        engine_kwargs = dict(
             pool_size=pool_size,
             max_overflow=10,
             pool_timeout=pool_timeout,
+            poolclass=InstrumentedQueuePool,
             echo=False,  # Set to True for SQL logging
         )
-        self.session_maker = async_sessionmaker(
-            self.engine, class_=AsyncSession, expire_on_commit=False
+        self._connect(
+            database_url,
+            engine_kwargs,
+            replica_urls=replica_urls,
+            max_replica_lag_seconds=max_replica_lag_seconds,
+            slow_query_ms=slow_query_ms,
         )
-
-    async def get_session(self) -> AsyncSession:
-        """
-        Get database session
-
-        Returns:
-            AsyncSession instance
-        """
-        return self.session_maker()
-
-    async def close(self) -> None:
-        """Close database connection pool"""
-        await self.engine.dispose()
-
-    async def execute_raw(self, query: str, params: dict[str, Any] | None = None) -> Any:
-        """
-        Execute raw SQL query
-
-        Args:
-            query: SQL query string
-            params: Query parameters
-
-        Returns:
-            Query result
-        """
-        async with self.session_maker() as session:
-            result = await session.execute(text(query), params or {})
-            await session.commit()
-            return result
@@ -4,14 +4,14 @@ Supabase Database Adapter
 Supabase PostgreSQL implementation for test and production modes.
 """
 
-from typing import Any
-from sqlalchemy.ext.asyncio import (
-    create_async_engine,
-    AsyncSession,
-    async_sessionmaker,
-    AsyncEngine,
+from database.instrumentation import DEFAULT_SLOW_QUERY_MS
+from database.pooler import (
+    DEFAULT_QUERY_CACHE_SIZE,
+    PoolerMode,
+    pooler_engine_options,
+    resolve_pooler_mode,
 )
-from sqlalchemy import text
+from database.telemetry import InstrumentedQueuePool
 from database.types import DatabaseAdapter
 
 
@@ -29,6 +29,11 @@ class SupabaseAdapter(DatabaseAdapter):
         service_role_key: str,
         pool_size: int = 20,
         pool_timeout: int = 30,
+        replica_urls: list[str] | None = None,
+        max_replica_lag_seconds: float = 5.0,
+        slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+        pooler_mode: PoolerMode | str = PoolerMode.AUTO,
+        query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
     ):
         """
         Initialize Supabase adapter
@@ -38,48 +43,28 @@ class SupabaseAdapter(DatabaseAdapter):
             service_role_key: Supabase service role key (bypasses RLS)
             pool_size: Maximum connection pool size
             pool_timeout: Connection timeout in seconds
+            replica_urls: Read replica connection strings (reads use the primary if empty)
+            max_replica_lag_seconds: Replication lag beyond which a replica is ejected
+            slow_query_ms: Statements at or above this duration are logged as slow
+            pooler_mode: Pooling in front of the database ("auto" detects it
+                from the URL; see database.pooler)
+            query_cache_size: Compiled SQL statement LRU size
         """
-        self.database_url = database_url
         self.service_role_key = service_role_key
+        self.pooler_mode = resolve_pooler_mode(database_url, pooler_mode)
 
-        # Create async engine with Supabase connection
-        self.engine: AsyncEngine = create_async_engine(
-            database_url,
+        engine_kwargs = dict(
             pool_size=pool_size,
             max_overflow=10,
             pool_timeout=pool_timeout,
+            poolclass=InstrumentedQueuePool,
             echo=False,
+            **pooler_engine_options(self.pooler_mode, query_cache_size),
         )
-
-        self.session_maker = async_sessionmaker(
-            self.engine, class_=AsyncSession, expire_on_commit=False
+        self._connect(
+            database_url,
+            engine_kwargs,
+            replica_urls=replica_urls,
+            max_replica_lag_seconds=max_replica_lag_seconds,
+            slow_query_ms=slow_query_ms,
         )
-
-    async def get_session(self) -> AsyncSession:
-        """
-        Get database session
-
-        Returns:
-            AsyncSession instance
-        """
-        return self.session_maker()
-
-    async def close(self) -> None:
-        """Close database connection pool"""
-        await self.engine.dispose()
-
-    async def execute_raw(self, query: str, params: dict[str, Any] | None = None) -> Any:
-        """
-        Execute raw SQL query
-
-        Args:
-            query: SQL query string
-            params: Query parameters
-
-        Returns:
-            Query result
-        """
-        async with self.session_maker() as session:
-            result = await session.execute(text(query), params or {})
-            await session.commit()
-            return result
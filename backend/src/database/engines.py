@@ -0,0 +1,129 @@
+"""
+Engine Registry
+
+One AsyncEngine (and pool) per distinct URL + pool settings for the
+whole process. Adapters, replicas and anything else that needs an
+engine get it from here, so re-creating an adapter reuses the pool
+instead of opening a second one.
+
+Each `get` takes a reference and each `release` drops one; a pool is
+disposed when its last holder releases it (or at shutdown).
+"""
+
+import asyncio
+from typing import Any
+
+import structlog
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
+
+logger = structlog.get_logger()
+
+
+class EngineRegistry:
+    """Process-wide cache of engines keyed by URL and engine options"""
+
+    def __init__(self) -> None:
+        self._engines: dict[tuple[str, Any], AsyncEngine] = {}
+        self._refs: dict[AsyncEngine, int] = {}
+
+    @classmethod
+    def _key(cls, url: str, options: dict[str, Any]) -> tuple[str, Any]:
+        return url, cls._freeze(options)
+
+    @classmethod
+    def _freeze(cls, value: Any) -> Any:
+        """Hashable form of engine options (connect_args is a nested dict)"""
+        if isinstance(value, dict):
+            return tuple(sorted((key, cls._freeze(item)) for key, item in value.items()))
+        if isinstance(value, (list, set)):
+            return tuple(cls._freeze(item) for item in value)
+        return value
+
+    def get(self, url: str, **options: Any) -> AsyncEngine:
+        """
+        Get the engine for `url` and `options`, creating it on first use
+
+        Takes a reference; pair every call with `release`.
+
+        Args:
+            url: Database connection string
+            **options: create_async_engine options (pool_size, poolclass, ...)
+
+        Returns:
+            Shared AsyncEngine
+        """
+        key = self._key(url, options)
+        engine = self._engines.get(key)
+        if engine is None:
+            engine = create_async_engine(url, **options)
+            self._engines[key] = engine
+        self._refs[engine] = self._refs.get(engine, 0) + 1
+        return engine
+
+    async def warm_up(self, engine: AsyncEngine, min_size: int) -> int:
+        """
+        Open up to `min_size` connections now and return them to the pool
+
+        Pays the TCP/TLS/auth handshake at startup rather than on the
+        first requests after a cold start.
+
+        Args:
+            engine: Engine to warm
+            min_size: Connections to open (capped at the pool size)
+
+        Returns:
+            Number of connections opened
+        """
+        pool = engine.sync_engine.pool
+        if hasattr(pool, "size"):
+            min_size = min(min_size, pool.size())
+        if min_size <= 0:
+            return 0
+
+        connections = await asyncio.gather(
+            *(engine.connect() for _ in range(min_size)), return_exceptions=True
+        )
+        opened = 0
+        for conn in connections:
+            if isinstance(conn, BaseException):
+                logger.warning("database_warm_up_failed", error=str(conn))
+                continue
+            opened += 1
+            await conn.close()
+
+        logger.info("database_pool_warmed", host=engine.url.host, connections=opened)
+        return opened
+
+    async def release(self, engine: AsyncEngine) -> None:
+        """
+        Drop one reference to `engine`, disposing its pool with the last one
+
+        Args:
+            engine: Engine returned by `get`
+        """
+        refs = self._refs.get(engine, 0) - 1
+        if refs > 0:
+            self._refs[engine] = refs
+            return
+        await self.dispose(engine)
+
+    async def dispose(self, engine: AsyncEngine) -> None:
+        """Dispose one engine's pool and forget it, whoever still holds it"""
+        for key, registered in list(self._engines.items()):
+            if registered is engine:
+                del self._engines[key]
+        self._refs.pop(engine, None)
+        await engine.dispose()
+
+    async def dispose_all(self) -> None:
+        """Dispose every pool (application shutdown)"""
+        engines = list(self._engines.values())
+        self._engines.clear()
+        self._refs.clear()
+        for engine in engines:
+            await engine.dispose()
+        if engines:
+            logger.info("database_engines_disposed", count=len(engines))
+
+
+engine_registry = EngineRegistry()
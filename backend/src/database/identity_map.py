@@ -0,0 +1,93 @@
+"""
+Request-Scoped Identity Map
+
+Caches entities loaded by primary key for the duration of one request,
+so repeated find_by_id calls (ownership check, then update, then the
+generator re-reading the row) cost one query instead of several.
+
+- Bound to a contextvar: outside an identity_map() block nothing is
+  cached, and one request never sees another request's entities.
+- Writes through any repository of the same model invalidate the row
+  (or the whole model, for bulk writes by predicate) before they run.
+- A rolled-back unit of work clears the map, since entities read inside
+  it may hold uncommitted values.
+
+Usage:
+    with identity_map():
+        await repo.find_by_id(report_id)   # query
+        await repo.find_by_id(report_id)   # cached
+        await repo.update(report_id, {...})
+        await repo.find_by_id(report_id)   # query again
+"""
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+
+class IdentityMap:
+    """Entities by (model, primary key, include_deleted)"""
+
+    def __init__(self) -> None:
+        self._entities: dict[tuple[type, str, bool], Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.closed = False
+
+    def get(self, model: type, id: Any, include_deleted: bool) -> Any | None:
+        entity = self._entities.get((model, str(id), include_deleted))
+        if entity is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entity
+
+    def add(self, model: type, id: Any, include_deleted: bool, entity: Any) -> None:
+        """Remember a loaded entity (misses are not cached)"""
+        if entity is not None:
+            self._entities[(model, str(id), include_deleted)] = entity
+
+    def invalidate(self, model: type, id: Any | None = None) -> None:
+        """Forget one row of `model`, or every row of it when `id` is None"""
+        key = None if id is None else str(id)
+        for cached in [k for k in self._entities if k[0] is model and (key is None or k[1] == key)]:
+            del self._entities[cached]
+
+    def clear(self) -> None:
+        self._entities.clear()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+
+_current: ContextVar[IdentityMap | None] = ContextVar("identity_map", default=None)
+
+
+def current_identity_map() -> IdentityMap | None:
+    """Identity map of the enclosing identity_map() block, if still open"""
+    current = _current.get()
+    if current is None or current.closed:
+        return None
+    return current
+
+
+@contextmanager
+def identity_map() -> Iterator[IdentityMap]:
+    """
+    Cache primary-key lookups for the enclosed block (one request)
+
+    Tasks spawned inside the block inherit the map through their copied
+    context; it stops serving them once the block exits.
+
+    Yields:
+        IdentityMap (hits/misses are available for logging)
+    """
+    current = IdentityMap()
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        current.closed = True
+        current.clear()
+        _current.reset(token)
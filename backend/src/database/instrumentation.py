@@ -0,0 +1,204 @@
+"""
+SQL Statement Instrumentation
+
+Cursor-execute hooks that time every statement and tag it with a
+normalized SQL fingerprint and the current correlation ID.
+
+- Slow-query log: statements slower than the configured threshold are
+  logged as `slow_query` warnings.
+- Per-request query counts: wrap a unit of work (a request, a test) in
+  track_queries() to collect the number of statements, total time and
+  per-fingerprint counts.
+- N+1 detection: the same SELECT fingerprint repeated `threshold` times
+  inside one tracked block (e.g. find_by_id in a loop) is reported, and
+  raises NPlusOneError in strict mode so tests fail.
+
+Usage:
+    with track_queries(n_plus_one_threshold=5, strict=True) as tracker:
+        await do_work()
+    tracker.count, tracker.total_ms
+"""
+
+import hashlib
+import re
+import time
+import weakref
+from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any
+
+import structlog
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from logging_lib.correlation import current_correlation_id
+
+logger = structlog.get_logger()
+
+DEFAULT_SLOW_QUERY_MS = 200.0
+DEFAULT_N_PLUS_ONE_THRESHOLD = 5
+
+_COMMENT = re.compile(r"--[^\n]*|/\*.*?\*/", re.DOTALL)
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_PARAM = re.compile(r"\$\d+|%\(\w+\)s|%s|(?<!:):\w+|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NPlusOneError(AssertionError):
+    """Raised in strict mode when a statement repeats like an N+1 loop"""
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """
+    Normalize SQL so statements differing only in literals/parameters match
+
+    Args:
+        statement: SQL text as sent to the driver
+
+    Returns:
+        Normalized SQL with parameters and literals replaced by `?`
+    """
+    sql = _COMMENT.sub(" ", statement)
+    sql = _STRING.sub("?", sql)
+    sql = _PARAM.sub("?", sql)
+    sql = _NUMBER.sub("?", sql)
+    sql = _IN_LIST.sub("(?)", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=2048)
+def fingerprint_id(statement: str) -> str:
+    """Short stable ID of a statement's fingerprint (for log grouping)"""
+    return hashlib.sha1(fingerprint(statement).encode()).hexdigest()[:12]
+
+
+@dataclass
+class QueryTracker:
+    """Statements executed inside one track_queries() block"""
+
+    n_plus_one_threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD
+    count: int = 0
+    total_ms: float = 0.0
+    by_fingerprint: Counter = field(default_factory=Counter)
+    ms_by_fingerprint: Counter = field(default_factory=Counter)
+
+    def record(self, statement: str, duration_ms: float) -> None:
+        sql = fingerprint(statement)
+        self.count += 1
+        self.total_ms += duration_ms
+        self.by_fingerprint[sql] += 1
+        self.ms_by_fingerprint[sql] += duration_ms
+
+    def n_plus_one_suspects(self) -> dict[str, int]:
+        """SELECT fingerprints repeated at least `n_plus_one_threshold` times"""
+        if self.n_plus_one_threshold <= 0:
+            return {}
+        return {
+            sql: count
+            for sql, count in self.by_fingerprint.items()
+            if count >= self.n_plus_one_threshold and sql.upper().startswith("SELECT")
+        }
+
+
+_tracker: ContextVar[QueryTracker | None] = ContextVar("query_tracker", default=None)
+
+
+def current_tracker() -> QueryTracker | None:
+    """Tracker of the enclosing track_queries() block, if any"""
+    return _tracker.get()
+
+
+@contextmanager
+def track_queries(
+    n_plus_one_threshold: int = DEFAULT_N_PLUS_ONE_THRESHOLD, strict: bool = False
+) -> Iterator[QueryTracker]:
+    """
+    Collect statement counts for the enclosed block
+
+    Args:
+        n_plus_one_threshold: Repeats of one SELECT that count as N+1 (0 disables)
+        strict: Raise NPlusOneError instead of logging a warning
+
+    Yields:
+        QueryTracker filled in as statements run
+
+    Raises:
+        NPlusOneError: In strict mode, if an N+1 pattern was seen
+    """
+    tracker = QueryTracker(n_plus_one_threshold=n_plus_one_threshold)
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+    suspects = tracker.n_plus_one_suspects()
+    if suspects:
+        if strict:
+            details = "; ".join(f"{count}x {sql}" for sql, count in suspects.items())
+            raise NPlusOneError(f"N+1 query pattern detected: {details}")
+        for sql, count in suspects.items():
+            logger.warning(
+                "n_plus_one_suspected",
+                sql=sql[:500],
+                count=count,
+                correlation_id=current_correlation_id(),
+            )
+
+
+_instrumented: "weakref.WeakKeyDictionary[Any, float]" = weakref.WeakKeyDictionary()
+
+
+def instrument_engine(engine: AsyncEngine, slow_query_ms: float = DEFAULT_SLOW_QUERY_MS) -> None:
+    """
+    Install the timing hooks on an engine (idempotent)
+
+    Args:
+        engine: Engine to instrument
+        slow_query_ms: Statements at or above this duration are logged
+    """
+    sync_engine = engine.sync_engine
+    already = sync_engine in _instrumented
+    _instrumented[sync_engine] = slow_query_ms
+    if already:
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    duration_ms = (time.perf_counter() - starts.pop()) * 1000
+
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.record(statement, duration_ms)
+
+    slow_query_ms = _instrumented.get(conn.engine, DEFAULT_SLOW_QUERY_MS)
+    if duration_ms >= slow_query_ms:
+        logger.warning(
+            "slow_query",
+            duration_ms=round(duration_ms, 2),
+            threshold_ms=slow_query_ms,
+            fingerprint_id=fingerprint_id(statement),
+            sql=fingerprint(statement)[:500],
+            executemany=executemany,
+            correlation_id=current_correlation_id(),
+        )
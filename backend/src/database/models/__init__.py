@@ -5,7 +5,7 @@ SQLAlchemy ORM models for all database tables.
 """
 
 from database.models.user import User
-from database.models.report import Report
+from database.models.report import Report, ReportSummary
 from database.models.payment import Payment
 
-__all__ = ["User", "Report", "Payment"]
+__all__ = ["User", "Report", "ReportSummary", "Payment"]
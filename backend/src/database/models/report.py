@@ -6,6 +6,7 @@ Maps to data-model.md reports table schema with soft delete support.
 """
 
 from datetime import datetime, timedelta
+from typing import NamedTuple
 from sqlalchemy import String, DateTime, ForeignKey, Text, func, Enum as SQLEnum
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 from sqlalchemy.orm import Mapped, mapped_column
@@ -79,3 +80,33 @@ class Report(Base):
 
     def __repr__(self) -> str:
         return f"<Report(report_id={self.report_id}, subject={self.subject}, status={self.status})>"
+
+
+class ReportSummary(NamedTuple):
+    """
+    Compact report row for listings
+
+    Built straight from a column projection, so the JSONB columns
+    (content, citations, generation_metadata) are never fetched or decoded.
+    """
+
+    report_id: uuid.UUID
+    subject: str
+    status: ReportStatus
+    created_at: datetime
+    completed_at: datetime | None
+    expires_at: datetime
+
+
+# Columns selected for ReportSummary, in field order
+REPORT_SUMMARY_COLUMNS = (
+    Report.report_id,
+    Report.subject,
+    Report.status,
+    Report.created_at,
+    Report.completed_at,
+    Report.expires_at,
+)
+
+# Heavy JSONB columns deferred by listing queries
+REPORT_BODY_COLUMNS = (Report.content, Report.citations, Report.generation_metadata)
@@ -0,0 +1,69 @@
+"""
+Keyset Pagination
+
+Cursor helpers for (created_at, id) keyset pagination.
+Cursors are opaque to clients: URL-safe base64 of "<iso timestamp>|<id>".
+"""
+
+import base64
+import binascii
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+_SEPARATOR = "|"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+@dataclass
+class Page(Generic[T]):
+    """
+    One page of keyset-paginated results
+
+    next_cursor is None on the last page.
+    """
+
+    items: list[T] = field(default_factory=list)
+    next_cursor: str | None = None
+
+
+def encode_cursor(created_at: datetime, id: object) -> str:
+    """
+    Encode a (created_at, id) position as an opaque cursor
+
+    Args:
+        created_at: Sort timestamp of the last row on the page
+        id: Primary key of the last row on the page
+
+    Returns:
+        URL-safe cursor string
+    """
+    raw = f"{created_at.isoformat()}{_SEPARATOR}{id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Args:
+        cursor: Opaque cursor string
+
+    Returns:
+        (created_at, id) tuple
+
+    Raises:
+        InvalidCursorError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at, id = raw.split(_SEPARATOR, 1)
+        return datetime.fromisoformat(created_at), id
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {cursor!r}") from e
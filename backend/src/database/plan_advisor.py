@@ -0,0 +1,445 @@
+"""
+Query Plan Advisor
+
+Runs the repositories' hot queries against a seeded PostgreSQL database,
+captures EXPLAIN (ANALYZE, BUFFERS) for each statement they issue, and:
+
+- flags sequential scans that read more than a row threshold,
+- suggests indexes (as Alembic op.create_index calls) for them,
+- compares plans with a stored baseline so a test can fail when a query
+  starts scanning a table it used to reach through an index.
+
+The statements are captured from the real repository methods, so the
+plans checked are exactly what the application sends. Everything runs
+inside a unit of work that is rolled back, including EXPLAIN ANALYZE of
+writes.
+
+Usage:
+    adapter = PostgreSQLAdapter(url)
+    await seed(adapter, users=200, reports_per_user=50)
+    reports = await analyze_queries(adapter, build_hot_queries(ids))
+"""
+
+import json
+import random
+import re
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from sqlalchemy import event, select
+
+from database.models.payment import Payment, PaymentStatus
+from database.models.report import ReportStatus
+from database.repositories import PaymentRepository, ReportRepository, UserRepository
+from database.types import DatabaseAdapter
+from database.unit_of_work import UnitOfWork
+
+DEFAULT_SEQ_SCAN_ROWS = 1000
+
+# Cost growth beyond this factor (vs baseline) counts as a regression
+COST_REGRESSION_FACTOR = 2.0
+
+# Column on the left of a comparison, e.g. "(user_id = $1)", "((status)::text <> ...)"
+_FILTER_COLUMN = re.compile(r"\b([a-z_][a-z0-9_]*)\)?(?:::[a-z ]+?)?\s*(?:=|<>|!=|<=|>=|<|>|IS)\s")
+_UNPLANNED = ("EXPLAIN", "SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT")
+_SORT_COLUMN = re.compile(r"^(?:\w+\.)?([a-z_][a-z0-9_]*)")
+
+
+@dataclass
+class SeqScan:
+    """A sequential scan node in a plan"""
+
+    relation: str
+    rows: int
+    filter: str | None = None
+    sort_keys: list[str] = field(default_factory=list)
+
+
+@dataclass
+class PlanReport:
+    """Summary of one statement's plan"""
+
+    query: str
+    statement: str
+    total_cost: float
+    execution_ms: float | None
+    shared_hit_blocks: int
+    shared_read_blocks: int
+    node_types: list[str]
+    indexes: list[str]
+    seq_scans: list[SeqScan]
+
+    def to_baseline(self) -> dict[str, Any]:
+        """Fields that should stay stable between runs"""
+        return {
+            "total_cost": self.total_cost,
+            "indexes": sorted(set(self.indexes)),
+            "seq_scan_relations": sorted({scan.relation for scan in self.seq_scans}),
+        }
+
+
+@dataclass
+class IndexSuggestion:
+    """Index that would replace a sequential scan"""
+
+    table: str
+    columns: list[str]
+    reason: str
+
+    @property
+    def name(self) -> str:
+        return f"idx_{self.table}_{'_'.join(self.columns)}"
+
+    def migration(self) -> str:
+        """Alembic operation creating the index"""
+        return (
+            f"op.create_index('{self.name}', '{self.table}', {self.columns!r}, "
+            f"unique=False, postgresql_concurrently=True, if_not_exists=True)"
+        )
+
+
+def summarize_plan(query: str, statement: str, explain_json: Any) -> PlanReport:
+    """
+    Reduce EXPLAIN (FORMAT JSON) output to a PlanReport
+
+    Args:
+        query: Name of the hot query the statement belongs to
+        statement: SQL text
+        explain_json: Parsed EXPLAIN output (list with one {"Plan": ...} object)
+
+    Returns:
+        PlanReport
+    """
+    if isinstance(explain_json, str):
+        explain_json = json.loads(explain_json)
+    root = explain_json[0]
+    plan = root["Plan"]
+
+    node_types: list[str] = []
+    indexes: list[str] = []
+    seq_scans: list[SeqScan] = []
+
+    def walk(node: dict[str, Any], sort_keys: list[str]) -> None:
+        node_type = node["Node Type"]
+        node_types.append(node_type)
+        if "Index Name" in node:
+            indexes.append(node["Index Name"])
+        if node_type == "Seq Scan":
+            rows = int(node.get("Actual Rows", node.get("Plan Rows", 0)))
+            rows += int(node.get("Rows Removed by Filter", 0))
+            seq_scans.append(
+                SeqScan(
+                    relation=node["Relation Name"],
+                    rows=rows,
+                    filter=node.get("Filter"),
+                    sort_keys=sort_keys,
+                )
+            )
+        keys = node.get("Sort Key", sort_keys)
+        for child in node.get("Plans", []):
+            walk(child, keys)
+
+    walk(plan, [])
+
+    return PlanReport(
+        query=query,
+        statement=statement,
+        total_cost=float(plan["Total Cost"]),
+        execution_ms=root.get("Execution Time"),
+        shared_hit_blocks=int(plan.get("Shared Hit Blocks", 0)),
+        shared_read_blocks=int(plan.get("Shared Read Blocks", 0)),
+        node_types=node_types,
+        indexes=indexes,
+        seq_scans=seq_scans,
+    )
+
+
+def suggest_indexes(
+    reports: list[PlanReport], seq_scan_rows: int = DEFAULT_SEQ_SCAN_ROWS
+) -> list[IndexSuggestion]:
+    """
+    Suggest indexes for sequential scans over `seq_scan_rows` rows
+
+    Filter columns come first (equality before range, in filter order),
+    then the sort keys the scan feeds, so one index can serve both the
+    lookup and the ORDER BY.
+
+    Args:
+        reports: Plans to inspect
+        seq_scan_rows: Rows a scan may read before it is flagged
+
+    Returns:
+        De-duplicated index suggestions
+    """
+    suggestions: dict[tuple[str, tuple[str, ...]], IndexSuggestion] = {}
+    for report in reports:
+        for scan in report.seq_scans:
+            if scan.rows < seq_scan_rows or not scan.filter:
+                continue
+            columns = list(dict.fromkeys(_FILTER_COLUMN.findall(scan.filter)))
+            for key in scan.sort_keys:
+                match = _SORT_COLUMN.match(key)
+                if match and match.group(1) not in columns:
+                    columns.append(match.group(1))
+            if not columns:
+                continue
+            key = (scan.relation, tuple(columns))
+            suggestions.setdefault(
+                key,
+                IndexSuggestion(
+                    table=scan.relation,
+                    columns=columns,
+                    reason=f"{report.query}: Seq Scan on {scan.relation} read {scan.rows} rows",
+                ),
+            )
+    return list(suggestions.values())
+
+
+def find_regressions(
+    reports: list[PlanReport],
+    baseline: dict[str, list[dict[str, Any]]],
+    seq_scan_rows: int = DEFAULT_SEQ_SCAN_ROWS,
+) -> list[str]:
+    """
+    Compare plans with a baseline
+
+    A regression is a large sequential scan, a table scanned that the
+    baseline reached through an index, an index the baseline used that
+    is no longer used, or total cost growing past COST_REGRESSION_FACTOR.
+
+    Args:
+        reports: Current plans
+        baseline: Output of build_baseline() from a known-good run
+        seq_scan_rows: Rows a scan may read before it is flagged
+
+    Returns:
+        Human-readable regression descriptions (empty when plans are fine)
+    """
+    problems = []
+    by_query: dict[str, list[PlanReport]] = {}
+    for report in reports:
+        by_query.setdefault(report.query, []).append(report)
+
+    for query, current in by_query.items():
+        for report in current:
+            for scan in report.seq_scans:
+                if scan.rows >= seq_scan_rows:
+                    problems.append(
+                        f"{query}: Seq Scan on {scan.relation} read {scan.rows} rows"
+                    )
+
+        expected = baseline.get(query)
+        if expected is None:
+            continue
+        for index, (report, base) in enumerate(zip(current, expected)):
+            label = f"{query}[{index}]"
+            now = report.to_baseline()
+            for relation in set(now["seq_scan_relations"]) - set(base["seq_scan_relations"]):
+                problems.append(f"{label}: new Seq Scan on {relation}")
+            for missing in set(base["indexes"]) - set(now["indexes"]):
+                problems.append(f"{label}: no longer uses index {missing}")
+            if now["total_cost"] > base["total_cost"] * COST_REGRESSION_FACTOR:
+                problems.append(
+                    f"{label}: cost {now['total_cost']:.1f} vs baseline {base['total_cost']:.1f}"
+                )
+    return problems
+
+
+def build_baseline(reports: list[PlanReport]) -> dict[str, list[dict[str, Any]]]:
+    """Baseline document (JSON-serializable) for find_regressions()"""
+    baseline: dict[str, list[dict[str, Any]]] = {}
+    for report in reports:
+        baseline.setdefault(report.query, []).append(report.to_baseline())
+    return baseline
+
+
+HotQuery = Callable[[UnitOfWork], Awaitable[Any]]
+
+
+@dataclass
+class SeedIds:
+    """Sample keys from the seeded data, used to parameterize hot queries"""
+
+    user_id: str
+    report_id: str
+    stripe_payment_intent_id: str
+
+
+def build_hot_queries(ids: SeedIds) -> dict[str, HotQuery]:
+    """
+    The repository calls whose plans are checked
+
+    Args:
+        ids: Keys that exist in the seeded data
+
+    Returns:
+        Mapping of query name to a coroutine function taking a UnitOfWork
+    """
+    return {
+        "reports.find_by_id": lambda uow: uow.reports.find_by_id(ids.report_id),
+        "reports.find_by_user": lambda uow: uow.reports.find_by_user(ids.user_id, load_body=False),
+        "reports.list_summary_page_by_user": lambda uow: uow.reports.list_summary_page_by_user(
+            ids.user_id, limit=20
+        ),
+        "reports.expire_old_reports": lambda uow: uow.reports.expire_old_reports(),
+        "reports.delete_expired_reports": lambda uow: uow.reports.delete_expired_reports(),
+        "payments.find_by_stripe_payment_intent_id": lambda uow: (
+            uow.payments.find_by_stripe_payment_intent_id(ids.stripe_payment_intent_id)
+        ),
+        "payments.find_by_user": lambda uow: uow.payments.find_by_user(ids.user_id),
+    }
+
+
+async def analyze_queries(
+    adapter: DatabaseAdapter, queries: dict[str, HotQuery]
+) -> list[PlanReport]:
+    """
+    Run each hot query, then EXPLAIN (ANALYZE, BUFFERS) every statement it sent
+
+    All work (including the analyzed writes) is rolled back.
+
+    Args:
+        adapter: Adapter connected to the seeded database
+        queries: Output of build_hot_queries()
+
+    Returns:
+        One PlanReport per captured statement, in execution order
+    """
+    reports: list[PlanReport] = []
+    sync_engine = adapter.engine.sync_engine
+
+    for name, run in queries.items():
+        captured: list[tuple[str, Any]] = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith(_UNPLANNED):
+                return
+            # An executemany is planned once, with its first parameter set
+            captured.append((statement, parameters[0] if executemany else parameters))
+
+        async with adapter.unit_of_work() as uow:
+            event.listen(sync_engine, "before_cursor_execute", capture)
+            try:
+                async with uow.savepoint():
+                    await run(uow)
+            finally:
+                event.remove(sync_engine, "before_cursor_execute", capture)
+
+            connection = await uow.session.connection()
+            for statement, parameters in captured:
+                async with uow.savepoint():
+                    result = await connection.exec_driver_sql(
+                        f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters
+                    )
+                    reports.append(summarize_plan(name, statement, result.scalar_one()))
+            await uow.rollback()
+
+    return reports
+
+
+async def seed(
+    adapter: DatabaseAdapter,
+    users: int = 200,
+    reports_per_user: int = 50,
+    random_seed: int = 42,
+) -> SeedIds:
+    """
+    Load a deterministic dataset through COPY
+
+    Reports spread over ~180 days with a realistic status mix, so
+    retention queries have expired rows to find. Each completed report
+    has a succeeded payment.
+
+    Args:
+        adapter: Adapter for an empty, migrated database
+        users: Number of users
+        reports_per_user: Reports per user
+        random_seed: RNG seed (same seed, same data)
+
+    Returns:
+        Keys of one seeded user/report/payment
+    """
+    rng = random.Random(random_seed)
+    now = datetime.now(timezone.utc)
+    statuses = [ReportStatus.COMPLETED] * 7 + [
+        ReportStatus.EXPIRED,
+        ReportStatus.FAILED,
+        ReportStatus.GENERATING,
+    ]
+
+    user_rows, report_rows, payment_rows = [], [], []
+    for n in range(users):
+        user_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+        user_rows.append(
+            {
+                "user_id": user_id,
+                "clerk_user_id": f"user_seed_{n}",
+                "email": f"seed{n}@example.com",
+                "auth_provider": "email",
+            }
+        )
+        for _ in range(reports_per_user):
+            report_id = uuid.UUID(int=rng.getrandbits(128), version=4)
+            created_at = now - timedelta(minutes=rng.randrange(180 * 24 * 60))
+            status = rng.choice(statuses)
+            report_rows.append(
+                {
+                    "report_id": report_id,
+                    "user_id": user_id,
+                    "subject": f"Seed query {report_id.hex[:8]}",
+                    "status": status,
+                    "content": {"summary": "seed"} if status is ReportStatus.COMPLETED else None,
+                    "created_at": created_at,
+                    "expires_at": created_at + timedelta(days=30),
+                }
+            )
+            if status is ReportStatus.COMPLETED:
+                payment_rows.append(
+                    {
+                        "user_id": user_id,
+                        "report_id": report_id,
+                        "stripe_checkout_session_id": f"cs_seed_{report_id.hex}",
+                        "stripe_payment_intent_id": f"pi_seed_{report_id.hex}",
+                        "status": PaymentStatus.SUCCEEDED,
+                        "created_at": created_at,
+                    }
+                )
+
+    await UserRepository(adapter).copy_ingest(user_rows)
+    await ReportRepository(adapter).copy_ingest(report_rows)
+    await PaymentRepository(adapter).copy_ingest(payment_rows)
+    await adapter.execute_raw("ANALYZE users, reports, payments")
+
+    sample = payment_rows[0]
+    return SeedIds(
+        user_id=str(sample["user_id"]),
+        report_id=str(sample["report_id"]),
+        stripe_payment_intent_id=sample["stripe_payment_intent_id"],
+    )
+
+
+async def load_seed_ids(adapter: DatabaseAdapter) -> SeedIds:
+    """Pick sample keys from an already-seeded database"""
+    async with await adapter.get_session() as session:
+        row = (
+            await session.execute(
+                select(Payment.user_id, Payment.report_id, Payment.stripe_payment_intent_id)
+                .where(Payment.stripe_payment_intent_id.is_not(None))
+                .limit(1)
+            )
+        ).first()
+    if row is None:
+        raise ValueError("Database has no payments; run with --seed first")
+    return SeedIds(
+        user_id=str(row.user_id),
+        report_id=str(row.report_id),
+        stripe_payment_intent_id=row.stripe_payment_intent_id,
+    )
+
+
+def report_to_dict(report: PlanReport) -> dict[str, Any]:
+    """JSON-serializable form of a PlanReport"""
+    return asdict(report)
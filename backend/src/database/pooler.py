@@ -0,0 +1,119 @@
+"""
+Connection Pooler Compatibility
+
+Engine options for running asyncpg behind PgBouncer or the Supabase
+pooler (Supavisor).
+
+In transaction pooling mode, consecutive transactions from one client
+connection can run on different server connections, so asyncpg's
+named prepared statements (__asyncpg_stmt_1__, ...) collide or vanish.
+Modes:
+
+- direct / session: a server connection per client connection; keep
+  the prepared statement cache.
+- transaction: unique statement names, no client-side prepared
+  statement cache (each query is parsed by the server once per use).
+- transaction_prepared: the pooler tracks named prepared statements at
+  the protocol level (PgBouncer >= 1.21 with max_prepared_statements,
+  Supavisor); unique names and the prepared statement cache stay on.
+
+In every mode SQLAlchemy's compiled-statement LRU (query_cache_size)
+is kept, so SQL compilation is skipped for repeated queries even when
+server-side preparation is not.
+"""
+
+from enum import Enum
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy.engine import make_url
+
+# Supabase pooler hosts are <region>.pooler.supabase.com; 6543 is the
+# transaction-mode port, 5432 the session-mode port
+SUPABASE_POOLER_SUFFIX = ".pooler.supabase.com"
+TRANSACTION_POOLER_PORTS = (6543, 6432)  # Supavisor transaction mode, PgBouncer default
+
+DEFAULT_QUERY_CACHE_SIZE = 1200
+DEFAULT_PREPARED_STATEMENT_CACHE_SIZE = 100
+
+
+class PoolerMode(str, Enum):
+    """How the database is reached"""
+
+    AUTO = "auto"
+    DIRECT = "direct"
+    SESSION = "session"
+    TRANSACTION = "transaction"
+    TRANSACTION_PREPARED = "transaction_prepared"
+
+
+def detect_pooler_mode(database_url: str) -> PoolerMode:
+    """
+    Guess the pooling mode from the connection URL
+
+    Args:
+        database_url: Database connection string
+
+    Returns:
+        PoolerMode (never AUTO)
+    """
+    url = make_url(database_url)
+    host = url.host or ""
+    port = url.port or 5432
+
+    if host.endswith(SUPABASE_POOLER_SUFFIX):
+        return PoolerMode.TRANSACTION if port == 6543 else PoolerMode.SESSION
+    if port in TRANSACTION_POOLER_PORTS:
+        return PoolerMode.TRANSACTION
+    return PoolerMode.DIRECT
+
+
+def resolve_pooler_mode(database_url: str, mode: PoolerMode | str) -> PoolerMode:
+    """Configured mode, or the detected one for AUTO"""
+    mode = PoolerMode(mode)
+    if mode is PoolerMode.AUTO:
+        return detect_pooler_mode(database_url)
+    return mode
+
+
+def unique_statement_name() -> str:
+    """Server-side prepared statement name that cannot collide across clients"""
+    return f"__asyncpg_{uuid4().hex}__"
+
+
+def pooler_engine_options(
+    mode: PoolerMode,
+    query_cache_size: int = DEFAULT_QUERY_CACHE_SIZE,
+    prepared_statement_cache_size: int = DEFAULT_PREPARED_STATEMENT_CACHE_SIZE,
+) -> dict[str, Any]:
+    """
+    create_async_engine options for a pooling mode
+
+    Args:
+        mode: Resolved pooling mode (not AUTO)
+        query_cache_size: Size of SQLAlchemy's compiled-statement LRU
+        prepared_statement_cache_size: Per-connection prepared statement LRU
+            (ignored in transaction mode, where it must be off)
+
+    Returns:
+        Engine keyword arguments
+    """
+    options: dict[str, Any] = {"query_cache_size": query_cache_size}
+
+    if mode is PoolerMode.TRANSACTION:
+        options["connect_args"] = {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+            "prepared_statement_name_func": unique_statement_name,
+        }
+    elif mode is PoolerMode.TRANSACTION_PREPARED:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": prepared_statement_cache_size,
+            "prepared_statement_name_func": unique_statement_name,
+        }
+    elif prepared_statement_cache_size != DEFAULT_PREPARED_STATEMENT_CACHE_SIZE:
+        options["connect_args"] = {
+            "prepared_statement_cache_size": prepared_statement_cache_size
+        }
+
+    return options
@@ -0,0 +1,175 @@
+"""
+Read Replicas
+
+Routes read-only sessions to streaming replicas of the primary.
+
+- Replicas are picked round-robin among those currently healthy.
+- A background check measures replication lag and ejects replicas
+  that are unreachable or lag more than `max_lag_seconds`; they are
+  re-admitted once a later check sees them caught up.
+- Read-your-writes: after the current request (asyncio context) opens
+  a write session, its reads stay on the primary for `max_lag_seconds`,
+  by which time any replica still in rotation has replayed the write.
+"""
+
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any
+
+import structlog
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from database.engines import engine_registry
+from database.instrumentation import DEFAULT_SLOW_QUERY_MS, instrument_engine
+from database.telemetry import PoolTelemetry
+
+logger = structlog.get_logger()
+
+# Seconds since the last replayed transaction, or 0 when the replica has
+# replayed everything it received (an idle primary is not "lag")
+LAG_QUERY = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+_last_write: ContextVar[float | None] = ContextVar("database_last_write", default=None)
+
+
+def mark_write() -> None:
+    """Record that the current context used the primary for writing"""
+    _last_write.set(time.monotonic())
+
+
+def wrote_within(seconds: float) -> bool:
+    """Whether the current context wrote within the last `seconds`"""
+    last_write = _last_write.get()
+    return last_write is not None and time.monotonic() - last_write < seconds
+
+
+@dataclass
+class Replica:
+    """One read replica and its last observed health"""
+
+    url: str
+    engine: AsyncEngine
+    session_maker: async_sessionmaker
+    telemetry: PoolTelemetry
+    healthy: bool = True
+    lag_seconds: float | None = None
+
+
+class ReplicaSet:
+    """
+    Pool of read replicas with lag-based ejection
+
+    Args:
+        urls: Replica connection strings
+        engine_kwargs: Engine options (pool size, timeouts) shared with the primary
+        max_lag_seconds: Replicas lagging more than this are ejected
+        check_interval_seconds: Minimum time between health checks
+        check_timeout_seconds: Per-replica timeout for the lag query
+        slow_query_ms: Statements at or above this duration are logged as slow
+    """
+
+    def __init__(
+        self,
+        urls: list[str],
+        engine_kwargs: dict[str, Any] | None = None,
+        max_lag_seconds: float = 5.0,
+        check_interval_seconds: float = 5.0,
+        check_timeout_seconds: float = 2.0,
+        slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+    ):
+        self.max_lag_seconds = max_lag_seconds
+        self.check_interval_seconds = check_interval_seconds
+        self.check_timeout_seconds = check_timeout_seconds
+        self.replicas = [
+            self._create_replica(url, engine_kwargs or {}, slow_query_ms) for url in urls
+        ]
+        self._counter = itertools.count()
+        self._last_check: float | None = None
+        self._check_task: asyncio.Task | None = None
+
+    @staticmethod
+    def _create_replica(
+        url: str, engine_kwargs: dict[str, Any], slow_query_ms: float
+    ) -> Replica:
+        """Replica engine with the same query timing and pool telemetry as the primary"""
+        engine = engine_registry.get(url, **engine_kwargs)
+        instrument_engine(engine, slow_query_ms)
+        return Replica(
+            url=url,
+            engine=engine,
+            session_maker=async_sessionmaker(
+                engine, class_=AsyncSession, expire_on_commit=False
+            ),
+            telemetry=PoolTelemetry.attach(engine),
+        )
+
+    @property
+    def healthy(self) -> list[Replica]:
+        """Replicas currently in rotation"""
+        return [replica for replica in self.replicas if replica.healthy]
+
+    def pick(self) -> Replica | None:
+        """
+        Next healthy replica, round-robin
+
+        Schedules a background health check when the last one is stale.
+
+        Returns:
+            Replica, or None when every replica is ejected (use the primary)
+        """
+        self._schedule_check()
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def _schedule_check(self) -> None:
+        if self._check_task is not None and not self._check_task.done():
+            return
+        if (
+            self._last_check is not None
+            and time.monotonic() - self._last_check < self.check_interval_seconds
+        ):
+            return
+        self._check_task = asyncio.get_running_loop().create_task(self.check_health())
+
+    async def check_health(self) -> None:
+        """Measure lag on every replica and eject or re-admit accordingly"""
+        self._last_check = time.monotonic()
+        await asyncio.gather(*(self._check_replica(replica) for replica in self.replicas))
+
+    async def _check_replica(self, replica: Replica) -> None:
+        try:
+            async with replica.engine.connect() as conn:
+                result = await asyncio.wait_for(
+                    conn.execute(LAG_QUERY), timeout=self.check_timeout_seconds
+                )
+                lag = float(result.scalar_one())
+        except Exception as e:
+            lag = None
+            logger.warning("replica_check_failed", replica=replica.engine.url.host, error=str(e))
+
+        healthy = lag is not None and lag <= self.max_lag_seconds
+        if healthy != replica.healthy:
+            logger.warning(
+                "replica_readmitted" if healthy else "replica_ejected",
+                replica=replica.engine.url.host,
+                lag_seconds=lag,
+                max_lag_seconds=self.max_lag_seconds,
+            )
+        replica.healthy = healthy
+        replica.lag_seconds = lag
+
+    async def close(self) -> None:
+        """Stop health checks and release replica pools"""
+        if self._check_task is not None and not self._check_task.done():
+            self._check_task.cancel()
+        for replica in self.replicas:
+            await engine_registry.release(replica.engine)
@@ -18,6 +18,8 @@ class PaymentRepository(Repository[Payment]):
     Payments don't have soft delete (audit trail must be permanent).
     """
 
+    model = Payment
+
     def __init__(self, adapter: DatabaseAdapter):
         super().__init__(adapter)
 
@@ -32,9 +34,13 @@ class PaymentRepository(Repository[Payment]):
         Returns:
             Payment instance or None
         """
-        async with await self.adapter.get_session() as session:
+        cached = self._recall(id, include_deleted)
+        if cached is not None:
+            return cached
+
+        async with await self.adapter.get_read_session() as session:
             result = await session.execute(select(Payment).where(Payment.payment_id == id))
-            return result.scalar_one_or_none()
+            return self._remember(id, include_deleted, result.scalar_one_or_none())
 
     async def find_by_stripe_session_id(self, session_id: str) -> Payment | None:
         """
@@ -46,7 +52,7 @@ class PaymentRepository(Repository[Payment]):
         Returns:
             Payment instance or None
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             result = await session.execute(
                 select(Payment).where(Payment.stripe_checkout_session_id == session_id)
             )
@@ -62,7 +68,7 @@ class PaymentRepository(Repository[Payment]):
         Returns:
             Payment instance or None
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             result = await session.execute(
                 select(Payment).where(Payment.stripe_payment_intent_id == payment_intent_id)
             )
@@ -83,7 +89,7 @@ class PaymentRepository(Repository[Payment]):
         Returns:
             List of Payment instances
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             query = (
                 select(Payment)
                 .where(Payment.user_id == user_id)
@@ -109,7 +115,7 @@ class PaymentRepository(Repository[Payment]):
         Returns:
             List of Payment instances
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             query = select(Payment).offset(skip).limit(limit).order_by(Payment.created_at.desc())
 
             result = await session.execute(query)
@@ -132,30 +138,29 @@ class PaymentRepository(Repository[Payment]):
             await session.refresh(payment)
             return payment
 
-    async def update(self, id: str, data: dict[str, Any]) -> Payment | None:
+    async def update(
+        self, id: str, data: dict[str, Any], expected: dict[str, Any] | None = None
+    ) -> Payment | None:
         """
-        Update payment
+        Update payment with a single UPDATE ... RETURNING statement
 
         Args:
             id: Payment UUID
             data: Updated data dictionary
+            expected: Optional optimistic-concurrency check (column values
+                the row must still have)
 
         Returns:
             Updated Payment instance or None
-        """
-        async with await self.adapter.get_session() as session:
-            payment = await self.find_by_id(id)
-            if not payment:
-                return None
 
-            for key, value in data.items():
-                if hasattr(payment, key):
-                    setattr(payment, key, value)
+        Raises:
+            ConcurrentUpdateError: If `expected` no longer matches the stored row
+        """
+        values = self._column_values(data)
+        if not values:
+            return await self.find_by_id(id)
 
-            session.add(payment)
-            await session.commit()
-            await session.refresh(payment)
-            return payment
+        return await self._update_returning(id, values, expected=expected)
 
     async def soft_delete(self, id: str) -> Payment | None:
         """
@@ -7,8 +7,16 @@ Repository for Report model with soft delete support.
 from typing import Any
 from datetime import datetime
 from sqlalchemy import select
+from sqlalchemy.orm import defer
 from database.types import Repository, DatabaseAdapter
-from database.models.report import Report, ReportStatus
+from database.pagination import Page
+from database.models.report import (
+    REPORT_BODY_COLUMNS,
+    REPORT_SUMMARY_COLUMNS,
+    Report,
+    ReportStatus,
+    ReportSummary,
+)
 
 
 class ReportRepository(Repository[Report]):
@@ -19,6 +27,8 @@ class ReportRepository(Repository[Report]):
     Reports use expires_at for soft delete (status='expired').
     """
 
+    model = Report
+
     def __init__(self, adapter: DatabaseAdapter):
         super().__init__(adapter)
 
@@ -33,7 +43,11 @@ class ReportRepository(Repository[Report]):
         Returns:
             Report instance or None
         """
-        async with await self.adapter.get_session() as session:
+        cached = self._recall(id, include_deleted)
+        if cached is not None:
+            return cached
+
+        async with await self.adapter.get_read_session() as session:
             query = select(Report).where(Report.report_id == id)
 
             if not include_deleted:
@@ -41,10 +55,45 @@ class ReportRepository(Repository[Report]):
                 query = query.where(Report.status != ReportStatus.EXPIRED)
 
             result = await session.execute(query)
-            return result.scalar_one_or_none()
+            return self._remember(id, include_deleted, result.scalar_one_or_none())
+
+    def _not_deleted(self) -> list[Any]:
+        """Expired reports count as soft-deleted"""
+        return [Report.status != ReportStatus.EXPIRED]
+
+    async def find_page_by_user(
+        self,
+        user_id: str,
+        after: str | None = None,
+        limit: int = 50,
+        include_deleted: bool = False,
+    ) -> Page[Report]:
+        """
+        Find one page of a user's reports using keyset pagination
+
+        Args:
+            user_id: User UUID
+            after: Cursor from the previous page
+            limit: Maximum number of records to return
+            include_deleted: If True, include expired reports
+
+        Returns:
+            Page of Report instances, newest first
+        """
+        return await self.find_page(
+            after=after,
+            limit=limit,
+            include_deleted=include_deleted,
+            where=[Report.user_id == user_id],
+        )
 
     async def find_by_user(
-        self, user_id: str, skip: int = 0, limit: int = 100, include_deleted: bool = False
+        self,
+        user_id: str,
+        skip: int = 0,
+        limit: int = 100,
+        include_deleted: bool = False,
+        load_body: bool = True,
     ) -> list[Report]:
         """
         Find all reports for a user
@@ -54,13 +103,18 @@ class ReportRepository(Repository[Report]):
             skip: Number of records to skip
             limit: Maximum number of records to return
             include_deleted: If True, include expired reports
+            load_body: If False, defer the JSONB body columns (accessing
+                them on the returned instances raises instead of lazy-loading)
 
         Returns:
             List of Report instances
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             query = select(Report).where(Report.user_id == user_id)
 
+            if not load_body:
+                query = query.options(*self._defer_body())
+
             if not include_deleted:
                 query = query.where(Report.status != ReportStatus.EXPIRED)
 
@@ -70,7 +124,11 @@ class ReportRepository(Repository[Report]):
             return list(result.scalars().all())
 
     async def find_all(
-        self, skip: int = 0, limit: int = 100, include_deleted: bool = False
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        include_deleted: bool = False,
+        load_body: bool = True,
     ) -> list[Report]:
         """
         Find all reports with pagination
@@ -79,13 +137,17 @@ class ReportRepository(Repository[Report]):
             skip: Number of records to skip
             limit: Maximum number of records to return
             include_deleted: If True, include expired reports
+            load_body: If False, defer the JSONB body columns
 
         Returns:
             List of Report instances
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             query = select(Report)
 
+            if not load_body:
+                query = query.options(*self._defer_body())
+
             if not include_deleted:
                 query = query.where(Report.status != ReportStatus.EXPIRED)
 
@@ -94,6 +156,74 @@ class ReportRepository(Repository[Report]):
             result = await session.execute(query)
             return list(result.scalars().all())
 
+    async def list_summaries_by_user(
+        self, user_id: str, skip: int = 0, limit: int = 100, include_deleted: bool = False
+    ) -> list[ReportSummary]:
+        """
+        List compact report rows for a user (reports list view)
+
+        Selects only id, subject, status and dates, so no JSONB is
+        transferred or decoded.
+
+        Args:
+            user_id: User UUID
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            include_deleted: If True, include expired reports
+
+        Returns:
+            List of ReportSummary rows, newest first
+        """
+        async with await self.adapter.get_read_session() as session:
+            query = select(*REPORT_SUMMARY_COLUMNS).where(Report.user_id == user_id)
+
+            if not include_deleted:
+                query = query.where(Report.status != ReportStatus.EXPIRED)
+
+            query = query.offset(skip).limit(limit).order_by(Report.created_at.desc())
+
+            result = await session.execute(query)
+            return [ReportSummary(*row) for row in result.all()]
+
+    async def list_summary_page_by_user(
+        self,
+        user_id: str,
+        after: str | None = None,
+        limit: int = 50,
+        include_deleted: bool = False,
+    ) -> Page[ReportSummary]:
+        """
+        List one page of compact report rows for a user
+
+        Keyset-paginated projection backed by the partial index
+        idx_reports_user_created_active (user_id, created_at DESC, report_id DESC)
+        WHERE status <> 'expired'.
+
+        Args:
+            user_id: User UUID
+            after: Cursor from the previous page
+            limit: Maximum number of records to return
+            include_deleted: If True, include expired reports
+
+        Returns:
+            Page of ReportSummary rows, newest first
+        """
+        query = select(*REPORT_SUMMARY_COLUMNS).where(Report.user_id == user_id)
+
+        if not include_deleted:
+            query = query.where(*self._not_deleted())
+
+        query = self._keyset(query, after, limit)
+
+        async with await self.adapter.get_read_session() as session:
+            result = await session.execute(query)
+            return self._to_page([ReportSummary(*row) for row in result.all()], limit)
+
+    @staticmethod
+    def _defer_body() -> list[Any]:
+        """Loader options that skip the JSONB body columns"""
+        return [defer(column, raiseload=True) for column in REPORT_BODY_COLUMNS]
+
     async def create(self, data: dict[str, Any]) -> Report:
         """
         Create new report
@@ -111,30 +241,29 @@ class ReportRepository(Repository[Report]):
             await session.refresh(report)
             return report
 
-    async def update(self, id: str, data: dict[str, Any]) -> Report | None:
+    async def update(
+        self, id: str, data: dict[str, Any], expected: dict[str, Any] | None = None
+    ) -> Report | None:
         """
-        Update report
+        Update report with a single UPDATE ... RETURNING statement
 
         Args:
             id: Report UUID
             data: Updated data dictionary
+            expected: Optional optimistic-concurrency check, e.g.
+                {"status": ReportStatus.GENERATING} or {"updated_at": last_seen}
 
         Returns:
             Updated Report instance or None
-        """
-        async with await self.adapter.get_session() as session:
-            report = await self.find_by_id(id, include_deleted=True)
-            if not report:
-                return None
 
-            for key, value in data.items():
-                if hasattr(report, key):
-                    setattr(report, key, value)
+        Raises:
+            ConcurrentUpdateError: If `expected` no longer matches the stored row
+        """
+        values = self._column_values(data)
+        if not values:
+            return await self.find_by_id(id, include_deleted=True)
 
-            session.add(report)
-            await session.commit()
-            await session.refresh(report)
-            return report
+        return await self._update_returning(id, values, expected=expected)
 
     async def soft_delete(self, id: str) -> Report | None:
         """
@@ -158,30 +287,26 @@ class ReportRepository(Repository[Report]):
         Returns:
             True if deleted, False otherwise
         """
-        async with await self.adapter.get_session() as session:
-            report = await self.find_by_id(id, include_deleted=True)
-            if not report:
-                return False
-
-            await session.delete(report)
-            await session.commit()
-            return True
+        return await self._delete_returning(id)
 
     async def restore(self, id: str) -> Report | None:
         """
         Restore soft-deleted report (set status back to COMPLETED)
 
+        The EXPIRED guard is part of the UPDATE itself, so a report that is
+        not expired (or does not exist) is left untouched.
+
         Args:
             id: Report UUID
 
         Returns:
             Restored Report instance or None
         """
-        report = await self.find_by_id(id, include_deleted=True)
-        if not report or report.status != ReportStatus.EXPIRED:
-            return None
-
-        return await self.update(id, {"status": ReportStatus.COMPLETED})
+        return await self._update_returning(
+            id,
+            {"status": ReportStatus.COMPLETED},
+            where=[Report.status == ReportStatus.EXPIRED],
+        )
 
     async def expire_old_reports(self) -> int:
         """
@@ -190,6 +315,7 @@ class ReportRepository(Repository[Report]):
         Returns:
             Number of reports expired
         """
+        self._invalidate()
         async with await self.adapter.get_session() as session:
             query = (
                 select(Report)
@@ -229,6 +355,7 @@ class ReportRepository(Repository[Report]):
         """
         from datetime import timedelta
 
+        self._invalidate()
         async with await self.adapter.get_session() as session:
             # Calculate cutoff: 90 days before now
             # Reports expired 90 days ago should be deleted
@@ -18,6 +18,8 @@ class UserRepository(Repository[User]):
     Note: Users don't have soft delete, but we maintain consistency with interface.
     """
 
+    model = User
+
     def __init__(self, adapter: DatabaseAdapter):
         super().__init__(adapter)
 
@@ -32,9 +34,13 @@ class UserRepository(Repository[User]):
         Returns:
             User instance or None
         """
-        async with await self.adapter.get_session() as session:
+        cached = self._recall(id, include_deleted)
+        if cached is not None:
+            return cached
+
+        async with await self.adapter.get_read_session() as session:
             result = await session.execute(select(User).where(User.user_id == id))
-            return result.scalar_one_or_none()
+            return self._remember(id, include_deleted, result.scalar_one_or_none())
 
     async def find_by_clerk_id(self, clerk_user_id: str) -> User | None:
         """
@@ -46,7 +52,7 @@ class UserRepository(Repository[User]):
         Returns:
             User instance or None
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             result = await session.execute(select(User).where(User.clerk_user_id == clerk_user_id))
             return result.scalar_one_or_none()
 
@@ -60,7 +66,7 @@ class UserRepository(Repository[User]):
         Returns:
             User instance or None
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             result = await session.execute(select(User).where(User.email == email))
             return result.scalar_one_or_none()
 
@@ -78,7 +84,7 @@ class UserRepository(Repository[User]):
         Returns:
             List of User instances
         """
-        async with await self.adapter.get_session() as session:
+        async with await self.adapter.get_read_session() as session:
             result = await session.execute(select(User).offset(skip).limit(limit))
             return list(result.scalars().all())
 
@@ -99,30 +105,29 @@ class UserRepository(Repository[User]):
             await session.refresh(user)
             return user
 
-    async def update(self, id: str, data: dict[str, Any]) -> User | None:
+    async def update(
+        self, id: str, data: dict[str, Any], expected: dict[str, Any] | None = None
+    ) -> User | None:
         """
-        Update user
+        Update user with a single UPDATE ... RETURNING statement
 
         Args:
             id: User UUID
             data: Updated data dictionary
+            expected: Optional optimistic-concurrency check (column values
+                the row must still have)
 
         Returns:
             Updated User instance or None
-        """
-        async with await self.adapter.get_session() as session:
-            user = await self.find_by_id(id)
-            if not user:
-                return None
 
-            for key, value in data.items():
-                if hasattr(user, key):
-                    setattr(user, key, value)
+        Raises:
+            ConcurrentUpdateError: If `expected` no longer matches the stored row
+        """
+        values = self._column_values(data)
+        if not values:
+            return await self.find_by_id(id)
 
-            session.add(user)
-            await session.commit()
-            await session.refresh(user)
-            return user
+        return await self._update_returning(id, values, expected=expected)
 
     async def soft_delete(self, id: str) -> User | None:
         """
@@ -147,14 +152,7 @@ class UserRepository(Repository[User]):
         Returns:
             True if deleted, False otherwise
         """
-        async with await self.adapter.get_session() as session:
-            user = await self.find_by_id(id)
-            if not user:
-                return False
-
-            await session.delete(user)
-            await session.commit()
-            return True
+        return await self._delete_returning(id)
 
     async def restore(self, id: str) -> User | None:
         """
@@ -0,0 +1,265 @@
+"""
+Connection Pool Telemetry
+
+Pool statistics gathered from SQLAlchemy pool events, plus a cached
+SELECT 1 liveness probe for health checks.
+
+- Checked-out, idle and overflow connections (read from the pool)
+- Checkout wait time histogram and checkout timeouts
+- Connection age and recycle/reconnect counts
+- Saturation: every connection, including overflow, is checked out
+"""
+
+import asyncio
+import bisect
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import structlog
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = structlog.get_logger()
+
+# Upper bounds (ms) of the checkout wait histogram buckets; the last bucket is +Inf
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Fraction of pool capacity in use at which the pool counts as under pressure
+PRESSURE_THRESHOLD = 0.9
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """
+    Async queue pool that reports how long each checkout waited
+
+    Pass as `poolclass` to create_async_engine; PoolTelemetry attaches
+    itself to receive the timings.
+    """
+
+    telemetry: "PoolTelemetry | None" = None
+
+    def connect(self) -> Any:
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            if self.telemetry is not None:
+                self.telemetry.timeouts += 1
+            raise
+        finally:
+            if self.telemetry is not None:
+                self.telemetry.record_wait((time.perf_counter() - start) * 1000)
+
+    def recreate(self) -> "InstrumentedQueuePool":
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        return pool
+
+
+@dataclass
+class PoolStats:
+    """Point-in-time pool snapshot"""
+
+    size: int
+    max_overflow: int
+    checked_out: int
+    idle: int
+    overflow: int
+    utilization: float
+    saturated: bool
+    checkouts: int
+    timeouts: int
+    connects: int
+    recycles: int
+    oldest_connection_age_s: float | None
+    wait_histogram_ms: dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of a liveness probe"""
+
+    ok: bool
+    rtt_ms: float | None
+    checked_at: float
+    error: str | None = None
+    cached: bool = False
+
+
+class PoolTelemetry:
+    """
+    Collects pool statistics for one engine
+
+    Args:
+        engine: Engine created with poolclass=InstrumentedQueuePool (other
+            pool classes still get event-based counts, but no wait times)
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.recycles = 0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+        self._connected_at: dict[int, float] = {}
+        self._saturated = False
+
+        pool = engine.sync_engine.pool
+        if isinstance(pool, InstrumentedQueuePool):
+            pool.telemetry = self
+
+        # Listening on the engine keeps the handlers across pool recreation
+        target = engine.sync_engine
+        event.listen(target, "connect", self._on_connect)
+        event.listen(target, "checkout", self._on_checkout)
+        event.listen(target, "close", self._on_close)
+
+    @classmethod
+    def attach(cls, engine: AsyncEngine) -> "PoolTelemetry":
+        """
+        Telemetry for `engine`, reusing the existing collector if the engine
+        is shared (see database.engines) and already instrumented
+        """
+        pool = engine.sync_engine.pool
+        existing = getattr(pool, "telemetry", None)
+        if existing is not None:
+            return existing
+        return cls(engine)
+
+    def record_wait(self, wait_ms: float) -> None:
+        """Add one checkout wait to the histogram"""
+        self.wait_buckets[bisect.bisect_left(WAIT_BUCKETS_MS, wait_ms)] += 1
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.connects += 1
+        # record_info outlives the DBAPI connection, so a second connect on
+        # the same record means it was recycled or replaced after an error
+        if connection_record.record_info.get("connected_once"):
+            self.recycles += 1
+        connection_record.record_info["connected_once"] = True
+        self._connected_at[id(connection_record)] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, proxy: Any) -> None:
+        self.checkouts += 1
+        stats = self.stats()
+        if stats is None:
+            return
+        if stats.saturated and not self._saturated:
+            logger.warning(
+                "database_pool_saturated",
+                checked_out=stats.checked_out,
+                size=stats.size,
+                max_overflow=stats.max_overflow,
+            )
+        self._saturated = stats.saturated
+
+    def _on_close(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self._connected_at.pop(id(connection_record), None)
+
+    def stats(self) -> PoolStats | None:
+        """
+        Current pool snapshot
+
+        Returns:
+            PoolStats, or None for pools without a fixed size (e.g. NullPool)
+        """
+        pool = self.engine.sync_engine.pool
+        if not hasattr(pool, "checkedout"):
+            return None
+
+        size = pool.size()
+        max_overflow = pool._max_overflow
+        checked_out = pool.checkedout()
+        capacity = size + max(max_overflow, 0)
+        now = time.monotonic()
+        labels = [f"le_{bound}" for bound in WAIT_BUCKETS_MS] + ["le_inf"]
+
+        return PoolStats(
+            size=size,
+            max_overflow=max_overflow,
+            checked_out=checked_out,
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+            utilization=round(checked_out / capacity, 3) if capacity else 0.0,
+            saturated=max_overflow > -1 and checked_out >= capacity,
+            checkouts=self.checkouts,
+            timeouts=self.timeouts,
+            connects=self.connects,
+            recycles=self.recycles,
+            oldest_connection_age_s=(
+                round(now - min(self._connected_at.values()), 1)
+                if self._connected_at
+                else None
+            ),
+            wait_histogram_ms=dict(zip(labels, self.wait_buckets)),
+        )
+
+
+class LivenessProbe:
+    """
+    Cached SELECT 1 round trip
+
+    Health endpoints are polled often; the result is reused for `ttl_seconds`
+    and concurrent callers share one in-flight probe.
+
+    Args:
+        engine: Engine to probe
+        ttl_seconds: How long a result is reused
+        timeout_seconds: Probe timeout (counts as down)
+    """
+
+    def __init__(self, engine: AsyncEngine, ttl_seconds: float = 5.0, timeout_seconds: float = 2.0):
+        self.engine = engine
+        self.ttl_seconds = ttl_seconds
+        self.timeout_seconds = timeout_seconds
+        self._result: ProbeResult | None = None
+        self._lock = asyncio.Lock()
+
+    def _fresh(self) -> ProbeResult | None:
+        result = self._result
+        if result is not None and time.monotonic() - result.checked_at < self.ttl_seconds:
+            return ProbeResult(**{**asdict(result), "cached": True})
+        return None
+
+    async def check(self) -> ProbeResult:
+        """
+        Run (or reuse) the probe
+
+        Returns:
+            ProbeResult with measured round-trip time
+        """
+        cached = self._fresh()
+        if cached is not None:
+            return cached
+
+        async with self._lock:
+            cached = self._fresh()
+            if cached is not None:
+                return cached
+
+            start = time.perf_counter()
+            try:
+                # The timeout covers pool checkout too, so a saturated pool
+                # reports down instead of hanging the health check
+                await asyncio.wait_for(self._select_one(), timeout=self.timeout_seconds)
+                result = ProbeResult(
+                    ok=True,
+                    rtt_ms=round((time.perf_counter() - start) * 1000, 2),
+                    checked_at=time.monotonic(),
+                )
+            except Exception as e:
+                result = ProbeResult(
+                    ok=False, rtt_ms=None, checked_at=time.monotonic(), error=str(e)
+                )
+            self._result = result
+            return result
+
+    async def _select_one(self) -> None:
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
@@ -5,34 +5,215 @@ Type definitions and abstract base classes for database operations.
 """
 
 from abc import ABC, abstractmethod
-from typing import Any, Generic, TypeVar
-from sqlalchemy.ext.asyncio import AsyncSession
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Any, ClassVar, Generic, TypeVar
+from sqlalchemy import (
+    Select,
+    any_,
+    bindparam,
+    delete,
+    insert,
+    inspect,
+    literal,
+    select,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from database.engines import engine_registry
+from database.identity_map import current_identity_map
+from database.instrumentation import DEFAULT_SLOW_QUERY_MS, instrument_engine
+from database.pagination import InvalidCursorError, Page, decode_cursor, encode_cursor
+from database.replicas import ReplicaSet, mark_write, wrote_within
+from database.telemetry import LivenessProbe, PoolStats, PoolTelemetry, ProbeResult
+
+if TYPE_CHECKING:
+    from database.unit_of_work import UnitOfWork
 
 T = TypeVar("T")
 
 
+class ConcurrentUpdateError(Exception):
+    """
+    Raised when an optimistic-concurrency check fails
+
+    The row exists but no longer matches the expected column values,
+    meaning another writer changed it since it was read.
+    """
+
+    def __init__(self, entity: str, id: str, expected: dict[str, Any]):
+        self.entity = entity
+        self.id = id
+        self.expected = expected
+        super().__init__(f"{entity} {id} was modified concurrently (expected {expected})")
+
+
 class DatabaseAdapter(ABC):
     """
     Abstract Database Adapter
 
-    Defines interface for database connections.
-    Implementations: PostgreSQL, Supabase
+    Owns the primary engine, read replicas, pool telemetry and session
+    routing. Implementations (PostgreSQL, Supabase) only build the
+    connection URL and engine options, then call `_connect`.
     """
 
+    engine: AsyncEngine
+    session_maker: async_sessionmaker
+    telemetry: PoolTelemetry
+    probe: LivenessProbe
+    replicas: ReplicaSet | None
+
     @abstractmethod
+    def __init__(self, database_url: str, **options: Any) -> None:
+        """Build engine options for this backend and call `_connect`"""
+
+    def _connect(
+        self,
+        database_url: str,
+        engine_kwargs: dict[str, Any],
+        replica_urls: list[str] | None = None,
+        max_replica_lag_seconds: float = 5.0,
+        slow_query_ms: float = DEFAULT_SLOW_QUERY_MS,
+    ) -> None:
+        """
+        Attach to the shared engine for `database_url` and its replicas
+
+        Args:
+            database_url: Primary connection string
+            engine_kwargs: create_async_engine options (also used for replicas)
+            replica_urls: Read replica connection strings (reads use the primary if empty)
+            max_replica_lag_seconds: Replication lag beyond which a replica is ejected
+            slow_query_ms: Statements at or above this duration are logged as slow
+        """
+        self.database_url = database_url
+        self.engine = engine_registry.get(database_url, **engine_kwargs)
+        self.session_maker = async_sessionmaker(
+            self.engine, class_=AsyncSession, expire_on_commit=False
+        )
+        instrument_engine(self.engine, slow_query_ms)
+        self.telemetry = PoolTelemetry.attach(self.engine)
+        self.probe = LivenessProbe(self.engine)
+        self.replicas = (
+            ReplicaSet(
+                replica_urls,
+                engine_kwargs,
+                max_lag_seconds=max_replica_lag_seconds,
+                slow_query_ms=slow_query_ms,
+            )
+            if replica_urls
+            else None
+        )
+
     async def get_session(self) -> AsyncSession:
-        """Get database session"""
-        pass
+        """
+        Get database session on the primary
+
+        Inside a unit of work this is the shared unit-of-work session.
+        Otherwise the current request's reads stick to the primary for a
+        while afterwards (read-your-writes).
+
+        Returns:
+            AsyncSession instance
+        """
+        from database.unit_of_work import current_session
+
+        shared = current_session(self)
+        if shared is not None:
+            return shared
+        mark_write()
+        return self.session_maker()
+
+    async def get_read_session(self) -> AsyncSession:
+        """
+        Get session for read-only queries
+
+        Uses a healthy replica, unless this request wrote recently
+        (read-your-writes), a unit of work is active, or no replica is
+        in rotation.
+
+        Returns:
+            AsyncSession instance
+        """
+        from database.unit_of_work import current_session
+
+        shared = current_session(self)
+        if shared is not None:
+            return shared
+        if self.replicas is not None and not wrote_within(self.replicas.max_lag_seconds):
+            replica = self.replicas.pick()
+            if replica is not None:
+                return replica.session_maker()
+        return self.session_maker()
+
+    async def warm_up(self, min_size: int) -> int:
+        """
+        Pre-open connections on the primary pool
+
+        Args:
+            min_size: Connections to open
+
+        Returns:
+            Number of connections opened
+        """
+        return await engine_registry.warm_up(self.engine, min_size)
+
+    async def ping(self) -> ProbeResult:
+        """
+        Liveness probe (SELECT 1), cached for a few seconds
+
+        Returns:
+            ProbeResult with round-trip time
+        """
+        return await self.probe.check()
+
+    def pool_stats(self) -> PoolStats | None:
+        """
+        Primary connection pool snapshot
+
+        Returns:
+            PoolStats instance
+        """
+        return self.telemetry.stats()
 
-    @abstractmethod
     async def close(self) -> None:
-        """Close database connection"""
-        pass
+        """
+        Release this adapter's engines
+
+        Pools are shared through the engine registry, so they are only
+        disposed once no other adapter holds them.
+        """
+        if self.replicas is not None:
+            await self.replicas.close()
+        await engine_registry.release(self.engine)
 
-    @abstractmethod
     async def execute_raw(self, query: str, params: dict[str, Any] | None = None) -> Any:
-        """Execute raw SQL query"""
-        pass
+        """
+        Execute raw SQL query
+
+        Args:
+            query: SQL query string
+            params: Query parameters
+
+        Returns:
+            Query result
+        """
+        async with self.session_maker() as session:
+            result = await session.execute(text(query), params or {})
+            await session.commit()
+            return result
+
+    def unit_of_work(self) -> "UnitOfWork":
+        """
+        Start a unit of work: one session and transaction for all repositories
+
+        Returns:
+            UnitOfWork to use as an async context manager
+        """
+        from database.unit_of_work import UnitOfWork
+
+        return UnitOfWork(self)
 
 
 class Repository(ABC, Generic[T]):
@@ -40,12 +221,346 @@ class Repository(ABC, Generic[T]):
     Abstract Repository Pattern
 
     Provides common CRUD operations with soft delete support.
-    Subclass this for specific entity repositories.
+    Subclass this for specific entity repositories and set `model`
+    to the mapped SQLAlchemy class.
     """
 
+    model: ClassVar[type[Any]]
+
     def __init__(self, adapter: DatabaseAdapter):
         self.adapter = adapter
 
+    @property
+    def _pk(self) -> Any:
+        """Primary key column of the mapped model"""
+        return inspect(self.model).primary_key[0]
+
+    def _column_values(self, data: dict[str, Any]) -> dict[str, Any]:
+        """Keep only keys that map to model attributes (unknown keys are ignored)"""
+        attrs = inspect(self.model).column_attrs.keys()
+        return {key: value for key, value in data.items() if key in attrs}
+
+    def _not_deleted(self) -> list[Any]:
+        """Filter clauses that exclude soft-deleted rows (none by default)"""
+        return []
+
+    def _recall(self, id: Any, include_deleted: bool) -> T | None:
+        """Entity already loaded by primary key in this request, if any"""
+        identity_map = current_identity_map()
+        if identity_map is None:
+            return None
+        return identity_map.get(self.model, id, include_deleted)
+
+    def _remember(self, id: Any, include_deleted: bool, entity: T | None) -> T | None:
+        """Cache a primary-key lookup for the rest of the request; returns `entity`"""
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            identity_map.add(self.model, id, include_deleted, entity)
+        return entity
+
+    def _invalidate(self, id: Any | None = None) -> None:
+        """Drop cached lookups of one row (or all rows when `id` is None) before a write"""
+        identity_map = current_identity_map()
+        if identity_map is not None:
+            identity_map.invalidate(self.model, id)
+
+    def _keyset(self, query: Select, after: str | None, limit: int) -> Select:
+        """
+        Apply (created_at, id) keyset pagination to a query
+
+        Newest first. Fetches one extra row so the caller can tell whether
+        another page exists. Cost is the same for every page because the
+        cursor seeks straight to its position instead of skipping rows.
+
+        Args:
+            query: Entity or column-projection select on `model`
+            after: Cursor of the last row of the previous page
+            limit: Page size
+
+        Raises:
+            InvalidCursorError: If `after` is malformed
+        """
+        created_at = self.model.created_at
+        if after is not None:
+            after_created_at, after_id = decode_cursor(after)
+            try:
+                after_pk = self._pk.type.python_type(after_id)
+            except ValueError as e:
+                raise InvalidCursorError(f"Invalid pagination cursor: {after!r}") from e
+            position = tuple_(
+                literal(after_created_at, created_at.type), literal(after_pk, self._pk.type)
+            )
+            query = query.where(tuple_(created_at, self._pk) < position)
+        return query.order_by(created_at.desc(), self._pk.desc()).limit(limit + 1)
+
+    def _to_page(self, rows: list[Any], limit: int) -> Page[Any]:
+        """Trim the look-ahead row and build the next cursor from the last item"""
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = encode_cursor(last.created_at, getattr(last, self._pk.key))
+        return Page(items=items, next_cursor=next_cursor)
+
+    async def find_page(
+        self,
+        after: str | None = None,
+        limit: int = 50,
+        include_deleted: bool = False,
+        where: list[Any] | None = None,
+    ) -> Page[T]:
+        """
+        Find one page of entities using keyset pagination
+
+        Args:
+            after: Opaque cursor from the previous page (None for the first page)
+            limit: Maximum number of records to return
+            include_deleted: If True, include soft-deleted records
+            where: Extra filter clauses (e.g. ownership)
+
+        Returns:
+            Page with items (newest first) and next_cursor
+
+        Raises:
+            InvalidCursorError: If `after` is malformed
+        """
+        query = select(self.model)
+        for clause in where or []:
+            query = query.where(clause)
+        if not include_deleted:
+            for clause in self._not_deleted():
+                query = query.where(clause)
+        query = self._keyset(query, after, limit)
+
+        async with await self.adapter.get_read_session() as session:
+            result = await session.execute(query)
+            return self._to_page(list(result.scalars().all()), limit)
+
+    async def find_many_by_ids(
+        self, ids: Iterable[str], include_deleted: bool = False
+    ) -> list[T]:
+        """
+        Find entities by primary key in one round trip
+
+        Binds all IDs as a single array parameter (pk = ANY($1)), so the
+        statement text is identical for any number of IDs and stays cached.
+
+        Args:
+            ids: Primary key values
+            include_deleted: If True, include soft-deleted records
+
+        Returns:
+            Found entities (missing IDs are skipped; order is not guaranteed)
+        """
+        pk_type = self._pk.type
+        values = [pk_type.python_type(id) if isinstance(id, str) else id for id in ids]
+        if not values:
+            return []
+
+        query = select(self.model).where(
+            self._pk == any_(bindparam("ids", values, type_=ARRAY(pk_type)))
+        )
+        if not include_deleted:
+            for clause in self._not_deleted():
+                query = query.where(clause)
+
+        async with await self.adapter.get_read_session() as session:
+            result = await session.execute(query)
+            return list(result.scalars().all())
+
+    async def bulk_create(self, rows: list[dict[str, Any]]) -> list[T]:
+        """
+        Insert many entities in one transaction
+
+        Uses multi-row INSERT ... VALUES ... RETURNING batches (SQLAlchemy
+        "insertmanyvalues") rather than one INSERT per row. Python-side
+        column defaults (UUIDs, expires_at) are applied as for create().
+
+        Args:
+            rows: Entity data dictionaries
+
+        Returns:
+            Created entities
+        """
+        values = [self._column_values(row) for row in rows]
+        if not values:
+            return []
+
+        async with await self.adapter.get_session() as session:
+            result = await session.execute(insert(self.model).returning(self.model), values)
+            entities = list(result.scalars().all())
+            await session.commit()
+            return entities
+
+    async def bulk_update(self, rows: list[dict[str, Any]]) -> None:
+        """
+        Update many entities by primary key in one transaction
+
+        Each row must contain the primary key plus the columns to set.
+        Rows are sent as a single executemany UPDATE ... WHERE pk = $n.
+
+        Args:
+            rows: Dictionaries with the primary key and changed columns
+
+        Raises:
+            ValueError: If a row is missing the primary key
+        """
+        pk_key = self._pk.key
+        values = []
+        for row in rows:
+            if pk_key not in row:
+                raise ValueError(f"bulk_update row is missing primary key '{pk_key}'")
+            values.append(self._column_values(row))
+        if not values:
+            return
+
+        for row in values:
+            self._invalidate(row[pk_key])
+        async with await self.adapter.get_session() as session:
+            await session.execute(update(self.model), values)
+            await session.commit()
+
+    async def copy_ingest(self, rows: Iterable[dict[str, Any]]) -> int:
+        """
+        Stream rows into the table with PostgreSQL COPY (asyncpg binary protocol)
+
+        For large backfills (e.g. migrating reports out of Supabase). Far
+        faster than INSERT because there is no per-row statement, but it
+        bypasses the ORM: no RETURNING, no onupdate hooks, and conflicts
+        abort the whole batch. Python-side defaults are still filled in.
+
+        All rows should share the same keys; a key missing from one row
+        is written as NULL.
+
+        Args:
+            rows: Entity data dictionaries (attribute names, as for create())
+
+        Returns:
+            Number of rows copied
+
+        Raises:
+            RuntimeError: If the adapter is not backed by asyncpg
+        """
+        mapper = inspect(self.model)
+        records = [self._column_values(row) for row in rows]
+        if not records:
+            return 0
+
+        keys = list(dict.fromkeys(key for record in records for key in record))
+        for attr in mapper.column_attrs:
+            default = attr.columns[0].default
+            if attr.key not in keys and default is not None and not default.is_sequence:
+                keys.append(attr.key)
+
+        async with await self.adapter.get_session() as session:
+            connection = await session.connection()
+            dialect = connection.dialect
+            if dialect.driver != "asyncpg":
+                raise RuntimeError(f"COPY ingest requires asyncpg, got {dialect.driver}")
+
+            columns = [mapper.column_attrs[key].columns[0] for key in keys]
+            processors = [
+                column.type.dialect_impl(dialect).bind_processor(dialect) for column in columns
+            ]
+
+            def to_record(record: dict[str, Any]) -> tuple[Any, ...]:
+                values = []
+                for key, column, process in zip(keys, columns, processors):
+                    if key in record:
+                        value = record[key]
+                    elif column.default is not None:
+                        default = column.default
+                        value = default.arg(None) if default.is_callable else default.arg
+                    else:
+                        value = None
+                    values.append(process(value) if process and value is not None else value)
+                return tuple(values)
+
+            raw = await connection.get_raw_connection()
+            status = await raw.driver_connection.copy_records_to_table(
+                self.model.__table__.name,
+                records=[to_record(record) for record in records],
+                columns=[column.name for column in columns],
+            )
+            await session.commit()
+
+        # asyncpg returns the command tag, e.g. "COPY 5000"
+        return int(status.split()[-1])
+
+    async def _update_returning(
+        self,
+        id: str,
+        values: dict[str, Any],
+        where: list[Any] | None = None,
+        expected: dict[str, Any] | None = None,
+    ) -> T | None:
+        """
+        Update a row with a single UPDATE ... RETURNING statement
+
+        Replaces the read-modify-write pattern (find_by_id, mutate, commit,
+        refresh) with one round trip on one pooled connection.
+
+        Args:
+            id: Primary key value
+            values: Column values to set
+            where: Extra filter clauses (e.g. status guards)
+            expected: Optimistic-concurrency check; column values the row
+                must still have for the update to apply
+
+        Returns:
+            Updated entity or None if no row matched
+
+        Raises:
+            ConcurrentUpdateError: If `expected` was given and the row exists
+                but no longer matches it
+        """
+        stmt = update(self.model).where(self._pk == id)
+        for clause in where or []:
+            stmt = stmt.where(clause)
+        for key, value in (expected or {}).items():
+            stmt = stmt.where(getattr(self.model, key) == value)
+        stmt = (
+            stmt.values(**values)
+            .returning(self.model)
+            .execution_options(synchronize_session=False)
+        )
+
+        self._invalidate(id)
+        async with await self.adapter.get_session() as session:
+            result = await session.execute(stmt)
+            entity = result.scalar_one_or_none()
+            await session.commit()
+
+        if entity is None and expected:
+            # Only the failure path pays for a second lookup
+            if await self.find_by_id(id, include_deleted=True) is not None:
+                raise ConcurrentUpdateError(self.model.__name__, id, expected)
+        return entity
+
+    async def _delete_returning(self, id: str) -> bool:
+        """
+        Delete a row with a single DELETE ... RETURNING statement
+
+        Args:
+            id: Primary key value
+
+        Returns:
+            True if a row was deleted, False otherwise
+        """
+        stmt = (
+            delete(self.model)
+            .where(self._pk == id)
+            .returning(self._pk)
+            .execution_options(synchronize_session=False)
+        )
+
+        self._invalidate(id)
+        async with await self.adapter.get_session() as session:
+            result = await session.execute(stmt)
+            deleted_id = result.scalar_one_or_none()
+            await session.commit()
+        return deleted_id is not None
+
     @abstractmethod
     async def find_by_id(self, id: str, include_deleted: bool = False) -> T | None:
         """Find entity by ID"""
@@ -64,8 +579,10 @@ class Repository(ABC, Generic[T]):
         pass
 
     @abstractmethod
-    async def update(self, id: str, data: dict[str, Any]) -> T | None:
-        """Update entity"""
+    async def update(
+        self, id: str, data: dict[str, Any], expected: dict[str, Any] | None = None
+    ) -> T | None:
+        """Update entity (optionally only if it still matches `expected`)"""
         pass
 
     @abstractmethod
@@ -0,0 +1,146 @@
+"""
+Unit of Work
+
+Runs several repository operations in one session and one transaction.
+
+Repository methods normally open their own session and commit on their
+own. Inside a UnitOfWork the adapter hands every repository the same
+session instead; a repository's commit() becomes a flush, and the real
+commit happens once when the block exits (or rolls back on error).
+
+Usage:
+    async with adapter.unit_of_work() as uow:
+        report = await uow.reports.create({...})
+        await uow.payments.create({"report_id": report.report_id, ...})
+
+        async with uow.savepoint():
+            ...  # rolled back on its own if it raises
+"""
+
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.identity_map import current_identity_map
+from database.types import DatabaseAdapter
+from database.repositories import PaymentRepository, ReportRepository, UserRepository
+
+_current: ContextVar["UnitOfWork | None"] = ContextVar("unit_of_work", default=None)
+
+
+def current_session(adapter: DatabaseAdapter) -> "UnitOfWorkSession | None":
+    """
+    Session of the unit of work active for this adapter, if any
+
+    Adapters call this from get_session() so repositories join an
+    enclosing unit of work without knowing about it.
+    """
+    uow = _current.get()
+    if uow is None or uow.adapter is not adapter or uow._session is None:
+        return None
+    return uow._session
+
+
+class UnitOfWorkSession:
+    """
+    Shared session handed to repositories inside a unit of work
+
+    Delegates to the real AsyncSession, except that entering/exiting it
+    does not close the session and commit() only flushes.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self._session = session
+
+    async def __aenter__(self) -> "UnitOfWorkSession":
+        return self
+
+    async def __aexit__(self, *exc: Any) -> None:
+        return None
+
+    async def commit(self) -> None:
+        """Flush pending changes; the unit of work commits on exit"""
+        await self._session.flush()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._session, name)
+
+
+class UnitOfWork:
+    """
+    One session and one transaction shared across repositories
+
+    The unit of work is bound to the current asyncio context, so it must
+    not be shared between concurrently running tasks (an AsyncSession is
+    not safe for concurrent use).
+    """
+
+    def __init__(self, adapter: DatabaseAdapter):
+        self.adapter = adapter
+        self._session: UnitOfWorkSession | None = None
+        self._token: Token | None = None
+        self.users = UserRepository(adapter)
+        self.reports = ReportRepository(adapter)
+        self.payments = PaymentRepository(adapter)
+
+    @property
+    def session(self) -> AsyncSession:
+        """Underlying session (only valid inside the `async with` block)"""
+        if self._session is None:
+            raise RuntimeError("UnitOfWork is not active")
+        return self._session._session
+
+    async def __aenter__(self) -> "UnitOfWork":
+        if current_session(self.adapter) is not None:
+            raise RuntimeError("UnitOfWork is already active; use savepoint() to nest")
+        self._session = UnitOfWorkSession(await self.adapter.get_session())
+        self._token = _current.set(self)
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        session = self.session
+        try:
+            if exc_type is None:
+                await session.commit()
+            else:
+                await session.rollback()
+                _forget_uncommitted()
+        finally:
+            _current.reset(self._token)
+            self._token = None
+            self._session = None
+            await session.close()
+
+    async def commit(self) -> None:
+        """Commit now; later work in the block runs in a new transaction"""
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        """Roll back everything since the last commit"""
+        await self.session.rollback()
+        _forget_uncommitted()
+
+    @asynccontextmanager
+    async def savepoint(self) -> AsyncIterator[None]:
+        """
+        Nested transaction (SAVEPOINT)
+
+        Rolls back only the work inside the block if it raises, then
+        re-raises; the outer unit of work can catch and carry on.
+        """
+        try:
+            async with self.session.begin_nested():
+                yield
+        except BaseException:
+            _forget_uncommitted()
+            raise
+
+
+def _forget_uncommitted() -> None:
+    """Entities cached during a rolled-back transaction may hold values that never committed"""
+    identity_map = current_identity_map()
+    if identity_map is not None:
+        identity_map.clear()
@@ -27,6 +27,16 @@ def get_correlation_id() -> str:
     return correlation_id
 
 
+def current_correlation_id() -> Optional[str]:
+    """
+    Get current correlation ID without generating one
+
+    Returns:
+        Current correlation ID or None outside a correlated context
+    """
+    return _correlation_id_var.get()
+
+
 def set_correlation_id(correlation_id: str) -> None:
     """
     Set correlation ID for current context
@@ -4,23 +4,29 @@ FastAPI application entry point
 Integrates all modules: configuration, feature flags, database, and logging.
 """
 
-import uuid
-import structlog
 from contextlib import asynccontextmanager
+from dataclasses import replace
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
 
 from config.loader import ConfigLoader
 from feature_flags.evaluator import FeatureFlagEvaluator
 from feature_flags.types import Feature
 from database.adapters.factory import get_database_adapter
+from database.engines import engine_registry
 from logging_lib.logger import configure_logging
-from logging_lib.correlation import CorrelationContext
 from src.config import settings
-from src.middleware.rate_limiter import RateLimitMiddleware
+from src.middleware.rate_limit_backend import (
+    InMemoryBackend,
+    RedisRateLimitStore,
+    SharedStoreBackend,
+)
+from src.middleware.rate_limiter import DEFAULT_ROUTE_POLICIES, RateLimiter
+from src.middleware.request_context import RequestContextMiddleware
+from src.middleware.stream_limiter import StreamLimiter
 from src.api.routes import reports, webhooks, stream, health, cron
+from api.services.report_service import cancel_citation_verification, citation_verifier
 
 
 # Load environment variables from .env file
@@ -76,6 +82,9 @@ async def lifespan(app: FastAPI):
                 adapter_type=type(db_adapter).__name__,
                 supabase_enabled=feature_flags.is_enabled(Feature.SUPABASE),
             )
+            # Pay the TLS/auth handshake now rather than on the first requests
+            # after a cold start (failures are logged, not fatal)
+            await db_adapter.warm_up(config.DATABASE_POOL_MIN)
         except Exception as e:
             logger.error("database_initialization_failed", error=str(e), exc_info=True)
             raise
@@ -107,14 +116,18 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("application_shutting_down")
 
-    # Close database connections if needed
-    if hasattr(app.state, "db"):
-        try:
-            # Database adapters manage their own connection pools
-            # No explicit cleanup needed currently
-            logger.info("database_connections_closed")
-        except Exception as e:
-            logger.error("database_cleanup_failed", error=str(e), exc_info=True)
+    # Close database connections
+    try:
+        if hasattr(app.state, "db"):
+            await app.state.db.close()
+        await engine_registry.dispose_all()
+        logger.info("database_connections_closed")
+    except Exception as e:
+        logger.error("database_cleanup_failed", error=str(e), exc_info=True)
+
+    # Stop pending citation checks and close the verifier's HTTP connection pool
+    cancel_citation_verification()
+    await citation_verifier.aclose()
 
     logger.info("application_shutdown_complete")
 
@@ -140,6 +153,44 @@ async def configure_cors():
     pass
 
 
+def _create_rate_limiter() -> RateLimiter | None:
+    """Rate limiter, with buckets shared across instances when RATE_LIMIT_REDIS_URL is set"""
+    if not settings.ENABLE_RATE_LIMITING:
+        return None
+    store = None
+    if settings.RATE_LIMIT_REDIS_URL:
+        store = RedisRateLimitStore(settings.RATE_LIMIT_REDIS_URL)
+
+    def backend(requests_per_minute: int):
+        refill_rate = requests_per_minute / 60.0
+        if store is not None:
+            return SharedStoreBackend(
+                store,
+                capacity=requests_per_minute,
+                refill_rate=refill_rate,
+                lease_tokens=settings.RATE_LIMIT_LEASE_TOKENS,
+            )
+        return InMemoryBackend(
+            requests_per_minute, refill_rate, max_buckets=settings.RATE_LIMIT_MAX_BUCKETS
+        )
+
+    return RateLimiter(
+        requests_per_minute=settings.RATE_LIMIT_MAX,
+        backend=backend(settings.RATE_LIMIT_MAX),
+        stream_requests_per_minute=settings.RATE_LIMIT_STREAM_MAX,
+        stream_backend=backend(settings.RATE_LIMIT_STREAM_MAX),
+        # Default policies, with the initiate cost from settings
+        policies=tuple(
+            replace(policy, cost=settings.RATE_LIMIT_INITIATE_COST)
+            if policy.path_prefix == "/reports/initiate"
+            else policy
+            for policy in DEFAULT_ROUTE_POLICIES
+        ),
+        max_delay_seconds=settings.RATE_LIMIT_MAX_DELAY_SEC,
+        max_queued=settings.RATE_LIMIT_MAX_QUEUED,
+    )
+
+
 # Add CORS middleware with origins from configuration
 # In production, ALLOWED_ORIGINS should only include the frontend domain
 app.add_middleware(
@@ -152,117 +203,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Add rate limiting middleware (if enabled via feature flag)
-if settings.ENABLE_RATE_LIMITING:
-    app.add_middleware(
-        RateLimitMiddleware, requests_per_minute=settings.RATE_LIMIT_MAX
+# Concurrent-stream caps (with rate limiting), taken per authenticated user by the
+# stream route; active-stream gauges are reported by /health
+app.state.stream_limiter = (
+    StreamLimiter(
+        max_per_user=settings.STREAM_MAX_CONCURRENT_PER_USER,
+        max_concurrent=settings.STREAM_MAX_CONCURRENT,
     )
+    if settings.ENABLE_RATE_LIMITING
+    else None
+)
 
-
-@app.middleware("http")
-async def correlation_id_middleware(request: Request, call_next):
-    """
-    Correlation ID middleware
-
-    Extracts or generates correlation ID for request tracing.
-    Propagates correlation ID through logs and response headers.
-    """
-    # Extract correlation ID from header or generate new one
-    correlation_id = request.headers.get("X-Correlation-ID", str(uuid.uuid4()))
-
-    # Set correlation ID in context for logging
-    with CorrelationContext(correlation_id):
-        try:
-            response = await call_next(request)
-            response.headers["X-Correlation-ID"] = correlation_id
-            return response
-        except Exception as e:
-            logger.error(
-                "request_failed_in_correlation_middleware",
-                error=str(e),
-                exc_info=True,
-            )
-            response = JSONResponse(
-                status_code=500,
-                content={
-                    "error": "Internal server error",
-                    "correlation_id": correlation_id,
-                },
-            )
-            response.headers["X-Correlation-ID"] = correlation_id
-            return response
-
-
-@app.middleware("http")
-async def request_logging_middleware(request: Request, call_next):
-    """
-    Request/Response logging middleware
-
-    Logs all incoming requests and outgoing responses with sanitization.
-    Adds request metadata to structured logging context.
-    """
-    import time
-    from logging_lib.sanitizer import sanitize_log_data
-
-    # Bind request context to logger
-    structlog.contextvars.clear_contextvars()
-    structlog.contextvars.bind_contextvars(
-        method=request.method,
-        path=request.url.path,
-        client_host=request.client.host if request.client else None,
-    )
-
-    # Extract user_id from Authorization header if present
-    auth_header = request.headers.get("authorization")
-    if auth_header:
-        structlog.contextvars.bind_contextvars(has_auth=True)
-
-    # Log request start
-    start_time = time.time()
-    logger.info(
-        "request_started",
-        query_params=sanitize_log_data(dict(request.query_params)),
-    )
-
-    try:
-        # Process request
-        response = await call_next(request)
-
-        # Calculate request duration
-        duration_ms = (time.time() - start_time) * 1000
-
-        # Bind response context
-        structlog.contextvars.bind_contextvars(
-            status_code=response.status_code,
-            duration_ms=round(duration_ms, 2),
-        )
-
-        # Log request completion
-        logger.info("request_completed")
-
-        # Add request ID to response (if not already set by correlation middleware)
-        if "X-Request-ID" not in response.headers:
-            response.headers["X-Request-ID"] = str(uuid.uuid4())
-
-        return response
-
-    except Exception as e:
-        duration_ms = (time.time() - start_time) * 1000
-
-        logger.error(
-            "request_failed",
-            error=str(e),
-            duration_ms=round(duration_ms, 2),
-            exc_info=True,
-        )
-
-        return JSONResponse(
-            status_code=500,
-            content={
-                "error": "Internal server error",
-                "message": str(e) if app.state.config.ENVIRONMENT_MODE != "production" else None,
-            },
-        )
+# Correlation IDs, rate limiting (if enabled via feature flag), timing and access
+# logging in one pure ASGI pass; added last so it is outermost
+app.add_middleware(RequestContextMiddleware, rate_limiter=_create_rate_limiter())
 
 
 # Include routers
@@ -0,0 +1,428 @@
+"""
+Rate Limit Backends
+
+Where token buckets live. RateLimiter charges requests through a
+RateLimitBackend:
+
+- InMemoryBackend: buckets in this process (the default). Each instance
+  enforces the limit on its own, so N instances allow N times the limit
+  and a restart refills every bucket.
+- SharedStoreBackend: buckets in a store shared by every instance (Redis),
+  updated by an atomic token-bucket script so the limit holds across the
+  deployment.
+
+To keep the shared store off the hot path, SharedStoreBackend leases a
+few tokens at a time: one store call takes up to `lease_tokens` tokens,
+and the following requests for that identifier are served from the local
+lease. Leased tokens not used within `lease_ttl_seconds` are dropped
+(never returned), so an instance can under-admit slightly but never
+over-admit. Rejections are remembered locally for the same TTL, so a
+client hammering past its limit does not cost a store call per request.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Protocol
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+KEY_PREFIX = "ratelimit:"
+
+
+class TokenBucket:
+    """
+    Token bucket implementation for rate limiting
+
+    Allows bursts up to capacity, then refills at a constant rate.
+    Slotted and timed with time.monotonic (immune to wall-clock jumps),
+    as one exists per active user or IP.
+    """
+
+    __slots__ = ("capacity", "refill_rate", "tokens", "last_refill")
+
+    def __init__(self, capacity: int, refill_rate: float):
+        """
+        Initialize token bucket
+
+        Args:
+            capacity: Maximum number of tokens (max burst size)
+            refill_rate: Tokens added per second
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.tokens = capacity
+        self.last_refill = time.monotonic()
+
+    def consume(self, tokens: int = 1) -> bool:
+        """
+        Attempt to consume tokens from bucket
+
+        Args:
+            tokens: Number of tokens to consume
+
+        Returns:
+            True if tokens were consumed, False if insufficient tokens
+        """
+        # Refill tokens based on time elapsed
+        now = time.monotonic()
+        elapsed = now - self.last_refill
+        self.tokens = min(self.capacity, self.tokens + (elapsed * self.refill_rate))
+        self.last_refill = now
+
+        # Try to consume tokens
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return True
+        return False
+
+    def get_wait_time(self, tokens: int = 1) -> float:
+        """
+        Calculate how long to wait until tokens are available
+
+        Args:
+            tokens: Number of tokens needed
+
+        Returns:
+            Wait time in seconds
+        """
+        tokens_needed = tokens - self.tokens
+        if tokens_needed <= 0:
+            return 0.0
+        return tokens_needed / self.refill_rate
+
+    def full_at(self) -> float:
+        """Monotonic time at which the bucket is full again (and can be dropped)"""
+        return self.last_refill + (self.capacity - self.tokens) / self.refill_rate
+
+
+@dataclass(frozen=True)
+class BucketResult:
+    """Outcome of charging tokens to one identifier's bucket"""
+
+    allowed: bool
+    remaining: int
+    # Seconds until enough tokens are available (0 when allowed)
+    wait_seconds: float = 0.0
+
+
+class RateLimitBackend(Protocol):
+    """Bucket storage used by RateLimiter"""
+
+    async def consume(self, identifier: str, tokens: int = 1) -> BucketResult: ...
+
+
+class InMemoryBackend:
+    """
+    Token buckets held in this process
+
+    Buckets are kept in last-access order, so expiry only ever looks at
+    the least recently used end: a bucket that has refilled completely is
+    indistinguishable from a new one and is dropped, a few per request
+    (amortised O(1), never a scan of every bucket). `max_buckets` is a
+    hard cap: past it the least recently used bucket is evicted even if
+    not yet full, forgiving that client's partial usage rather than
+    growing without bound (e.g. under a spoofed-IP flood).
+    """
+
+    def __init__(self, capacity: int, refill_rate: float, max_buckets: int = 100_000):
+        """
+        Args:
+            capacity: Bucket size (max burst)
+            refill_rate: Tokens added per second
+            max_buckets: Most buckets kept (least recently used evicted past it)
+        """
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_buckets = max_buckets
+        # Store buckets per user (user_id or IP address), least recently used first
+        self.buckets: "OrderedDict[str, TokenBucket]" = OrderedDict()
+        # Buckets dropped by the cap before they had refilled
+        self.evicted = 0
+
+    async def consume(self, identifier: str, tokens: int = 1) -> BucketResult:
+        bucket = self._get_bucket(identifier)
+        allowed = bucket.consume(tokens)
+        self._expire_buckets(bucket.last_refill)
+        if allowed:
+            return BucketResult(allowed=True, remaining=int(bucket.tokens))
+        return BucketResult(allowed=False, remaining=0, wait_seconds=bucket.get_wait_time(tokens))
+
+    def _get_bucket(self, identifier: str) -> TokenBucket:
+        """
+        Get or create token bucket for identifier, marking it most recently used
+
+        Args:
+            identifier: Unique user/IP identifier
+
+        Returns:
+            TokenBucket instance
+        """
+        bucket = self.buckets.get(identifier)
+        if bucket is None:
+            bucket = self.buckets[identifier] = TokenBucket(
+                capacity=self.capacity, refill_rate=self.refill_rate
+            )
+            if len(self.buckets) > self.max_buckets:
+                self.buckets.popitem(last=False)
+                self.evicted += 1
+                if self.evicted % 10_000 == 1:
+                    logger.warning(
+                        "rate_limiter_bucket_cap_reached",
+                        max_buckets=self.max_buckets,
+                        evicted=self.evicted,
+                    )
+        else:
+            self.buckets.move_to_end(identifier)
+        return bucket
+
+    def _expire_buckets(self, now: float, limit: int = 4) -> None:
+        """
+        Drop up to `limit` least recently used buckets that are full again
+
+        Each request removes at most a few, so the cost per request stays
+        constant however many buckets exist.
+        """
+        for _ in range(limit):
+            if not self.buckets:
+                return
+            identifier, bucket = next(iter(self.buckets.items()))
+            if bucket.full_at() > now:
+                return
+            del self.buckets[identifier]
+
+
+@dataclass(frozen=True)
+class TokenGrant:
+    """Tokens taken from a shared bucket in one atomic step"""
+
+    granted: int
+    # Tokens left in the shared bucket after the grant
+    remaining: float
+    # Seconds until `needed` tokens are available (when nothing was granted)
+    wait_seconds: float = 0.0
+
+
+class RateLimitStore(Protocol):
+    """Shared token buckets (e.g. Redis), updated atomically"""
+
+    async def take(
+        self, key: str, capacity: int, refill_rate: float, needed: int, requested: int
+    ) -> TokenGrant:
+        """
+        Refill the bucket, then take up to `requested` tokens if at least
+        `needed` are available (otherwise take none)
+        """
+        ...
+
+
+# Atomic token bucket. Uses the server clock so instances with skewed clocks
+# agree; the key expires once the bucket would be full again (a missing key
+# is a full bucket). Floats are returned as strings (Lua numbers become
+# integers in replies).
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local needed = tonumber(ARGV[3])
+local requested = tonumber(ARGV[4])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local granted = 0
+local wait = 0
+if tokens >= needed then
+  granted = math.min(requested, math.floor(tokens))
+  tokens = tokens - granted
+else
+  wait = (needed - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {granted, tostring(tokens), tostring(wait)}
+"""
+
+
+class RedisRateLimitStore:
+    """RateLimitStore backed by Redis (requires the `redis` package)"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError(
+                "RATE_LIMIT_REDIS_URL is set but the 'redis' package is not installed "
+                "(install the backend's [redis] extra)"
+            ) from e
+        self._client = redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    async def take(
+        self, key: str, capacity: int, refill_rate: float, needed: int, requested: int
+    ) -> TokenGrant:
+        granted, remaining, wait = await self._take(
+            keys=[key], args=[capacity, refill_rate, needed, requested]
+        )
+        return TokenGrant(int(granted), float(remaining), float(wait))
+
+
+class LocalRateLimitStore:
+    """
+    In-process RateLimitStore with the same semantics as the Redis script
+
+    Stand-in for tests and single-instance development.
+    """
+
+    def __init__(self):
+        # key -> (tokens, last update)
+        self.buckets: Dict[str, tuple[float, float]] = {}
+
+    async def take(
+        self, key: str, capacity: int, refill_rate: float, needed: int, requested: int
+    ) -> TokenGrant:
+        now = time.monotonic()
+        tokens, ts = self.buckets.get(key, (capacity, now))
+        tokens = min(capacity, tokens + max(0.0, now - ts) * refill_rate)
+        granted = 0
+        wait = 0.0
+        if tokens >= needed:
+            granted = min(requested, int(tokens))
+            tokens -= granted
+        else:
+            wait = (needed - tokens) / refill_rate
+        self.buckets[key] = (tokens, now)
+        return TokenGrant(granted, tokens, wait)
+
+
+@dataclass
+class _Lease:
+    """Tokens pre-allocated to this instance for one identifier"""
+
+    tokens: int
+    # Shared bucket level when the lease was taken (for X-RateLimit-Remaining)
+    shared_remaining: int
+    expires_at: float
+    # When the lease records a rejection: when enough tokens are available again
+    retry_at: float = 0.0
+    # ... and the tokens the rejected request needed (cheaper requests may still fit)
+    retry_tokens: int = 0
+
+
+class SharedStoreBackend:
+    """
+    Token buckets in a shared store, consumed through local leases
+
+    Store errors are logged and the request is charged to an in-process
+    bucket instead, so an outage degrades to per-instance limits rather
+    than rejecting (or admitting) everything.
+    """
+
+    def __init__(
+        self,
+        store: RateLimitStore,
+        capacity: int,
+        refill_rate: float,
+        lease_tokens: int = 5,
+        lease_ttl_seconds: float = 1.0,
+    ):
+        """
+        Args:
+            store: Shared bucket store
+            capacity: Bucket size (max burst)
+            refill_rate: Tokens added per second
+            lease_tokens: Tokens taken per store call (1 disables leasing)
+            lease_ttl_seconds: How long unused leased tokens (and rejections) are kept
+        """
+        self.store = store
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.lease_tokens = max(1, min(lease_tokens, capacity))
+        self.lease_ttl_seconds = lease_ttl_seconds
+        self.fallback = InMemoryBackend(capacity, refill_rate)
+        # Ordered by last refill, which (with one TTL) is expiry order
+        self._leases: "OrderedDict[str, _Lease]" = OrderedDict()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def consume(self, identifier: str, tokens: int = 1) -> BucketResult:
+        now = time.monotonic()
+        self._expire_leases(now)
+        result = self._consume_lease(identifier, tokens, now)
+        if result is not None:
+            return result
+
+        # Concurrent requests for one identifier share one store call
+        while (inflight := self._inflight.get(identifier)) is not None:
+            await asyncio.shield(inflight)
+            result = self._consume_lease(identifier, tokens, time.monotonic())
+            if result is not None:
+                return result
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[identifier] = future
+        try:
+            return await self._refill(identifier, tokens)
+        finally:
+            del self._inflight[identifier]
+            future.set_result(None)
+
+    def _consume_lease(self, identifier: str, tokens: int, now: float) -> Optional[BucketResult]:
+        """Charge the local lease; None when the store has to be asked"""
+        lease = self._leases.get(identifier)
+        if lease is None or lease.expires_at <= now:
+            return None
+        if lease.retry_at:
+            if tokens < lease.retry_tokens:
+                return None
+            return BucketResult(allowed=False, remaining=0, wait_seconds=lease.retry_at - now)
+        if lease.tokens < tokens:
+            return None
+        lease.tokens -= tokens
+        return BucketResult(allowed=True, remaining=lease.shared_remaining + lease.tokens)
+
+    async def _refill(self, identifier: str, tokens: int) -> BucketResult:
+        try:
+            grant = await self.store.take(
+                KEY_PREFIX + identifier,
+                self.capacity,
+                self.refill_rate,
+                needed=tokens,
+                requested=max(tokens, self.lease_tokens),
+            )
+        except Exception as e:
+            logger.warning("rate_limit_store_failed", identifier=identifier, error=str(e))
+            return await self.fallback.consume(identifier, tokens)
+
+        now = time.monotonic()
+        self._leases.pop(identifier, None)
+        if grant.granted < tokens:
+            # Remember the rejection (capped at the lease TTL) to spare the store
+            wait = max(grant.wait_seconds, 0.001)
+            self._leases[identifier] = _Lease(
+                0,
+                0,
+                now + min(wait, self.lease_ttl_seconds),
+                retry_at=now + wait,
+                retry_tokens=tokens,
+            )
+            return BucketResult(allowed=False, remaining=0, wait_seconds=wait)
+
+        lease = _Lease(
+            tokens=grant.granted - tokens,
+            shared_remaining=int(grant.remaining),
+            expires_at=now + self.lease_ttl_seconds,
+        )
+        self._leases[identifier] = lease
+        return BucketResult(allowed=True, remaining=lease.shared_remaining + lease.tokens)
+
+    def _expire_leases(self, now: float) -> None:
+        """Drop expired leases from the front (oldest refill first)"""
+        while self._leases:
+            identifier, lease = next(iter(self._leases.items()))
+            if lease.expires_at > now:
+                return
+            del self._leases[identifier]
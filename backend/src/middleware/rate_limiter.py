@@ -3,262 +3,399 @@ Rate Limiting Middleware
 
 Implements token bucket algorithm for rate limiting API requests.
 Limits: 100 requests per minute per user (identified by user_id or IP address).
+
+Routes are charged by RoutePolicy: expensive endpoints cost several
+tokens (POST /reports/initiate, which leads to an LLM run, costs 10),
+and SSE stream endpoints draw from a separate, smaller "stream" bucket
+so reconnect loops neither eat the API budget nor escape a limit.
+
+In delay mode (max_delay_seconds > 0) the limiter smooths bursts like a
+leaky bucket: a request whose tokens refill within max_delay_seconds is
+held (asyncio.sleep, no thread) until they do, instead of getting a 429
+the client would retry. Only requests that would wait longer, or that
+find max_queued requests of the same identifier already waiting, are
+rejected.
+
+RateLimiter makes the decisions; it is driven by the fused
+RequestContextMiddleware (src/middleware/request_context.py) or, on its
+own, by the pure ASGI RateLimitMiddleware below. Buckets live in a
+RateLimitBackend (src/middleware/rate_limit_backend.py): in this process
+by default, or in a shared store so the limit holds across instances.
 """
 
+import asyncio
+import json
 import time
-from typing import Dict
-from fastapi import Request
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import JSONResponse
+from dataclasses import dataclass
+from typing import Mapping, Optional, Sequence
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import structlog
 
+from src.middleware.rate_limit_backend import BucketResult, InMemoryBackend, RateLimitBackend
+
 logger = structlog.get_logger(__name__)
 
 
-class TokenBucket:
+# Paths never rate limited (health checks and docs)
+EXEMPT_PATHS = frozenset({"/health", "/", "/docs", "/redoc", "/openapi.json"})
+
+
+def client_identifier(scope: Scope, headers: Mapping[bytes, bytes]) -> str:
     """
-    Token bucket implementation for rate limiting
+    Get unique identifier for rate limiting
+
+    Priority:
+    1. user_id from request state (set by auth middleware)
+    2. X-User-ID header
+    3. Client IP address
+
+    Args:
+        scope: ASGI connection scope
+        headers: Request headers (lowercase byte names)
 
-    Allows bursts up to capacity, then refills at a constant rate.
+    Returns:
+        Unique identifier string
     """
+    # Try to get user_id from request state (set by auth middleware)
+    state = scope.get("state")
+    if state and "user_id" in state:
+        return f"user:{state['user_id']}"
 
-    def __init__(self, capacity: int, refill_rate: float):
-        """
-        Initialize token bucket
+    # Try to get from header
+    user_id = headers.get(b"x-user-id")
+    if user_id:
+        return f"user:{user_id.decode('latin-1')}"
 
-        Args:
-            capacity: Maximum number of tokens (max burst size)
-            refill_rate: Tokens added per second
-        """
-        self.capacity = capacity
-        self.refill_rate = refill_rate
-        self.tokens = capacity
-        self.last_refill = time.time()
+    # Fall back to IP address
+    client = scope.get("client")
+    if client:
+        return f"ip:{client[0]}"
 
-    def consume(self, tokens: int = 1) -> bool:
-        """
-        Attempt to consume tokens from bucket
+    # Default identifier (should rarely happen)
+    return "unknown"
 
-        Args:
-            tokens: Number of tokens to consume
 
-        Returns:
-            True if tokens were consumed, False if insufficient tokens
-        """
-        # Refill tokens based on time elapsed
-        now = time.time()
-        elapsed = now - self.last_refill
-        self.tokens = min(self.capacity, self.tokens + (elapsed * self.refill_rate))
-        self.last_refill = now
-
-        # Try to consume tokens
-        if self.tokens >= tokens:
-            self.tokens -= tokens
-            return True
-        return False
-
-    def get_wait_time(self, tokens: int = 1) -> float:
-        """
-        Calculate how long to wait until tokens are available
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Charge for requests matching a method and path prefix"""
 
-        Args:
-            tokens: Number of tokens needed
+    method: str
+    path_prefix: str
+    # Tokens charged per request
+    cost: int = 1
+    # Bucket group: "default" (the per-minute API limit) or "stream"
+    bucket: str = "default"
 
-        Returns:
-            Wait time in seconds
-        """
-        tokens_needed = tokens - self.tokens
-        if tokens_needed <= 0:
-            return 0.0
-        return tokens_needed / self.refill_rate
 
+DEFAULT_POLICY = RoutePolicy("*", "/")
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """
-    Rate limiting middleware using token bucket algorithm
+# First match wins
+DEFAULT_ROUTE_POLICIES = (
+    # Creates a report and leads to a Gemini run
+    RoutePolicy("POST", "/reports/initiate", cost=10),
+    RoutePolicy("GET", "/stream/", bucket="stream"),
+)
 
-    Configuration:
-    - RATE_LIMIT_REQUESTS_PER_MINUTE: Max requests per minute (default: 100)
-    - RATE_LIMIT_ENABLED: Enable/disable rate limiting (default: True)
 
-    Headers added to response:
-    - X-RateLimit-Limit: Maximum requests allowed
-    - X-RateLimit-Remaining: Requests remaining in current window
-    - X-RateLimit-Reset: Seconds until bucket refills
-    - Retry-After: Seconds to wait (only on 429 responses)
+@dataclass(frozen=True)
+class RateLimitDecision:
+    """Outcome of charging one request to its bucket"""
+
+    allowed: bool
+    identifier: str
+    remaining: int
+    reset_seconds: int
+    retry_after: int = 0
+    # Per-minute limit of the bucket charged
+    limit: int = 0
+
+
+class RateLimiter:
+    """
+    Token bucket rate limiter keyed by user or client IP
+
+    Transport-agnostic: callers pass the ASGI scope and request headers,
+    then turn the RateLimitDecision into response headers or a 429.
     """
 
-    def __init__(self, app, requests_per_minute: int = 100):
+    def __init__(
+        self,
+        requests_per_minute: int = 100,
+        backend: Optional[RateLimitBackend] = None,
+        stream_requests_per_minute: int = 20,
+        stream_backend: Optional[RateLimitBackend] = None,
+        policies: Sequence[RoutePolicy] = DEFAULT_ROUTE_POLICIES,
+        max_delay_seconds: float = 0.0,
+        max_queued: int = 5,
+    ):
         """
         Initialize rate limiter
 
         Args:
-            app: FastAPI application
             requests_per_minute: Maximum requests allowed per minute per user
+            backend: Bucket storage (default: in-process buckets)
+            stream_requests_per_minute: Stream connections allowed per minute per user
+            stream_backend: Bucket storage for the stream group (default: in-process)
+            policies: Per-route costs and bucket groups (first match wins)
+            max_delay_seconds: Longest a request over the limit is held for its
+                tokens instead of rejected (0 rejects at once)
+            max_queued: Requests held at once per identifier and bucket group
         """
-        super().__init__(app)
         self.requests_per_minute = requests_per_minute
         # Convert to requests per second for token bucket
         self.refill_rate = requests_per_minute / 60.0
         # Allow burst of up to the per-minute limit
         self.capacity = requests_per_minute
-        # Store buckets per user (user_id or IP address)
-        self.buckets: Dict[str, TokenBucket] = {}
+        self.policies = tuple(policies)
+        self.limits = {"default": requests_per_minute, "stream": stream_requests_per_minute}
+        self.backends: dict[str, RateLimitBackend] = {
+            "default": backend or InMemoryBackend(self.capacity, self.refill_rate),
+            "stream": stream_backend
+            or InMemoryBackend(stream_requests_per_minute, stream_requests_per_minute / 60.0),
+        }
+        self.max_delay_seconds = max_delay_seconds
+        self.max_queued = max_queued
+        # Bucket key -> requests held waiting for tokens (entries removed at zero)
+        self._queued: dict[str, int] = {}
 
         logger.info(
             "rate_limiter_initialized",
             requests_per_minute=requests_per_minute,
+            stream_requests_per_minute=stream_requests_per_minute,
             refill_rate=self.refill_rate,
             capacity=self.capacity,
+            backend=type(self.backends["default"]).__name__,
+            max_delay_seconds=max_delay_seconds,
         )
 
-    def _get_identifier(self, request: Request) -> str:
-        """
-        Get unique identifier for rate limiting
-
-        Priority:
-        1. user_id from request state (set by auth middleware)
-        2. X-User-ID header
-        3. Client IP address
-
-        Args:
-            request: FastAPI request object
-
-        Returns:
-            Unique identifier string
-        """
-        # Try to get user_id from request state (set by auth middleware)
-        if hasattr(request.state, "user_id"):
-            return f"user:{request.state.user_id}"
-
-        # Try to get from header
-        user_id = request.headers.get("X-User-ID")
-        if user_id:
-            return f"user:{user_id}"
+    def policy_for(self, method: str, path: str) -> RoutePolicy:
+        """Policy of the first matching route, or the default (1 token)"""
+        for policy in self.policies:
+            if policy.method in (method, "*") and path.startswith(policy.path_prefix):
+                return policy
+        return DEFAULT_POLICY
 
-        # Fall back to IP address
-        if request.client:
-            return f"ip:{request.client.host}"
+    def get_identifier(self, scope: Scope, headers: Mapping[bytes, bytes]) -> str:
+        """Unique identifier for rate limiting (see client_identifier)"""
+        return client_identifier(scope, headers)
 
-        # Default identifier (should rarely happen)
-        return "unknown"
-
-    def _get_bucket(self, identifier: str) -> TokenBucket:
+    async def check(self, identifier: str, path: str, method: str = "GET") -> RateLimitDecision:
         """
-        Get or create token bucket for identifier
+        Charge one request to the identifier's bucket
 
         Args:
-            identifier: Unique user/IP identifier
+            identifier: Unique user/IP identifier (from get_identifier)
+            path: Request path (selects the route policy)
+            method: Request method (selects the route policy)
 
         Returns:
-            TokenBucket instance
+            RateLimitDecision (allowed, or the Retry-After to send)
         """
-        if identifier not in self.buckets:
-            self.buckets[identifier] = TokenBucket(
-                capacity=self.capacity, refill_rate=self.refill_rate
+        policy = self.policy_for(method, path)
+        limit = self.limits[policy.bucket]
+        # Groups other than the default are keyed apart (they may share a store)
+        key = identifier if policy.bucket == "default" else f"{policy.bucket}:{identifier}"
+        # A cost above the bucket size could never be paid
+        cost = min(policy.cost, limit)
+        backend = self.backends[policy.bucket]
+        result = await backend.consume(key, cost)
+        if not result.allowed and self.max_delay_seconds > 0:
+            result = await self._delay(backend, key, cost, limit, result)
+
+        if result.allowed:
+            logger.debug(
+                "rate_limit_allowed",
+                identifier=identifier,
+                remaining=result.remaining,
+                path=path,
+                cost=policy.cost,
+            )
+            return RateLimitDecision(
+                allowed=True,
+                identifier=identifier,
+                remaining=result.remaining,
+                # Seconds for an empty bucket to refill (limit is per minute)
+                reset_seconds=60,
+                limit=limit,
             )
-        return self.buckets[identifier]
 
-    def _cleanup_old_buckets(self):
-        """
-        Remove buckets that haven't been used recently
+        # Rate limit exceeded
+        retry_after = int(result.wait_seconds) + 1  # Round up
+        logger.warning(
+            "rate_limit_exceeded",
+            identifier=identifier,
+            path=path,
+            bucket=policy.bucket,
+            cost=policy.cost,
+            wait_time_seconds=retry_after,
+        )
+        return RateLimitDecision(
+            allowed=False,
+            identifier=identifier,
+            remaining=0,
+            reset_seconds=retry_after,
+            retry_after=retry_after,
+            limit=limit,
+        )
 
-        Runs periodically to prevent memory leaks.
-        Removes buckets that are full (indicating no recent activity).
+    async def _delay(
+        self, backend: RateLimitBackend, key: str, cost: int, limit: int, result: BucketResult
+    ) -> BucketResult:
         """
-        # Only cleanup if we have many buckets
-        if len(self.buckets) < 1000:
-            return
-
-        now = time.time()
-        to_remove = []
-
-        for identifier, bucket in self.buckets.items():
-            # Remove if bucket is full and hasn't been used in 10 minutes
-            if bucket.tokens >= bucket.capacity:
-                elapsed = now - bucket.last_refill
-                if elapsed > 600:  # 10 minutes
-                    to_remove.append(identifier)
+        Hold a request over the limit until its tokens refill (delay mode)
 
-        for identifier in to_remove:
-            del self.buckets[identifier]
+        Held requests for a key queue behind each other: each expects to
+        wait for the tokens of those ahead of it as well, and is rejected
+        up front if that exceeds max_delay_seconds.
 
-        if to_remove:
-            logger.info(
-                "rate_limiter_cleaned_up_buckets",
-                removed_count=len(to_remove),
-                remaining_buckets=len(self.buckets),
-            )
+        Returns:
+            The result of the last charge (still rejected if the tokens were
+            not available in time)
+        """
+        queued = self._queued.get(key, 0)
+        # Seconds for one request's tokens to refill (limit is per minute)
+        wait = result.wait_seconds + queued * cost * 60.0 / limit
+        if queued >= self.max_queued or wait > self.max_delay_seconds:
+            return result
+
+        self._queued[key] = queued + 1
+        start = time.monotonic()
+        deadline = start + self.max_delay_seconds
+        try:
+            while True:
+                await asyncio.sleep(max(wait, 0.001))
+                result = await backend.consume(key, cost)
+                now = time.monotonic()
+                if result.allowed or now + result.wait_seconds > deadline:
+                    break
+                # Tokens taken meanwhile (e.g. by another instance)
+                wait = result.wait_seconds
+        finally:
+            if self._queued[key] == 1:
+                del self._queued[key]
+            else:
+                self._queued[key] -= 1
+
+        logger.debug(
+            "rate_limit_delayed",
+            key=key,
+            allowed=result.allowed,
+            delay_ms=round((now - start) * 1000, 1),
+        )
+        return result
 
-    async def dispatch(self, request: Request, call_next):
+    def headers(self, decision: RateLimitDecision) -> list[tuple[bytes, bytes]]:
         """
-        Process request with rate limiting
+        X-RateLimit-* response headers (plus Retry-After on rejections)
 
         Args:
-            request: FastAPI request
-            call_next: Next middleware in chain
+            decision: Result of check()
 
         Returns:
-            Response or 429 Too Many Requests
+            Raw ASGI header pairs
         """
-        # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
+        headers = [
+            (b"x-ratelimit-limit", str(decision.limit).encode()),
+            (b"x-ratelimit-remaining", str(decision.remaining).encode()),
+            (b"x-ratelimit-reset", str(decision.reset_seconds).encode()),
+        ]
+        if not decision.allowed:
+            headers.append((b"retry-after", str(decision.retry_after).encode()))
+        return headers
+
+    def exceeded_body(self, decision: RateLimitDecision) -> bytes:
+        """JSON body of a 429 response"""
+        return json.dumps(
+            {
+                "error": "Rate limit exceeded",
+                "message": (
+                    f"Too many requests. Please retry after {decision.retry_after} seconds."
+                ),
+                "retry_after": decision.retry_after,
+                "limit": decision.limit,
+            }
+        ).encode()
+
+
+async def send_json(
+    send: Send, status: int, body: bytes, headers: Optional[list[tuple[bytes, bytes]]] = None
+) -> None:
+    """Send a complete JSON response on a raw ASGI connection"""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                *(headers or []),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+class RateLimitMiddleware:
+    """
+    Rate limiting middleware using token bucket algorithm (pure ASGI)
 
-        # Get identifier and bucket
-        identifier = self._get_identifier(request)
-        bucket = self._get_bucket(identifier)
+    Standalone form of the limiter; the application stack uses
+    RequestContextMiddleware, which applies the same RateLimiter in its
+    single pass. Response bodies (including SSE streams) pass through
+    untouched.
 
-        # Try to consume token
-        if bucket.consume():
-            # Request allowed
-            remaining = int(bucket.tokens)
-            reset_seconds = int(bucket.capacity / bucket.refill_rate)
+    Configuration:
+    - RATE_LIMIT_REQUESTS_PER_MINUTE: Max requests per minute (default: 100)
+    - RATE_LIMIT_ENABLED: Enable/disable rate limiting (default: True)
+    - RATE_LIMIT_MAX_DELAY_SEC: Hold bursts up to this long instead of
+      rejecting them (default: 0, off)
 
-            logger.debug(
-                "rate_limit_allowed",
-                identifier=identifier,
-                remaining=remaining,
-                path=request.url.path,
-            )
+    Headers added to response:
+    - X-RateLimit-Limit: Maximum requests allowed
+    - X-RateLimit-Remaining: Requests remaining in current window
+    - X-RateLimit-Reset: Seconds until bucket refills
+    - Retry-After: Seconds to wait (only on 429 responses)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: int = 100,
+        limiter: Optional[RateLimiter] = None,
+        max_delay_seconds: float = 0.0,
+        max_queued: int = 5,
+    ):
+        """
+        Initialize rate limiter
 
-            # Process request
-            response = await call_next(request)
+        Args:
+            app: ASGI application
+            requests_per_minute: Maximum requests allowed per minute per user
+            limiter: Existing RateLimiter to use instead of a new one
+            max_delay_seconds: Delay mode: longest a burst is held (0 rejects at once)
+            max_queued: Delay mode: requests held at once per user
+        """
+        self.app = app
+        self.limiter = limiter or RateLimiter(
+            requests_per_minute, max_delay_seconds=max_delay_seconds, max_queued=max_queued
+        )
 
-            # Add rate limit headers
-            response.headers["X-RateLimit-Limit"] = str(self.requests_per_minute)
-            response.headers["X-RateLimit-Remaining"] = str(remaining)
-            response.headers["X-RateLimit-Reset"] = str(reset_seconds)
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-            # Periodic cleanup
-            self._cleanup_old_buckets()
+        identifier = self.limiter.get_identifier(scope, dict(scope["headers"]))
+        decision = await self.limiter.check(identifier, scope["path"], scope["method"])
+        rate_headers = self.limiter.headers(decision)
 
-            return response
-        else:
-            # Rate limit exceeded
-            wait_time = bucket.get_wait_time()
-            retry_after = int(wait_time) + 1  # Round up
+        if not decision.allowed:
+            await send_json(send, 429, self.limiter.exceeded_body(decision), rate_headers)
+            return
 
-            logger.warning(
-                "rate_limit_exceeded",
-                identifier=identifier,
-                path=request.url.path,
-                wait_time_seconds=retry_after,
-            )
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", []), *rate_headers]
+            await send(message)
 
-            # Return 429 Too Many Requests
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "error": "Rate limit exceeded",
-                    "message": f"Too many requests. Please retry after {retry_after} seconds.",
-                    "retry_after": retry_after,
-                    "limit": self.requests_per_minute,
-                },
-                headers={
-                    "X-RateLimit-Limit": str(self.requests_per_minute),
-                    "X-RateLimit-Remaining": "0",
-                    "X-RateLimit-Reset": str(retry_after),
-                    "Retry-After": str(retry_after),
-                },
-            )
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,165 @@
+"""
+Request Context Middleware
+
+One pure ASGI middleware for every HTTP request, replacing the
+correlation-ID and request-logging `@app.middleware("http")` layers and
+the BaseHTTPMiddleware rate limiter. In a single pass it:
+
+- Assigns the request ID (one uuid4) and correlation ID (X-Correlation-ID
+  header, or the request ID) and binds them, with method/path/client, to
+  the structlog context once.
+- Applies the rate limiter, answering 429 before the app runs.
+- Tracks SQL statements and the identity map for the request.
+- Times the request and writes the request_started / request_completed
+  access log.
+
+Response bodies are passed straight through: no per-request task or
+memory stream as with BaseHTTPMiddleware, and SSE chunks go to the
+server as the app sends them. For streams, request_completed is logged
+when the stream ends, so duration_ms covers the whole response.
+"""
+
+import json
+import time
+import uuid
+from typing import Optional
+from urllib.parse import parse_qsl
+
+import structlog
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from database.identity_map import identity_map
+from database.instrumentation import track_queries
+from logging_lib.correlation import CorrelationContext
+from logging_lib.sanitizer import sanitize_log_data
+from src.middleware.rate_limiter import EXEMPT_PATHS, RateLimiter, send_json
+
+logger = structlog.get_logger(__name__)
+
+
+class RequestContextMiddleware:
+    """
+    Correlation IDs, rate limiting, timing and access logging (pure ASGI)
+
+    Headers added to every response:
+    - X-Correlation-ID: Propagated from the request, or the request ID
+    - X-Request-ID: Unique per request
+    - X-RateLimit-* / Retry-After: When rate limiting is enabled
+    """
+
+    def __init__(self, app: ASGIApp, rate_limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            app: ASGI application
+            rate_limiter: Limiter to apply, or None when rate limiting is disabled
+        """
+        self.app = app
+        self.rate_limiter = rate_limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        headers = dict(scope["headers"])
+        request_id = str(uuid.uuid4())
+        correlation = headers.get(b"x-correlation-id")
+        correlation_id = correlation.decode("latin-1") if correlation else request_id
+        path = scope["path"]
+        client = scope.get("client")
+
+        structlog.contextvars.clear_contextvars()
+        structlog.contextvars.bind_contextvars(
+            method=scope["method"],
+            path=path,
+            client_host=client[0] if client else None,
+            request_id=request_id,
+        )
+        if b"authorization" in headers:
+            structlog.contextvars.bind_contextvars(has_auth=True)
+
+        response_headers = [
+            (b"x-correlation-id", correlation_id.encode("latin-1")),
+            (b"x-request-id", request_id.encode()),
+        ]
+        status_code = 500
+        response_started = False
+
+        async def send_with_context(message: Message) -> None:
+            nonlocal status_code, response_started
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_started = True
+                message["headers"] = [*message.get("headers", []), *response_headers]
+            await send(message)
+
+        with CorrelationContext(correlation_id):
+            logger.info(
+                "request_started",
+                query_params=sanitize_log_data(
+                    dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+                ),
+            )
+
+            if self.rate_limiter is not None and path not in EXEMPT_PATHS:
+                identifier = self.rate_limiter.get_identifier(scope, headers)
+                decision = await self.rate_limiter.check(identifier, path, scope["method"])
+                response_headers.extend(self.rate_limiter.headers(decision))
+                if not decision.allowed:
+                    await send_json(
+                        send_with_context, 429, self.rate_limiter.exceeded_body(decision)
+                    )
+                    self._log_completed(start, status_code)
+                    return
+
+            config = getattr(scope.get("app"), "state", None)
+            config = getattr(config, "config", None)
+            # Flag N+1 patterns outside production
+            n_plus_one_threshold = (
+                config.DATABASE_N_PLUS_ONE_THRESHOLD
+                if config is not None and config.ENVIRONMENT_MODE != "production"
+                else 0
+            )
+
+            try:
+                # Repeated primary-key lookups within the request are served from one identity map
+                with (
+                    track_queries(n_plus_one_threshold=n_plus_one_threshold) as queries,
+                    identity_map() as entities,
+                ):
+                    await self.app(scope, receive, send_with_context)
+            except Exception as e:
+                logger.error(
+                    "request_failed",
+                    error=str(e),
+                    duration_ms=round((time.perf_counter() - start) * 1000, 2),
+                    exc_info=True,
+                )
+                if response_started:
+                    raise
+                production = config is not None and config.ENVIRONMENT_MODE == "production"
+                body = {
+                    "error": "Internal server error",
+                    "message": None if production else str(e),
+                    "correlation_id": correlation_id,
+                }
+                await send_json(send_with_context, 500, json.dumps(body).encode())
+                return
+
+            self._log_completed(
+                start,
+                status_code,
+                db_queries=queries.count,
+                db_time_ms=round(queries.total_ms, 2),
+                db_identity_hits=entities.hits,
+            )
+
+    @staticmethod
+    def _log_completed(start: float, status_code: int, **fields) -> None:
+        structlog.contextvars.bind_contextvars(
+            status_code=status_code,
+            duration_ms=round((time.perf_counter() - start) * 1000, 2),
+            **fields,
+        )
+        logger.info("request_completed")
@@ -0,0 +1,171 @@
+"""
+Stream Concurrency Limiter
+
+The token bucket limits how often requests start, not how many are in
+flight. An SSE stream (GET /stream/reports/{id}) holds a socket, buffers
+and possibly a Gemini call for a minute or more, so a single user
+opening dozens of them could tie up a worker. StreamLimiter caps
+concurrent streams:
+
+- per authenticated user, and
+- per worker in total, leaving the worker free to serve short API calls
+  however many streams are open.
+
+The stream route takes a slot once the user is authenticated (keyed by
+their user ID, never by a client-supplied header) and releases it when
+the stream generator finishes, whether the stream completed, failed or
+the client disconnected. Requests over either cap get a 429 before any
+report is read. Counts are per worker process.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional
+
+import structlog
+
+logger = structlog.get_logger(__name__)
+
+# Scope of the cap a rejected stream hit
+USER_SCOPE = "user"
+SERVER_SCOPE = "server"
+
+
+@dataclass
+class StreamStats:
+    """Point-in-time stream gauges"""
+
+    active: int
+    active_users: int
+    max_concurrent: int
+    max_per_user: int
+    utilization: float
+    peak: int
+    started: int
+    rejected_user: int
+    rejected_server: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class StreamSlot:
+    """A slot taken for one stream; release() frees it once, however often called"""
+
+    def __init__(self, limiter: "StreamLimiter", identifier: str):
+        self.limiter = limiter
+        self.identifier = identifier
+        self.released = False
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.limiter.release(self.identifier)
+
+
+class StreamLimiter:
+    """Concurrent long-lived responses per identifier and per worker"""
+
+    def __init__(
+        self,
+        max_per_user: int = 3,
+        max_concurrent: int = 100,
+        retry_after_seconds: int = 10,
+    ):
+        """
+        Args:
+            max_per_user: Streams one user may hold open at once
+            max_concurrent: Streams this worker holds open at once
+            retry_after_seconds: Retry-After sent with a 429
+        """
+        self.max_per_user = max_per_user
+        self.max_concurrent = max_concurrent
+        self.retry_after_seconds = retry_after_seconds
+        # Identifier -> open streams (entries removed at zero)
+        self._active: Dict[str, int] = {}
+        self._total = 0
+        self._peak = 0
+        self._started = 0
+        self._rejected = {USER_SCOPE: 0, SERVER_SCOPE: 0}
+
+    def acquire(self, identifier: str) -> Optional[str]:
+        """
+        Take a slot for a new stream
+
+        Check and increment happen without an await in between, so no lock
+        is needed on the event loop.
+
+        Returns:
+            None when a slot was taken, else the scope of the cap that was hit
+            (call release() exactly once for every successful acquire)
+        """
+        if self._total >= self.max_concurrent:
+            scope = SERVER_SCOPE
+        elif self._active.get(identifier, 0) >= self.max_per_user:
+            scope = USER_SCOPE
+        else:
+            self._active[identifier] = self._active.get(identifier, 0) + 1
+            self._total += 1
+            self._started += 1
+            self._peak = max(self._peak, self._total)
+            return None
+
+        self._rejected[scope] += 1
+        logger.warning(
+            "stream_limit_exceeded",
+            identifier=identifier,
+            scope=scope,
+            active=self._total,
+            active_for_identifier=self._active.get(identifier, 0),
+        )
+        return scope
+
+    def release(self, identifier: str) -> None:
+        count = self._active.get(identifier, 0)
+        if count <= 0:
+            return
+        if count == 1:
+            del self._active[identifier]
+        else:
+            self._active[identifier] = count - 1
+        self._total -= 1
+
+    def active(self, identifier: Optional[str] = None) -> int:
+        """Open streams, in total or for one identifier"""
+        if identifier is None:
+            return self._total
+        return self._active.get(identifier, 0)
+
+    def stats(self) -> StreamStats:
+        return StreamStats(
+            active=self._total,
+            active_users=len(self._active),
+            max_concurrent=self.max_concurrent,
+            max_per_user=self.max_per_user,
+            utilization=round(self._total / self.max_concurrent, 3),
+            peak=self._peak,
+            started=self._started,
+            rejected_user=self._rejected[USER_SCOPE],
+            rejected_server=self._rejected[SERVER_SCOPE],
+        )
+
+    def headers(self) -> dict[str, str]:
+        return {"Retry-After": str(self.retry_after_seconds)}
+
+    def exceeded_detail(self, scope: str) -> dict[str, Any]:
+        """Detail of a 429 response"""
+        if scope == USER_SCOPE:
+            message = (
+                f"Too many open streams: at most {self.max_per_user} per user. "
+                "Close a stream or retry later."
+            )
+            limit = self.max_per_user
+        else:
+            message = "The server has too many open streams. Please retry later."
+            limit = self.max_concurrent
+        return {
+            "error": "Too many concurrent streams",
+            "message": message,
+            "scope": scope,
+            "limit": limit,
+            "retry_after": self.retry_after_seconds,
+        }
@@ -0,0 +1,11 @@
+-- ========================================
+-- Keyset pagination index for report listings
+-- ========================================
+-- Backs GET /reports/ cursor pagination: a user's live reports ordered by
+-- (created_at DESC, id DESC). id is the tie-breaker, so each page is a
+-- single index range scan regardless of depth. The predicate matches the
+-- list query's deleted_at IS NULL filter so the planner can use it.
+
+CREATE INDEX IF NOT EXISTS idx_reports_user_created_active
+  ON reports (user_id, created_at DESC, id DESC)
+  WHERE deleted_at IS NULL;
@@ -0,0 +1,11 @@
+-- ========================================
+-- Canonical serialized report content
+-- ========================================
+-- content_json holds ReportContent exactly as the API serializes it,
+-- written once when generation completes. GET /reports/{id} splices it
+-- into the response body as-is: no JSONB decoding, no re-validation of
+-- sections and citations, no re-serialization. content (JSONB) stays the
+-- queryable copy; rows completed before this migration are read through
+-- content::text instead.
+
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS content_json TEXT DEFAULT NULL;
@@ -0,0 +1,13 @@
+-- ========================================
+-- Precompressed report bodies
+-- ========================================
+-- body_gzip holds the complete GET /reports/{id} JSON body, gzip-compressed
+-- once when generation completes (REPORT_CONTENT_COMPRESSION=gzip). It is
+-- sent as-is to clients accepting gzip and replaces content_json for new
+-- reports; prose JSON typically gzips to a third or less of its size.
+--
+-- The bytes are already compressed, so TOAST is told not to try again
+-- (EXTERNAL: stored out of line, uncompressed).
+
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS body_gzip BYTEA DEFAULT NULL;
+ALTER TABLE reports ALTER COLUMN body_gzip SET STORAGE EXTERNAL;
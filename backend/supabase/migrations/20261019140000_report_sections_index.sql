@@ -0,0 +1,37 @@
+-- ========================================
+-- Report sections index
+-- ========================================
+-- Backs GET /reports/{id}/sections: headings and citation counts only,
+-- computed next to the data with JSONB operators so the section bodies
+-- and citations never leave the database. A report without content yet
+-- returns a single row with NULL section columns, so callers can tell
+-- "no sections yet" apart from "not found" (no rows).
+--
+-- GET /reports/{id}/sections/{n} needs no function: PostgREST selects
+-- content->sections->n directly.
+
+CREATE OR REPLACE FUNCTION report_sections_index(p_report_id UUID, p_user_id UUID)
+RETURNS TABLE (
+  status report_status,
+  section_num INTEGER,
+  heading TEXT,
+  citation_count INTEGER
+)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT
+    r.status,
+    s.ordinality::INTEGER,
+    s.section->>'heading',
+    COALESCE(jsonb_array_length(s.section->'citations'), 0)
+  FROM reports r
+  LEFT JOIN LATERAL jsonb_array_elements(r.content->'sections')
+    WITH ORDINALITY AS s(section, ordinality) ON TRUE
+  WHERE r.id = p_report_id
+    AND r.user_id = p_user_id
+    AND r.deleted_at IS NULL
+  ORDER BY s.ordinality;
+$$;
+
+COMMENT ON FUNCTION report_sections_index(UUID, UUID) IS 'Section headings and citation counts of a report (GET /reports/{id}/sections)';
@@ -0,0 +1,59 @@
+-- ========================================
+-- Normalized citation store
+-- ========================================
+-- Each cited source is stored once, keyed by the SHA-256 of its
+-- normalized URL: the URL, title and snippet it was first cited with,
+-- and its verification state. These are written on insert and never
+-- overwritten by later reports.
+--
+-- Completed reports keep {"citation_id": ...} references in
+-- content->sections->n->citations and link each one through
+-- report_citations: the citation, when it was accessed, and only the
+-- fields that differ from the shared row (NULL = same as citations).
+-- A source can be re-validated or invalidated once for every report
+-- that cites it.
+--
+-- content_json / body_gzip (the rendered API body served by
+-- GET /reports/{id}) still embed the full citations; only the queryable
+-- JSONB copy is compacted.
+
+CREATE TABLE IF NOT EXISTS citations (
+  id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+  url_hash TEXT NOT NULL UNIQUE,       -- sha256 hex of the normalized URL
+  url TEXT NOT NULL,                   -- normalized URL
+  cited_url TEXT NOT NULL,             -- as first cited (not normalized)
+  title TEXT NOT NULL,
+  snippet TEXT DEFAULT NULL,
+  invalidated_at TIMESTAMPTZ DEFAULT NULL,
+  created_at TIMESTAMPTZ DEFAULT NOW(),
+  updated_at TIMESTAMPTZ DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS report_citations (
+  report_id UUID NOT NULL REFERENCES reports(id) ON DELETE CASCADE,
+  section_num SMALLINT NOT NULL,       -- 1-based, as in GET /reports/{id}/sections
+  position SMALLINT NOT NULL,          -- index within the section's citations
+  citation_id UUID NOT NULL REFERENCES citations(id) ON DELETE RESTRICT,
+  accessed_at TIMESTAMPTZ NOT NULL,
+  -- Overrides, set only where this citation differs from the shared row
+  url TEXT DEFAULT NULL,               -- as cited, when not citations.cited_url
+  title TEXT DEFAULT NULL,
+  snippet TEXT DEFAULT NULL,           -- '' when this citation had no snippet
+  PRIMARY KEY (report_id, section_num, position)
+);
+
+-- "Which reports cite this URL": citation -> reports without touching reports.content
+CREATE INDEX IF NOT EXISTS idx_report_citations_citation_id
+  ON report_citations (citation_id, report_id);
+
+-- Citations are shared across users; only the service role reads and writes them
+ALTER TABLE citations ENABLE ROW LEVEL SECURITY;
+ALTER TABLE report_citations ENABLE ROW LEVEL SECURITY;
+
+CREATE TRIGGER update_citations_updated_at
+  BEFORE UPDATE ON citations
+  FOR EACH ROW
+  EXECUTE FUNCTION update_updated_at_column();
+
+COMMENT ON TABLE citations IS 'Cited sources (URL, first-cited title/snippet, verification state)';
+COMMENT ON TABLE report_citations IS 'Citations of each report section (per-report overrides only)';
@@ -0,0 +1,80 @@
+-- ========================================
+-- Full-text search over reports
+-- ========================================
+-- Backs GET /reports/search. search_tsv is a generated column, kept up to
+-- date by Postgres on every write, weighted so matches in the query
+-- (the report's subject) rank above section headings, which rank above
+-- the summary and section bodies. Citations are not indexed. Reports
+-- without content yet are still found by their query.
+--
+-- Adding a STORED generated column rewrites the table once; on a large
+-- table apply this during a quiet period.
+
+ALTER TABLE reports ADD COLUMN IF NOT EXISTS search_tsv TSVECTOR
+  GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(query, '')), 'A')
+    || setweight(
+      jsonb_to_tsvector(
+        'english',
+        jsonb_path_query_array(coalesce(content, '{}'), '$.sections[*].heading'),
+        '["string"]'
+      ),
+      'B'
+    )
+    || setweight(
+      jsonb_to_tsvector(
+        'english',
+        jsonb_path_query_array(coalesce(content, '{}'), '$.summary')
+          || jsonb_path_query_array(coalesce(content, '{}'), '$.sections[*].content'),
+        '["string"]'
+      ),
+      'C'
+    )
+  ) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_reports_search_tsv ON reports USING GIN (search_tsv);
+
+-- Ranked matches for one user. Rows are ranked and limited using the index
+-- first; ts_headline (which must read the section text) runs only on the
+-- rows returned, and only the snippet leaves the database.
+CREATE OR REPLACE FUNCTION search_reports(p_user_id UUID, p_query TEXT, p_limit INTEGER DEFAULT 20)
+RETURNS TABLE (
+  id UUID,
+  query TEXT,
+  status report_status,
+  created_at TIMESTAMPTZ,
+  expires_at TIMESTAMPTZ,
+  rank REAL,
+  snippet TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('english', p_query) AS tsq
+  ),
+  matches AS (
+    SELECT r.id, r.query, r.status, r.created_at, r.expires_at, r.content,
+           ts_rank_cd(r.search_tsv, q.tsq) AS rank
+    FROM reports r, q
+    WHERE r.user_id = p_user_id
+      AND r.deleted_at IS NULL
+      AND r.search_tsv @@ q.tsq
+    ORDER BY rank DESC, r.created_at DESC
+    LIMIT p_limit
+  )
+  SELECT m.id, m.query, m.status, m.created_at, m.expires_at, m.rank,
+         ts_headline(
+           'english',
+           concat_ws(' ', m.query, m.content->>'summary', (
+             SELECT string_agg(section->>'content', ' ')
+             FROM jsonb_array_elements(m.content->'sections') AS section
+           )),
+           q.tsq,
+           'StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10'
+         )
+  FROM matches m, q
+  ORDER BY m.rank DESC, m.created_at DESC;
+$$;
+
+COMMENT ON FUNCTION search_reports(UUID, TEXT, INTEGER) IS 'Ranked full-text search over a user''s reports with highlighted snippets (GET /reports/search)';
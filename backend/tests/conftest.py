@@ -7,6 +7,7 @@ from typing import Generator
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, MagicMock
 from src.main import app
+from database.instrumentation import track_queries
 
 
 @pytest.fixture(scope='function', autouse=True)
@@ -111,6 +112,15 @@ def client() -> Generator:
         yield c
 
 
+@pytest.fixture
+def query_tracker():
+    """
+    Track SQL statements for the test and fail it on N+1 query patterns
+    """
+    with track_queries(strict=True) as tracker:
+        yield tracker
+
+
 @pytest.fixture
 def mock_supabase():
     """
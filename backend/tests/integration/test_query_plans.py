@@ -0,0 +1,63 @@
+"""
+Query plan regression tests
+
+Runs the repositories' hot queries against a seeded PostgreSQL database
+and fails when a plan regresses: a sequential scan over the row
+threshold, a new scan of a table the baseline reached by index, a lost
+index, or a large cost increase.
+
+Requires PLAN_CHECK_DATABASE_URL pointing at a migrated, disposable
+database (it is seeded on first run). Baseline plans live in
+query_plan_baseline.json next to this file; generate it with
+scripts/index_advisor.py --update-baseline against a seeded database
+and regenerate it after an intended change.
+
+No baseline is committed yet. Until one is, this test only catches
+sequential scans over the row threshold; it cannot see new scans of
+small tables, lost indexes or cost increases, because those are
+relative to the baseline.
+"""
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+from database.adapters.postgresql import PostgreSQLAdapter
+from database.engines import engine_registry
+from database.plan_advisor import (
+    analyze_queries,
+    build_hot_queries,
+    find_regressions,
+    load_seed_ids,
+    seed,
+)
+
+DATABASE_URL = os.getenv("PLAN_CHECK_DATABASE_URL")
+BASELINE = Path(__file__).with_name("query_plan_baseline.json")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.database,
+    pytest.mark.skipif(not DATABASE_URL, reason="PLAN_CHECK_DATABASE_URL not set"),
+]
+
+
+async def test_hot_query_plans_do_not_regress():
+    """Test no hot repository query scans a large table or loses an index"""
+    adapter = PostgreSQLAdapter(DATABASE_URL)
+    try:
+        try:
+            ids = await load_seed_ids(adapter)
+        except ValueError:
+            ids = await seed(adapter)
+        reports = await analyze_queries(adapter, build_hot_queries(ids))
+    finally:
+        await adapter.close()
+        await engine_registry.dispose_all()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    problems = find_regressions(reports, baseline)
+
+    assert not problems, "Query plan regressions:\n" + "\n".join(problems)
@@ -2,7 +2,7 @@
 Integration tests for API endpoints
 """
 import pytest
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 from fastapi.testclient import TestClient
 from src.main import app
 from src.api.models.report import ReportStatus
@@ -85,6 +85,23 @@ class TestReportsEndpoints:
 
             assert response.status_code == 400
 
+    def test_initiate_report_daily_quota_exceeded(self, authenticated_client, sample_uk_query):
+        """Test POST /reports/initiate returns 429 once the daily report quota is used"""
+        from src.api.services.report_quota import QuotaDecision
+
+        with patch("src.api.routes.reports.report_quota") as mock_quota, \
+             patch("src.api.routes.reports.create_report") as mock_create:
+            mock_quota.acquire = AsyncMock(return_value=QuotaDecision(False, 10, 10, 3600))
+
+            response = authenticated_client.post(
+                "/reports/initiate",
+                json={"query": sample_uk_query},
+            )
+
+            assert response.status_code == 429
+            assert response.headers["Retry-After"] == "3600"
+            mock_create.assert_not_called()
+
     def test_get_report_by_id_unauthorized(self, client, mock_report_id):
         """Test GET /reports/{id} requires authentication"""
         response = client.get(f"/reports/{mock_report_id}")
@@ -92,10 +109,12 @@ class TestReportsEndpoints:
 
     def test_get_report_by_id_success(self, authenticated_client, mock_report_id, sample_report_data):
         """Test GET /reports/{id} with valid auth"""
-        with patch("src.api.routes.reports.get_report") as mock_get:
+        with patch("src.api.routes.reports.get_cached_report", return_value=None), \
+             patch("src.api.routes.reports.get_report_document") as mock_get:
             from src.api.models.report import Report
+            from src.api.services.report_cache import CachedReport
 
-            mock_get.return_value = Report(**sample_report_data)
+            mock_get.return_value = CachedReport.from_report(Report(**sample_report_data))
 
             response = authenticated_client.get(f"/reports/{mock_report_id}")
 
@@ -105,7 +124,8 @@ class TestReportsEndpoints:
 
     def test_get_report_by_id_not_found(self, authenticated_client, mock_report_id):
         """Test GET /reports/{id} returns 404 when not found"""
-        with patch("src.api.routes.reports.get_report") as mock_get:
+        with patch("src.api.routes.reports.get_cached_report", return_value=None), \
+             patch("src.api.routes.reports.get_report_document") as mock_get:
             mock_get.return_value = None
 
             response = authenticated_client.get(f"/reports/{mock_report_id}")
@@ -0,0 +1,341 @@
+"""
+Tests for the normalized citation store
+
+Tests URL normalization, deduplication, compaction of report content
+and expansion of citation references against a mocked Supabase client.
+"""
+
+import json
+import pytest
+from datetime import datetime, timezone
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+from src.api.models.report import ReportContent
+from src.api.services import report_service
+from src.api.services.citation_store import (
+    collect_citations,
+    expand_content,
+    expand_sections,
+    normalize_url,
+    store_citations,
+    url_hash,
+)
+
+GOV_UK = "https://www.gov.uk/student-visa"
+
+
+def citation(url, accessed_at="2026-10-01T10:00:00Z", title="Student visa"):
+    return {
+        "title": title,
+        "url": url,
+        "snippet": "Apply for a Student visa.",
+        "accessed_at": accessed_at,
+    }
+
+
+def shared(url, title="Student visa"):
+    """Fields of a citations row as first cited"""
+    return {"cited_url": url, "title": title, "snippet": "Apply for a Student visa."}
+
+
+def linked(section_num, position, stored, source=None, **overrides):
+    """report_citations row with its embedded citations row"""
+    return {
+        "section_num": section_num,
+        "position": position,
+        "accessed_at": stored["accessed_at"],
+        "title": None,
+        "url": None,
+        "snippet": None,
+        **overrides,
+        "citations": source or shared(stored["url"], stored["title"]),
+    }
+
+
+def make_content():
+    return {
+        "query": "Studying Computer Science in the UK",
+        "summary": "...",
+        "sections": [
+            {"heading": "Executive Summary", "content": "...", "citations": []},
+            {
+                "heading": "Visa & Immigration Overview",
+                "content": "...",
+                "citations": [
+                    citation(GOV_UK),
+                    citation("https://www.ucas.com/international", title="UCAS"),
+                ],
+            },
+            {
+                "heading": "Post-Study Work Options",
+                "content": "...",
+                "citations": [
+                    citation("https://gov.uk/student-visa/?utm_source=x", "2026-10-02T09:00:00Z"),
+                ],
+            },
+        ],
+        "total_citations": 3,
+        "generated_at": "2026-10-02T09:00:00Z",
+    }
+
+
+def make_supabase(*results):
+    """Chainable Supabase client mock returning `results` from successive execute() calls"""
+    supabase = MagicMock()
+    for method in ("table", "select", "update", "upsert", "eq", "in_"):
+        getattr(supabase, method).return_value = supabase
+    supabase.execute.side_effect = [Mock(data=data) for data in results]
+    return supabase
+
+
+class TestNormalizeUrl:
+    """Test suite for normalize_url"""
+
+    @pytest.mark.parametrize("variant", [
+        "https://www.gov.uk/student-visa",
+        "HTTPS://WWW.GOV.UK/student-visa/",
+        "https://gov.uk:443/student-visa#eligibility",
+        "https://gov.uk/student-visa?utm_source=newsletter&utm_medium=email",
+        "https://gov.uk/student-visa?gclid=abc",
+    ])
+    def test_variants_share_one_key(self, variant):
+        """Test cosmetic URL differences normalize to the same form"""
+        assert normalize_url(variant) == "https://gov.uk/student-visa"
+        assert url_hash(variant) == url_hash(GOV_UK)
+
+    def test_meaningful_differences_are_kept(self):
+        """Test path case, other query parameters and ports stay distinct"""
+        assert normalize_url("https://example.com/Page?b=2&a=1") == (
+            "https://example.com/Page?a=1&b=2"
+        )
+        assert normalize_url("http://example.com:8080/") == "http://example.com:8080"
+        assert url_hash("https://example.com/page") != url_hash("https://example.com/Page")
+
+
+class TestCollectCitations:
+    """Test suite for collect_citations"""
+
+    def test_deduplicates_across_sections(self):
+        """Test one row per source and one reference per citation, each as cited"""
+        rows, refs = collect_citations(make_content())
+
+        assert len(rows) == 2
+        assert rows[url_hash(GOV_UK)] == {
+            "url_hash": url_hash(GOV_UK),
+            "url": "https://gov.uk/student-visa",
+            "cited_url": GOV_UK,
+            "title": "Student visa",
+            "snippet": "Apply for a Student visa.",
+        }
+        assert [(ref.section_num, ref.position) for ref in refs] == [(2, 0), (2, 1), (3, 0)]
+        assert refs[0].url_hash == refs[2].url_hash
+        assert refs[0].url == GOV_UK
+        assert refs[2].url == "https://gov.uk/student-visa/?utm_source=x"
+        assert [refs[0].accessed_at, refs[2].accessed_at] == [
+            "2026-10-01T10:00:00Z", "2026-10-02T09:00:00Z",
+        ]
+
+
+class TestStoreCitations:
+    """Test suite for store_citations"""
+
+    def test_bulk_upsert_and_compaction(self):
+        """Test one insert and one read for sources, one upsert for references"""
+        ucas_url = "https://www.ucas.com/international"
+        gov, ucas = url_hash(GOV_UK), url_hash(ucas_url)
+        supabase = make_supabase(
+            [],
+            [
+                {"id": "c1", "url_hash": gov, **shared(GOV_UK)},
+                {"id": "c2", "url_hash": ucas, **shared(ucas_url, title="UCAS")},
+            ],
+            [],
+        )
+        content = make_content()
+
+        compact = store_citations(supabase, "report_1", content)
+
+        sources = supabase.upsert.call_args_list[0]
+        assert len(sources.args[0]) == 2
+        assert sources.kwargs == {"on_conflict": "url_hash", "ignore_duplicates": True}
+        supabase.in_.assert_called_once_with("url_hash", [gov, ucas])
+        links = supabase.upsert.call_args_list[1].args[0]
+        assert [(link["section_num"], link["position"], link["citation_id"]) for link in links] == [
+            (2, 0, "c1"), (2, 1, "c2"), (3, 0, "c1"),
+        ]
+        # Only what differs from the shared row is kept per report
+        assert links[0] == {
+            "report_id": "report_1", "section_num": 2, "position": 0, "citation_id": "c1",
+            "accessed_at": "2026-10-01T10:00:00Z", "title": None, "url": None, "snippet": None,
+        }
+        assert links[2]["url"] == "https://gov.uk/student-visa/?utm_source=x"
+        assert links[2]["accessed_at"] == "2026-10-02T09:00:00Z"
+        assert compact["sections"][1]["citations"] == [{"citation_id": "c1"}, {"citation_id": "c2"}]
+        assert compact["sections"][2]["citations"] == [{"citation_id": "c1"}]
+        assert len(json.dumps(compact)) < len(json.dumps(content))
+
+    def test_existing_source_not_overwritten(self):
+        """Test a later report's differing title and snippet are stored as overrides"""
+        supabase = make_supabase(
+            [],
+            [{"id": "c1", "url_hash": url_hash(GOV_UK), **shared(GOV_UK, title="Visas")}],
+            [],
+        )
+        section = {
+            "heading": "A",
+            "content": "...",
+            "citations": [{**citation(GOV_UK), "snippet": None}],
+        }
+        content = {"sections": [section]}
+
+        store_citations(supabase, "report_1", content)
+
+        link = supabase.upsert.call_args_list[1].args[0][0]
+        assert (link["title"], link["url"], link["snippet"]) == ("Student visa", None, "")
+
+    def test_no_citations_no_queries(self):
+        """Test content without citations is stored as-is"""
+        supabase = make_supabase()
+        content = {
+            "sections": [{"heading": "Executive Summary", "content": "...", "citations": []}]
+        }
+
+        assert store_citations(supabase, "report_1", content) is content
+        supabase.table.assert_not_called()
+
+
+class TestExpandCitations:
+    """Test suite for expand_sections / expand_content"""
+
+    def test_references_expanded_in_one_query(self):
+        """Test references resolve to the report's own citations with a single lookup"""
+        first = citation(GOV_UK, title="Student visa: overview")
+        second = citation("https://gov.uk/student-visa?utm_source=x", title="Student visa: fees")
+        supabase = make_supabase([
+            linked(1, 0, first),
+            linked(
+                2, 0, second, source=shared(GOV_UK, "Student visa: overview"),
+                url=second["url"], title=second["title"],
+            ),
+        ])
+        sections = [
+            {"heading": "A", "content": "...", "citations": [{"citation_id": "c1"}]},
+            {"heading": "B", "content": "...", "citations": [{"citation_id": "c1"}]},
+        ]
+
+        expanded = expand_sections(supabase, "report_1", sections)
+
+        supabase.table.assert_called_once_with("report_citations")
+        supabase.eq.assert_called_once_with("report_id", "report_1")
+        supabase.in_.assert_called_once_with("section_num", [1, 2])
+        # Same source, but each position keeps what was cited there
+        assert expanded[0]["citations"] == [first]
+        assert expanded[1]["citations"] == [second]
+
+    def test_single_section_numbered(self):
+        """Test a lone section is looked up by its own section number"""
+        stored = citation(GOV_UK)
+        supabase = make_supabase([linked(3, 0, stored)])
+        section = {"heading": "C", "content": "...", "citations": [{"citation_id": "c1"}]}
+
+        expanded = expand_sections(supabase, "report_1", [section], first_section_num=3)
+
+        supabase.in_.assert_called_once_with("section_num", [3])
+        assert expanded[0]["citations"] == [stored]
+
+    def test_unresolved_references_fall_back_to_shared_row(self):
+        """Test references without a report_citations row use the citations row"""
+        source = {"id": "c2", "created_at": "2026-09-01T00:00:00Z", **shared(GOV_UK)}
+        supabase = make_supabase([linked(1, 1, citation(GOV_UK))], [source])
+        section = {
+            "heading": "A",
+            "content": "...",
+            "citations": [{"citation_id": "c2"}, {"citation_id": "c1"}],
+        }
+
+        with patch("src.api.services.citation_store.logger") as mock_logger:
+            expanded = expand_sections(supabase, "report_1", [section])
+
+        assert expanded[0]["citations"] == [
+            citation(GOV_UK, accessed_at="2026-09-01T00:00:00Z"),
+            citation(GOV_UK),
+        ]
+        supabase.in_.assert_called_with("id", ["c2"])
+        mock_logger.warning.assert_called_once_with(
+            "citation_refs_unresolved", report_id="report_1", unresolved=1, missing_sources=0
+        )
+
+    def test_reference_kept_when_source_missing(self):
+        """Test a reference with no rows at all is kept as stored, not dropped"""
+        supabase = make_supabase([], [])
+        section = {"heading": "A", "content": "...", "citations": [{"citation_id": "c1"}]}
+
+        expanded = expand_sections(supabase, "report_1", [section])
+
+        assert expanded[0]["citations"] == [{"citation_id": "c1"}]
+
+    def test_empty_snippet_override_means_none(self):
+        """Test a '' snippet override expands to a citation without a snippet"""
+        stored = citation(GOV_UK)
+        supabase = make_supabase([linked(1, 0, stored, snippet="")])
+        section = {"heading": "A", "content": "...", "citations": [{"citation_id": "c1"}]}
+
+        expanded = expand_sections(supabase, "report_1", [section])
+
+        assert expanded[0]["citations"] == [{**stored, "snippet": None}]
+
+    def test_legacy_content_unchanged(self):
+        """Test content holding full citations needs no query"""
+        supabase = make_supabase()
+        content = make_content()
+
+        assert expand_content(supabase, "report_1", content) is content
+        assert expand_content(supabase, "report_1", None) is None
+        supabase.table.assert_not_called()
+
+
+class TestReportServiceCitations:
+    """Test suite for citation store integration in the report service"""
+
+    @pytest.mark.asyncio
+    async def test_invalidate_citation_returns_citing_reports(self):
+        """Test invalidation is one update by url_hash plus a lookup of citing reports"""
+        citing = [{"report_id": "r2"}, {"report_id": "r1"}, {"report_id": "r2"}]
+        supabase = make_supabase([], citing)
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase):
+            report_ids = await report_service.invalidate_citation("https://gov.uk/student-visa/")
+
+        assert report_ids == ["r1", "r2"]
+        supabase.eq.assert_any_call("url_hash", url_hash(GOV_UK))
+        supabase.eq.assert_any_call("citations.url_hash", url_hash(GOV_UK))
+
+    @pytest.mark.asyncio
+    async def test_completion_keeps_full_citations_when_store_fails(self):
+        """Test a citation store error does not fail report generation"""
+        content = ReportContent.model_construct(
+            query="q", summary="s", sections=[], total_citations=3,
+            generated_at=datetime.now(timezone.utc),
+        )
+        pending = {
+            "id": "report_1", "user_id": "user_1", "query": "q", "status": "pending",
+            "error": None, "expires_at": "2099-01-01T00:00:00+00:00",
+            "created_at": "2026-10-01T00:00:00+00:00", "updated_at": "2026-10-01T00:00:00+00:00",
+            "deleted_at": None,
+        }
+        updates = []
+        supabase = make_supabase()
+        supabase.update.side_effect = lambda data: updates.append(data) or supabase
+        supabase.execute.side_effect = lambda: Mock(
+            data=[{**pending, **(updates[-1] if updates else {})}]
+        )
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase), \
+             patch.object(report_service, "generate_report", AsyncMock(return_value=content)), \
+             patch.object(report_service, "store_citations", side_effect=RuntimeError("down")):
+            await report_service.trigger_report_generation("report_1")
+
+        assert updates[-1]["status"] == "completed"
+        assert updates[-1]["content"]["total_citations"] == 3
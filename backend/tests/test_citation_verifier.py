@@ -0,0 +1,372 @@
+"""
+Tests for citation URL verification
+
+Runs the verifier against a local stub HTTP server (ThreadingHTTPServer on
+an ephemeral port), so redirects, HEAD fallbacks, timeouts and per-host
+limits are exercised over real connections.
+"""
+
+import asyncio
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+import httpx
+import pytest
+
+from src.api.models.report import Citation, ReportContent, ReportSection
+from src.api.services import report_service
+from src.api.services.citation_store import url_hash
+from src.api.services import citation_verifier
+from src.api.services.citation_verifier import (
+    BlockedURLError,
+    CitationVerifier,
+    VerificationCache,
+    VerificationResult,
+    VerificationStatus,
+)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Routes by path; records every request and the peak concurrency"""
+
+    def do_HEAD(self):
+        self._handle(head=True)
+
+    def do_GET(self):
+        self._handle(head=False)
+
+    def _handle(self, head):
+        server = self.server
+        with server.lock:
+            server.hits[(self.command, self.path)] += 1
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            path = self.path.split("?")[0]
+            if path == "/ok":
+                self._reply(200)
+            elif path == "/missing":
+                self._reply(404)
+            elif path == "/gone":
+                self._reply(410)
+            elif path == "/error":
+                self._reply(503)
+            elif path == "/redirect":
+                self._reply(301, location="/ok")
+            elif path == "/loop":
+                self._reply(302, location="/loop")
+            elif path == "/no-head":
+                self._reply(405 if head else 200)
+            elif path.startswith("/slow"):
+                time.sleep(server.delay)
+                self._reply(200)
+            else:
+                self._reply(404)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def _reply(self, status, location=None):
+        self.send_response(status)
+        if location:
+            self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.hits = Counter()
+    server.lock = threading.Lock()
+    server.active = 0
+    server.peak = 0
+    server.delay = 0.2
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+async def verifier():
+    verifier = CitationVerifier(timeout_seconds=2.0, per_host=4, allow_private_addresses=True)
+    yield verifier
+    await verifier.aclose()
+
+
+class FakeSharedStore:
+    """In-memory SharedReportStore"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestCitationVerifier:
+    """Test suite for CitationVerifier against the stub server"""
+
+    @pytest.mark.asyncio
+    async def test_statuses(self, stub_server, verifier):
+        """Test 2xx/3xx are ok, 404/410 broken, everything else inconclusive"""
+        base = stub_server.url
+        urls = [f"{base}/ok", f"{base}/missing", f"{base}/gone", f"{base}/error", "ftp://x.org/a"]
+        results = await verifier.verify_all(urls)
+
+        assert [result.status for result in results.values()] == [
+            VerificationStatus.OK,
+            VerificationStatus.BROKEN,
+            VerificationStatus.BROKEN,
+            VerificationStatus.UNKNOWN,
+            VerificationStatus.BROKEN,
+        ]
+        assert results[f"{base}/missing"].http_status == 404
+        assert results[f"{base}/error"].http_status == 503
+
+    @pytest.mark.asyncio
+    async def test_redirects_followed_and_loops_bounded(self, stub_server, verifier):
+        """Test redirects resolve to the final URL and loops give up"""
+        base = stub_server.url
+        results = await verifier.verify_all([f"{base}/redirect", f"{base}/loop"])
+
+        assert results[f"{base}/redirect"].status == VerificationStatus.OK
+        assert results[f"{base}/redirect"].final_url == f"{base}/ok"
+        assert results[f"{base}/loop"].status == VerificationStatus.UNKNOWN
+        assert results[f"{base}/loop"].error == "TooManyRedirects"
+
+    @pytest.mark.asyncio
+    async def test_head_refused_falls_back_to_get(self, stub_server, verifier):
+        """Test a 405 to HEAD is retried with GET"""
+        result = await verifier.verify(f"{stub_server.url}/no-head")
+
+        assert result.status == VerificationStatus.OK
+        assert stub_server.hits[("HEAD", "/no-head")] == 1
+        assert stub_server.hits[("GET", "/no-head")] == 1
+
+    @pytest.mark.asyncio
+    async def test_timeout_is_inconclusive(self, stub_server):
+        """Test a slow server yields UNKNOWN within the timeout"""
+        stub_server.delay = 1.0
+        verifier = CitationVerifier(timeout_seconds=0.2, allow_private_addresses=True)
+        try:
+            started = time.monotonic()
+            result = await verifier.verify(f"{stub_server.url}/slow")
+        finally:
+            await verifier.aclose()
+
+        assert result.status == VerificationStatus.UNKNOWN
+        assert time.monotonic() - started < 1.0
+
+    @pytest.mark.asyncio
+    async def test_checks_run_in_parallel_within_host_limit(self, stub_server):
+        """Test 12 slow URLs take ~3 rounds at 4 per host, not 12"""
+        verifier = CitationVerifier(
+            timeout_seconds=5.0, per_host=4, allow_private_addresses=True
+        )
+        urls = [f"{stub_server.url}/slow/{n}" for n in range(12)]
+        try:
+            started = time.monotonic()
+            results = await verifier.verify_all(urls)
+            elapsed = time.monotonic() - started
+        finally:
+            await verifier.aclose()
+
+        assert all(result.status == VerificationStatus.OK for result in results.values())
+        assert stub_server.peak <= 4
+        assert elapsed < 12 * stub_server.delay / 2
+        # Per-host limits are dropped once a host has nothing in flight
+        assert verifier._host_limits == {}
+
+    @pytest.mark.asyncio
+    async def test_cached_and_deduplicated(self, stub_server, verifier):
+        """Test each normalized URL is requested once across calls and duplicates"""
+        base = stub_server.url
+        await verifier.verify_all([f"{base}/ok", f"{base}/ok/", f"{base}/ok#top"])
+        await verifier.verify_all([f"{base}/ok?utm_source=report"])
+
+        assert stub_server.hits[("HEAD", "/ok")] == 1
+
+
+class TestAddressGuard:
+    """Test suite for the public-address (SSRF) guard"""
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("url", [
+        "http://127.0.0.1/ok",
+        "http://10.0.0.5/",
+        "http://192.168.1.1/",
+        "http://169.254.169.254/latest/meta-data/",
+        "http://0.0.0.0/",
+        "http://[::1]/",
+        "http://[::ffff:127.0.0.1]/",
+        "http://240.0.0.1/",
+        "file:///etc/passwd",
+    ])
+    async def test_non_public_targets_rejected(self, url):
+        """Test private, loopback, link-local and reserved targets are refused"""
+        with pytest.raises(BlockedURLError):
+            await citation_verifier.ensure_public_url(httpx.URL(url))
+
+    @pytest.mark.asyncio
+    async def test_public_address_allowed(self):
+        """Test a public address passes"""
+        await citation_verifier.ensure_public_url(httpx.URL("https://93.184.216.34/page"))
+
+    @pytest.mark.asyncio
+    async def test_private_url_not_requested(self, stub_server):
+        """Test the default verifier never connects to a private address"""
+        verifier = CitationVerifier(timeout_seconds=2.0)
+        try:
+            result = await verifier.verify(f"{stub_server.url}/ok")
+        finally:
+            await verifier.aclose()
+
+        assert result.status == VerificationStatus.BROKEN
+        assert result.error == "blocked url"
+        assert sum(stub_server.hits.values()) == 0
+
+    @pytest.mark.asyncio
+    async def test_redirect_hops_checked(self, stub_server):
+        """Test a redirect into a blocked target is refused before it is followed"""
+
+        async def guard(url):
+            if url.path == "/ok":
+                raise BlockedURLError("private")
+
+        verifier = CitationVerifier(timeout_seconds=2.0)
+        try:
+            with patch.object(citation_verifier, "ensure_public_url", side_effect=guard):
+                result = await verifier.verify(f"{stub_server.url}/redirect")
+        finally:
+            await verifier.aclose()
+
+        assert result.error == "blocked url"
+        assert stub_server.hits[("HEAD", "/redirect")] == 1
+        assert stub_server.hits[("HEAD", "/ok")] == 0
+
+
+class TestVerificationCache:
+    """Test suite for VerificationCache"""
+
+    def make_result(self, status=VerificationStatus.OK, age_seconds=0):
+        checked_at = datetime.now(timezone.utc) - timedelta(seconds=age_seconds)
+        return VerificationResult("https://gov.uk/student-visa", status, checked_at, 200)
+
+    @pytest.mark.asyncio
+    async def test_results_expire_after_ttl(self):
+        """Test results older than the TTL are misses; inconclusive ones expire sooner"""
+        cache = VerificationCache(ttl_seconds=60, unknown_ttl_seconds=5)
+
+        await cache.put(self.make_result(age_seconds=30))
+        assert await cache.get("https://www.gov.uk/student-visa") is not None
+
+        await cache.put(self.make_result(age_seconds=61))
+        assert await cache.get("https://gov.uk/student-visa") is None
+
+        await cache.put(self.make_result(VerificationStatus.UNKNOWN, age_seconds=30))
+        assert await cache.get("https://gov.uk/student-visa") is None
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_serves_other_workers(self):
+        """Test a result checked by one worker is reused by another"""
+        shared = FakeSharedStore()
+        await VerificationCache(shared=shared).put(self.make_result())
+
+        result = await VerificationCache(shared=shared).get("https://gov.uk/student-visa")
+
+        assert result.status == VerificationStatus.OK
+        assert result.http_status == 200
+
+
+class TestReportServiceVerification:
+    """Test suite for recording verification results in the citation store"""
+
+    @pytest.mark.asyncio
+    async def test_broken_invalidated_ok_revalidated(self, stub_server):
+        """Test one update per outcome, keyed by url_hash; inconclusive left alone"""
+        base = stub_server.url
+        now = datetime.now(timezone.utc)
+        citations = [
+            Citation(title=path, url=f"{base}{path}", accessed_at=now)
+            for path in ("/ok", "/missing", "/error")
+        ]
+        content = ReportContent.model_construct(
+            sections=[ReportSection.model_construct(heading="A", content="", citations=citations)]
+        )
+        supabase = MagicMock()
+        for method in ("table", "update", "in_"):
+            getattr(supabase, method).return_value = supabase
+        supabase.execute.return_value = Mock(data=[])
+        verifier = CitationVerifier(timeout_seconds=2.0, allow_private_addresses=True)
+
+        try:
+            with patch.object(report_service, "citation_verifier", verifier):
+                await report_service._verify_citations(supabase, "report_1", content)
+        finally:
+            await verifier.aclose()
+
+        updates = [call.args[0]["invalidated_at"] for call in supabase.update.call_args_list]
+        hashes = [call.args[1] for call in supabase.in_.call_args_list]
+        assert updates[0] is not None and updates[1] is None
+        assert hashes == [[url_hash(f"{base}/missing")], [url_hash(f"{base}/ok")]]
+
+    @pytest.mark.asyncio
+    async def test_verification_runs_after_completion(self):
+        """Test the report is completed before checks start, and a check failure is logged"""
+        content = ReportContent.model_construct(
+            query="q", summary="s", sections=[], total_citations=0,
+            generated_at=datetime.now(timezone.utc),
+        )
+        pending = {
+            "id": "report_1", "user_id": "user_1", "query": "q", "status": "pending",
+            "error": None, "expires_at": "2099-01-01T00:00:00+00:00",
+            "created_at": "2026-10-01T00:00:00+00:00", "updated_at": "2026-10-01T00:00:00+00:00",
+            "deleted_at": None,
+        }
+        updates = []
+        supabase = MagicMock()
+        for method in ("table", "select", "eq"):
+            getattr(supabase, method).return_value = supabase
+        supabase.update.side_effect = lambda data: updates.append(data) or supabase
+        supabase.execute.side_effect = lambda: Mock(
+            data=[{**pending, **(updates[-1] if updates else {})}]
+        )
+        status_when_verified = []
+
+        async def verify(supabase, report_id, content):
+            status_when_verified.append(updates[-1]["status"])
+            raise RuntimeError("verifier down")
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase), \
+             patch.object(report_service, "generate_report", AsyncMock(return_value=content)), \
+             patch.object(report_service, "store_citations", side_effect=lambda s, r, c: c), \
+             patch.object(report_service.settings, "CITATION_VERIFY_ENABLED", True), \
+             patch.object(report_service, "_verify_citations", side_effect=verify), \
+             patch.object(report_service, "logger") as mock_logger:
+            await report_service.trigger_report_generation("report_1")
+            await asyncio.gather(*report_service._verification_tasks)
+
+        assert status_when_verified == ["completed"]
+        assert not report_service._verification_tasks
+        mock_logger.warning.assert_called_once_with(
+            "citation_verify_failed", report_id="report_1", error="verifier down"
+        )
@@ -0,0 +1,98 @@
+"""
+Tests for Engine Registry
+
+Tests for process-wide engine sharing, warm-up and disposal.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from database.engines import EngineRegistry
+
+URL = "postgresql+asyncpg://localhost/test"
+
+
+class TestEngineRegistry:
+    """Test suite for EngineRegistry"""
+
+    def test_same_url_and_options_share_engine(self):
+        """Test identical URL and options return the same engine"""
+        registry = EngineRegistry()
+
+        first = registry.get(URL, pool_size=5, max_overflow=10)
+        second = registry.get(URL, max_overflow=10, pool_size=5)
+
+        assert first is second
+
+    def test_different_options_get_separate_engines(self):
+        """Test different pool settings get their own engine"""
+        registry = EngineRegistry()
+
+        assert registry.get(URL, pool_size=5) is not registry.get(URL, pool_size=10)
+
+    @pytest.mark.asyncio
+    async def test_dispose_forgets_engine(self):
+        """Test a disposed engine is replaced on the next get"""
+        registry = EngineRegistry()
+        engine = registry.get(URL, pool_size=5)
+
+        await registry.dispose(engine)
+
+        assert registry.get(URL, pool_size=5) is not engine
+
+    @pytest.mark.asyncio
+    async def test_release_disposes_with_last_reference(self):
+        """Test a shared engine stays open until every holder releases it"""
+        registry = EngineRegistry()
+        engine = registry.get(URL, pool_size=5)
+        assert registry.get(URL, pool_size=5) is engine
+
+        await registry.release(engine)
+        assert registry.get(URL, pool_size=5) is engine
+
+        await registry.release(engine)
+        await registry.release(engine)
+        assert registry.get(URL, pool_size=5) is not engine
+
+    @pytest.mark.asyncio
+    async def test_dispose_all(self):
+        """Test dispose_all disposes every registered engine"""
+        registry = EngineRegistry()
+        registry.get(URL, pool_size=5)
+        registry.get(URL, pool_size=10)
+
+        await registry.dispose_all()
+
+        assert registry._engines == {}
+
+    @pytest.mark.asyncio
+    async def test_warm_up_opens_connections_up_to_pool_size(self):
+        """Test warm-up opens min(min_size, pool size) connections and releases them"""
+        registry = EngineRegistry()
+        engine = MagicMock()
+        engine.sync_engine.pool.size.return_value = 3
+        connections = [AsyncMock() for _ in range(3)]
+
+        async def connect():
+            return connections.pop()
+
+        engine.connect = MagicMock(side_effect=lambda: connect())
+
+        opened = await registry.warm_up(engine, min_size=5)
+
+        assert opened == 3
+        assert engine.connect.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_warm_up_tolerates_connection_errors(self):
+        """Test failed warm-up connections are logged and skipped"""
+        registry = EngineRegistry()
+        engine = MagicMock()
+        engine.sync_engine.pool.size.return_value = 2
+
+        async def connect():
+            raise OSError("refused")
+
+        engine.connect = MagicMock(side_effect=lambda: connect())
+
+        assert await registry.warm_up(engine, min_size=2) == 0
@@ -0,0 +1,129 @@
+"""
+Tests for SQL Statement Instrumentation
+
+Tests for fingerprinting, per-block query tracking, N+1 detection and
+the slow-query log.
+"""
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+from database.instrumentation import (
+    NPlusOneError,
+    _after_cursor_execute,
+    _before_cursor_execute,
+    fingerprint,
+    fingerprint_id,
+    track_queries,
+)
+
+FIND_BY_ID = "SELECT reports.report_id FROM reports WHERE reports.report_id = $1::UUID"
+
+
+def run_statement(statement, engine=None):
+    """Fire the cursor hooks around a fake statement"""
+    conn = MagicMock()
+    conn.info = {}
+    conn.engine = engine if engine is not None else MagicMock()
+    _before_cursor_execute(conn, None, statement, None, None, False)
+    _after_cursor_execute(conn, None, statement, None, None, False)
+
+
+class TestFingerprint:
+    """Test suite for SQL fingerprinting"""
+
+    def test_parameters_and_literals_normalized(self):
+        """Test statements differing only in values share a fingerprint"""
+        a = "SELECT * FROM reports WHERE user_id = $1 AND subject = 'a' LIMIT 10"
+        b = "SELECT *  FROM reports\nWHERE user_id = $2 AND subject = 'it''s' LIMIT 50"
+
+        assert fingerprint(a) == fingerprint(b)
+        assert fingerprint(a) == "SELECT * FROM reports WHERE user_id = ? AND subject = ? LIMIT ?"
+        assert fingerprint_id(a) == fingerprint_id(b)
+
+    def test_in_lists_collapse(self):
+        """Test IN lists of any length share a fingerprint"""
+        assert fingerprint("SELECT 1 WHERE id IN (%s, %s)") == fingerprint(
+            "SELECT 1 WHERE id IN (%s, %s, %s, %s)"
+        )
+
+    def test_casts_preserved(self):
+        """Test ::type casts are not mistaken for named parameters"""
+        assert "::UUID" in fingerprint(FIND_BY_ID)
+
+
+class TestTrackQueries:
+    """Test suite for track_queries"""
+
+    def test_counts_statements_in_block(self):
+        """Test statements inside the block are counted"""
+        with track_queries() as tracker:
+            run_statement(FIND_BY_ID)
+            run_statement("UPDATE reports SET status = $1 WHERE reports.report_id = $2")
+
+        run_statement(FIND_BY_ID)
+
+        assert tracker.count == 2
+        assert tracker.by_fingerprint[fingerprint(FIND_BY_ID)] == 1
+        assert tracker.total_ms >= 0
+
+    def test_strict_mode_raises_on_n_plus_one(self):
+        """Test repeated find_by_id statements fail in strict mode"""
+        with pytest.raises(NPlusOneError, match="5x SELECT reports.report_id"):
+            with track_queries(n_plus_one_threshold=5, strict=True):
+                for _ in range(5):
+                    run_statement(FIND_BY_ID)
+
+    def test_below_threshold_passes(self):
+        """Test a few repeats are not flagged"""
+        with track_queries(n_plus_one_threshold=5, strict=True) as tracker:
+            for _ in range(4):
+                run_statement(FIND_BY_ID)
+
+        assert tracker.n_plus_one_suspects() == {}
+
+    def test_repeated_writes_are_not_n_plus_one(self):
+        """Test only SELECTs are flagged"""
+        with track_queries(n_plus_one_threshold=2, strict=True) as tracker:
+            for _ in range(3):
+                run_statement("INSERT INTO reports (subject) VALUES ($1)")
+
+        assert tracker.count == 3
+
+    def test_non_strict_mode_logs_warning(self):
+        """Test N+1 patterns are logged instead of raised outside strict mode"""
+        with patch("database.instrumentation.logger") as mock_logger:
+            with track_queries(n_plus_one_threshold=2):
+                run_statement(FIND_BY_ID)
+                run_statement(FIND_BY_ID)
+
+        mock_logger.warning.assert_called_once()
+        assert mock_logger.warning.call_args.args[0] == "n_plus_one_suspected"
+
+
+class TestSlowQueryLog:
+    """Test suite for the slow-query log"""
+
+    def test_slow_statement_logged_with_correlation_id(self):
+        """Test statements over the threshold are logged with fingerprint and correlation ID"""
+        from database import instrumentation
+        from logging_lib.correlation import CorrelationContext
+
+        engine = MagicMock()
+        instrumentation._instrumented[engine] = 0.0
+
+        with patch("database.instrumentation.logger") as mock_logger, CorrelationContext("corr-1"):
+            run_statement(FIND_BY_ID, engine=engine)
+
+        mock_logger.warning.assert_called_once()
+        kwargs = mock_logger.warning.call_args.kwargs
+        assert mock_logger.warning.call_args.args[0] == "slow_query"
+        assert kwargs["correlation_id"] == "corr-1"
+        assert kwargs["fingerprint_id"] == fingerprint_id(FIND_BY_ID)
+
+    def test_fast_statement_not_logged(self):
+        """Test statements under the threshold are not logged"""
+        with patch("database.instrumentation.logger") as mock_logger:
+            run_statement(FIND_BY_ID)
+
+        mock_logger.warning.assert_not_called()
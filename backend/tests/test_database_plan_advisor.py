@@ -0,0 +1,167 @@
+"""
+Tests for the Query Plan Advisor
+
+Tests plan summarizing, index suggestions and baseline comparison using
+canned EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) output.
+"""
+
+import json
+
+from database.plan_advisor import (
+    IndexSuggestion,
+    build_baseline,
+    find_regressions,
+    suggest_indexes,
+    summarize_plan,
+)
+
+RETENTION_SEQ_SCAN = [
+    {
+        "Plan": {
+            "Node Type": "Seq Scan",
+            "Relation Name": "reports",
+            "Total Cost": 412.5,
+            "Actual Rows": 120,
+            "Rows Removed by Filter": 9880,
+            "Filter": "((status = 'expired'::reportstatus) AND (expires_at < $1))",
+            "Shared Hit Blocks": 180,
+            "Shared Read Blocks": 12,
+        },
+        "Planning Time": 0.1,
+        "Execution Time": 3.4,
+    }
+]
+
+PAYMENTS_BY_USER_SORTED = [
+    {
+        "Plan": {
+            "Node Type": "Limit",
+            "Total Cost": 88.1,
+            "Shared Hit Blocks": 40,
+            "Shared Read Blocks": 0,
+            "Plans": [
+                {
+                    "Node Type": "Sort",
+                    "Sort Key": ["payments.created_at DESC"],
+                    "Total Cost": 88.0,
+                    "Plans": [
+                        {
+                            "Node Type": "Seq Scan",
+                            "Relation Name": "payments",
+                            "Total Cost": 80.0,
+                            "Actual Rows": 35,
+                            "Rows Removed by Filter": 6965,
+                            "Filter": "(user_id = $1)",
+                        }
+                    ],
+                }
+            ],
+        },
+        "Execution Time": 1.2,
+    }
+]
+
+REPORT_BY_ID = [
+    {
+        "Plan": {
+            "Node Type": "Index Scan",
+            "Relation Name": "reports",
+            "Index Name": "reports_pkey",
+            "Total Cost": 8.3,
+            "Actual Rows": 1,
+            "Shared Hit Blocks": 4,
+            "Shared Read Blocks": 0,
+        },
+        "Execution Time": 0.04,
+    }
+]
+
+
+class TestSummarizePlan:
+    """Test suite for summarize_plan"""
+
+    def test_seq_scan_counts_rows_read(self):
+        """Test rows removed by the filter count toward rows scanned"""
+        report = summarize_plan("reports.delete_expired_reports", "SELECT ...", RETENTION_SEQ_SCAN)
+
+        assert report.total_cost == 412.5
+        assert report.execution_ms == 3.4
+        assert report.shared_hit_blocks == 180
+        assert report.shared_read_blocks == 12
+        assert len(report.seq_scans) == 1
+        assert report.seq_scans[0].relation == "reports"
+        assert report.seq_scans[0].rows == 10000
+
+    def test_nested_plan_collects_sort_keys_and_indexes(self):
+        """Test child nodes are walked and inherit the parent's sort keys"""
+        report = summarize_plan("payments.find_by_user", "SELECT ...", PAYMENTS_BY_USER_SORTED)
+
+        assert report.node_types == ["Limit", "Sort", "Seq Scan"]
+        assert report.seq_scans[0].sort_keys == ["payments.created_at DESC"]
+
+        indexed = summarize_plan("reports.find_by_id", "SELECT ...", json.dumps(REPORT_BY_ID))
+        assert indexed.indexes == ["reports_pkey"]
+        assert indexed.seq_scans == []
+
+
+class TestSuggestIndexes:
+    """Test suite for suggest_indexes"""
+
+    def test_suggests_filter_then_sort_columns(self):
+        """Test suggestions cover filter columns, then the sort they feed"""
+        reports = [
+            summarize_plan("reports.delete_expired_reports", "SELECT ...", RETENTION_SEQ_SCAN),
+            summarize_plan("payments.find_by_user", "SELECT ...", PAYMENTS_BY_USER_SORTED),
+        ]
+
+        suggestions = suggest_indexes(reports, seq_scan_rows=1000)
+
+        assert [(s.table, s.columns) for s in suggestions] == [
+            ("reports", ["status", "expires_at"]),
+            ("payments", ["user_id", "created_at"]),
+        ]
+        assert "op.create_index('idx_reports_status_expires_at', 'reports'" in suggestions[0].migration()
+
+    def test_small_scans_are_ignored(self):
+        """Test scans under the threshold produce no suggestion"""
+        report = summarize_plan("reports.delete_expired_reports", "SELECT ...", RETENTION_SEQ_SCAN)
+
+        assert suggest_indexes([report], seq_scan_rows=50_000) == []
+
+    def test_suggestion_name(self):
+        """Test index names follow the idx_<table>_<columns> convention"""
+        assert IndexSuggestion("payments", ["user_id", "created_at"], "").name == (
+            "idx_payments_user_id_created_at"
+        )
+
+
+class TestFindRegressions:
+    """Test suite for find_regressions"""
+
+    def test_matching_baseline_is_clean(self):
+        """Test identical plans report no regressions"""
+        reports = [summarize_plan("reports.find_by_id", "SELECT ...", REPORT_BY_ID)]
+
+        assert find_regressions(reports, build_baseline(reports)) == []
+
+    def test_lost_index_and_new_seq_scan(self):
+        """Test switching from an index to a large seq scan is flagged"""
+        baseline = build_baseline(
+            [summarize_plan("reports.find_by_id", "SELECT ...", REPORT_BY_ID)]
+        )
+        current = [summarize_plan("reports.find_by_id", "SELECT ...", RETENTION_SEQ_SCAN)]
+
+        problems = find_regressions(current, baseline, seq_scan_rows=1000)
+
+        assert "reports.find_by_id: Seq Scan on reports read 10000 rows" in problems
+        assert "reports.find_by_id[0]: new Seq Scan on reports" in problems
+        assert "reports.find_by_id[0]: no longer uses index reports_pkey" in problems
+        assert any("cost 412.5 vs baseline 8.3" in problem for problem in problems)
+
+    def test_large_seq_scan_fails_without_baseline(self):
+        """Test the row threshold applies even to queries with no baseline"""
+        current = [summarize_plan("reports.expire_old_reports", "SELECT ...", RETENTION_SEQ_SCAN)]
+
+        assert find_regressions(current, {}, seq_scan_rows=1000) == [
+            "reports.expire_old_reports: Seq Scan on reports read 10000 rows"
+        ]
@@ -0,0 +1,107 @@
+"""
+Tests for Connection Pooler Compatibility
+
+Tests for pooler mode detection and the engine options per mode.
+"""
+
+import pytest
+
+from database.adapters.supabase import SupabaseAdapter
+from database.engines import EngineRegistry
+from database.pooler import (
+    PoolerMode,
+    detect_pooler_mode,
+    pooler_engine_options,
+    resolve_pooler_mode,
+    unique_statement_name,
+)
+
+
+class TestDetectPoolerMode:
+    """Test suite for detect_pooler_mode"""
+
+    @pytest.mark.parametrize(
+        "url,expected",
+        [
+            (
+                "postgresql+asyncpg://u:p@aws-0-eu-west-2.pooler.supabase.com:6543/postgres",
+                PoolerMode.TRANSACTION,
+            ),
+            (
+                "postgresql+asyncpg://u:p@aws-0-eu-west-2.pooler.supabase.com:5432/postgres",
+                PoolerMode.SESSION,
+            ),
+            ("postgresql+asyncpg://u:p@pgbouncer:6432/app", PoolerMode.TRANSACTION),
+            ("postgresql+asyncpg://u:p@db.abc.supabase.co:5432/postgres", PoolerMode.DIRECT),
+            ("postgresql+asyncpg://u:p@localhost/app", PoolerMode.DIRECT),
+        ],
+    )
+    def test_detect(self, url, expected):
+        """Test pooler mode is inferred from host and port"""
+        assert detect_pooler_mode(url) is expected
+
+    def test_explicit_mode_overrides_detection(self):
+        """Test a configured mode wins over detection"""
+        url = "postgresql+asyncpg://u:p@localhost/app"
+
+        assert resolve_pooler_mode(url, "transaction_prepared") is PoolerMode.TRANSACTION_PREPARED
+        assert resolve_pooler_mode(url, "auto") is PoolerMode.DIRECT
+
+
+class TestPoolerEngineOptions:
+    """Test suite for pooler_engine_options"""
+
+    def test_direct_keeps_statement_caches(self):
+        """Test direct connections keep the default prepared statement cache"""
+        options = pooler_engine_options(PoolerMode.DIRECT, query_cache_size=500)
+
+        assert options == {"query_cache_size": 500}
+
+    def test_transaction_disables_prepared_cache_and_names_uniquely(self):
+        """Test transaction pooling turns off prepared statement caching"""
+        options = pooler_engine_options(PoolerMode.TRANSACTION)
+        connect_args = options["connect_args"]
+
+        assert connect_args["statement_cache_size"] == 0
+        assert connect_args["prepared_statement_cache_size"] == 0
+        assert connect_args["prepared_statement_name_func"] is unique_statement_name
+        assert options["query_cache_size"] > 0
+
+    def test_transaction_prepared_keeps_cache(self):
+        """Test protocol-level prepared statement pooling keeps the cache"""
+        options = pooler_engine_options(
+            PoolerMode.TRANSACTION_PREPARED, prepared_statement_cache_size=250
+        )
+
+        assert options["connect_args"]["prepared_statement_cache_size"] == 250
+        assert "statement_cache_size" not in options["connect_args"]
+
+    def test_statement_names_are_unique(self):
+        """Test generated statement names do not repeat"""
+        assert unique_statement_name() != unique_statement_name()
+
+
+class TestSupabaseAdapterPoolerMode:
+    """Test suite for SupabaseAdapter pooler integration"""
+
+    def test_adapter_detects_transaction_pooler(self):
+        """Test the adapter configures the engine for a transaction pooler"""
+        adapter = SupabaseAdapter(
+            "postgresql+asyncpg://u:p@aws-0-eu-west-2.pooler.supabase.com:6543/postgres",
+            service_role_key="key",
+        )
+
+        assert adapter.pooler_mode is PoolerMode.TRANSACTION
+        assert adapter.engine.sync_engine._compiled_cache.capacity == 1200
+
+    def test_registry_accepts_connect_args(self):
+        """Test engine options with nested connect_args are shared, not duplicated"""
+        registry = EngineRegistry()
+        options = pooler_engine_options(PoolerMode.TRANSACTION)
+
+        first = registry.get("postgresql+asyncpg://pgbouncer:6432/app", **options)
+        second = registry.get(
+            "postgresql+asyncpg://pgbouncer:6432/app", **pooler_engine_options(PoolerMode.TRANSACTION)
+        )
+
+        assert first is second
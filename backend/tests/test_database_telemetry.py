@@ -0,0 +1,135 @@
+"""
+Tests for Connection Pool Telemetry
+
+Tests for pool statistics and the cached liveness probe.
+"""
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from database.adapters import PostgreSQLAdapter
+from database.telemetry import (
+    InstrumentedQueuePool,
+    LivenessProbe,
+    PoolTelemetry,
+)
+
+
+def create_engine(pool_size=2, max_overflow=1):
+    return create_async_engine(
+        "postgresql+asyncpg://localhost/test",
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        poolclass=InstrumentedQueuePool,
+    )
+
+
+class TestPoolTelemetry:
+    """Test suite for PoolTelemetry"""
+
+    def test_stats_on_idle_pool(self):
+        """Test an unused pool reports zero usage"""
+        telemetry = PoolTelemetry(create_engine())
+
+        stats = telemetry.stats()
+
+        assert stats.size == 2
+        assert stats.max_overflow == 1
+        assert stats.checked_out == 0
+        assert stats.utilization == 0.0
+        assert stats.saturated is False
+        assert stats.oldest_connection_age_s is None
+
+    def test_wait_histogram_buckets(self):
+        """Test checkout waits land in the right histogram buckets"""
+        telemetry = PoolTelemetry(create_engine())
+
+        telemetry.record_wait(0.3)
+        telemetry.record_wait(7)
+        telemetry.record_wait(60000)
+
+        histogram = telemetry.stats().wait_histogram_ms
+        assert histogram["le_1"] == 1
+        assert histogram["le_10"] == 1
+        assert histogram["le_inf"] == 1
+
+    def test_reconnect_counts_as_recycle(self):
+        """Test a second connect on the same pool record counts as a recycle"""
+        telemetry = PoolTelemetry(create_engine())
+        record = MagicMock(record_info={})
+
+        telemetry._on_connect(MagicMock(), record)
+        telemetry._on_connect(MagicMock(), record)
+        telemetry._on_connect(MagicMock(), MagicMock(record_info={}))
+
+        stats = telemetry.stats()
+        assert stats.connects == 3
+        assert stats.recycles == 1
+        assert stats.oldest_connection_age_s is not None
+
+        telemetry._on_close(MagicMock(), record)
+        assert len(telemetry._connected_at) == 1
+
+    def test_pool_recreate_keeps_telemetry(self):
+        """Test dispose/recreate keeps reporting to the same telemetry"""
+        engine = create_engine()
+        telemetry = PoolTelemetry(engine)
+
+        pool = engine.sync_engine.pool.recreate()
+
+        assert pool.telemetry is telemetry
+
+
+class TestLivenessProbe:
+    """Test suite for LivenessProbe"""
+
+    def create_probe(self, execute):
+        engine = MagicMock()
+        conn = AsyncMock()
+        conn.execute = execute
+        cm = AsyncMock()
+        cm.__aenter__.return_value = conn
+        engine.connect = MagicMock(return_value=cm)
+        return LivenessProbe(engine, ttl_seconds=60), engine
+
+    @pytest.mark.asyncio
+    async def test_probe_result_is_cached(self):
+        """Test a second probe within the TTL reuses the result"""
+        probe, engine = self.create_probe(AsyncMock())
+
+        first = await probe.check()
+        second = await probe.check()
+
+        assert first.ok is True
+        assert first.rtt_ms is not None
+        assert first.cached is False
+        assert second.cached is True
+        engine.connect.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_probe_failure_reports_error(self):
+        """Test a failing SELECT 1 reports not ok with the error"""
+        probe, _ = self.create_probe(AsyncMock(side_effect=OSError("refused")))
+
+        result = await probe.check()
+
+        assert result.ok is False
+        assert result.rtt_ms is None
+        assert "refused" in result.error
+
+    @pytest.mark.asyncio
+    async def test_adapter_ping_runs_probe_on_its_engine(self):
+        """Test adapters answer ping with a real SELECT 1 on their primary"""
+        adapter = PostgreSQLAdapter("postgresql+asyncpg://localhost/test")
+        execute = AsyncMock()
+        probe, _ = self.create_probe(execute)
+        assert adapter.probe.engine is adapter.engine
+        adapter.probe = probe
+
+        result = await adapter.ping()
+
+        assert result.ok is True
+        assert str(execute.call_args.args[0]) == "SELECT 1"
+        await adapter.close()
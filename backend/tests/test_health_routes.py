@@ -15,21 +15,78 @@ from src.api.routes.health import (
     check_payments_health,
     ServiceStatus,
 )
+from database.telemetry import PoolStats, ProbeResult
 
 
 class TestCheckDatabaseHealth:
     """Test suite for check_database_health function"""
 
+    @staticmethod
+    def create_db(probe, utilization=0.1):
+        mock_db = MagicMock()
+        mock_db.ping = AsyncMock(return_value=probe)
+        mock_db.pool_stats.return_value = PoolStats(
+            size=20,
+            max_overflow=10,
+            checked_out=round(30 * utilization),
+            idle=0,
+            overflow=0,
+            utilization=utilization,
+            saturated=utilization >= 1,
+            checkouts=100,
+            timeouts=0,
+            connects=5,
+            recycles=0,
+            oldest_connection_age_s=12.0,
+        )
+        return mock_db
+
     @pytest.mark.asyncio
     async def test_database_healthy(self):
         """Test database health check returns up when connected"""
-        mock_db = MagicMock()
+        mock_db = self.create_db(ProbeResult(ok=True, rtt_ms=1.5, checked_at=0.0))
 
         result = await check_database_health(mock_db)
 
         assert result.status == "up"
         assert result.message == "Database connected"
-        assert result.response_time_ms is not None
+        assert result.response_time_ms == 1.5
+        assert result.details["pool"]["checked_out"] == 3
+
+    @pytest.mark.asyncio
+    async def test_database_probe_failed(self):
+        """Test database health check returns down when the probe fails"""
+        mock_db = self.create_db(
+            ProbeResult(ok=False, rtt_ms=None, checked_at=0.0, error="Connection refused")
+        )
+
+        result = await check_database_health(mock_db)
+
+        assert result.status == "down"
+        assert "Connection refused" in result.message
+
+    @pytest.mark.asyncio
+    async def test_database_pool_pressure_degraded(self):
+        """Test database health check returns degraded when the pool is nearly full"""
+        mock_db = self.create_db(
+            ProbeResult(ok=True, rtt_ms=2.0, checked_at=0.0), utilization=0.95
+        )
+
+        result = await check_database_health(mock_db)
+
+        assert result.status == "degraded"
+        assert "95%" in result.message
+
+    @pytest.mark.asyncio
+    async def test_database_ping_error(self):
+        """Test database health check returns down when ping raises"""
+        mock_db = MagicMock()
+        mock_db.ping = AsyncMock(side_effect=RuntimeError("boom"))
+
+        result = await check_database_health(mock_db)
+
+        assert result.status == "down"
+        assert "boom" in result.message
 
 
 
@@ -0,0 +1,216 @@
+"""
+Tests for Rate Limit Backends
+
+InMemoryBackend, and SharedStoreBackend over the in-process
+LocalRateLimitStore stand-in: shared limits across instances, leasing,
+cached rejections and store failures.
+"""
+
+import asyncio
+
+import pytest
+
+from src.middleware.rate_limit_backend import (
+    InMemoryBackend,
+    LocalRateLimitStore,
+    SharedStoreBackend,
+)
+from src.middleware.rate_limiter import RateLimiter
+
+
+class CountingStore(LocalRateLimitStore):
+    """LocalRateLimitStore that counts (and can delay or fail) take() calls"""
+
+    def __init__(self, delay=0.0, error=None):
+        super().__init__()
+        self.calls = 0
+        self.delay = delay
+        self.error = error
+
+    async def take(self, key, capacity, refill_rate, needed, requested):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return await super().take(key, capacity, refill_rate, needed, requested)
+
+
+def make_backend(store, capacity=10, lease_tokens=3, lease_ttl_seconds=60.0):
+    # Refill slowly enough that no token comes back during a test
+    return SharedStoreBackend(
+        store,
+        capacity=capacity,
+        refill_rate=capacity / 3600.0,
+        lease_tokens=lease_tokens,
+        lease_ttl_seconds=lease_ttl_seconds,
+    )
+
+
+class TestInMemoryBackend:
+    """Test suite for InMemoryBackend"""
+
+    @pytest.mark.asyncio
+    async def test_allows_burst_then_rejects(self):
+        """Test the bucket admits its capacity, then reports the wait"""
+        backend = InMemoryBackend(capacity=3, refill_rate=1.0)
+
+        results = [await backend.consume("user:a") for _ in range(4)]
+
+        assert [r.allowed for r in results] == [True, True, True, False]
+        assert results[2].remaining == 0
+        assert 0 < results[3].wait_seconds <= 1.0
+
+    @pytest.mark.asyncio
+    async def test_refilled_buckets_expire(self):
+        """Test buckets that are full again are dropped as other requests arrive"""
+        backend = InMemoryBackend(capacity=2, refill_rate=1000.0)
+        for n in range(3):
+            await backend.consume(f"ip:{n}")
+
+        await asyncio.sleep(0.01)
+        await backend.consume("ip:new")
+
+        assert list(backend.buckets) == ["ip:new"]
+        assert backend.evicted == 0
+
+    @pytest.mark.asyncio
+    async def test_partially_used_buckets_kept(self):
+        """Test a client still paying back its burst is not forgotten"""
+        backend = InMemoryBackend(capacity=2, refill_rate=0.001)
+        await backend.consume("ip:a")
+        await backend.consume("ip:a")
+
+        for n in range(10):
+            await backend.consume(f"ip:{n}")
+
+        assert not (await backend.consume("ip:a")).allowed
+
+    @pytest.mark.asyncio
+    async def test_cap_evicts_least_recently_used(self):
+        """Test past max_buckets the least recently used bucket is evicted"""
+        backend = InMemoryBackend(capacity=5, refill_rate=0.001, max_buckets=2)
+
+        for identifier in ["ip:a", "ip:b", "ip:a", "ip:c"]:
+            await backend.consume(identifier)
+
+        assert list(backend.buckets) == ["ip:a", "ip:c"]
+        assert backend.evicted == 1
+
+
+class TestSharedStoreBackend:
+    """Test suite for SharedStoreBackend"""
+
+    @pytest.mark.asyncio
+    async def test_limit_holds_across_instances(self):
+        """Test two instances sharing a store admit the limit once, not twice"""
+        store = LocalRateLimitStore()
+        instances = [make_backend(store), make_backend(store)]
+
+        admitted = 0
+        for _ in range(20):
+            for backend in instances:
+                admitted += (await backend.consume("user:a")).allowed
+
+        assert admitted == 10
+
+    @pytest.mark.asyncio
+    async def test_lease_avoids_store_call_per_request(self):
+        """Test one store call serves lease_tokens requests"""
+        store = CountingStore()
+        backend = make_backend(store, capacity=100, lease_tokens=5)
+
+        results = [await backend.consume("user:a") for _ in range(10)]
+
+        assert all(r.allowed for r in results)
+        assert store.calls == 2
+        assert results[-1].remaining == 90
+
+    @pytest.mark.asyncio
+    async def test_lease_expires(self):
+        """Test unused leased tokens are dropped after the TTL"""
+        store = CountingStore()
+        backend = make_backend(store, capacity=100, lease_tokens=5, lease_ttl_seconds=0.01)
+
+        await backend.consume("user:a")
+        await asyncio.sleep(0.02)
+        await backend.consume("user:a")
+
+        assert store.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_rejection_cached_locally(self):
+        """Test a rejected client is not sent to the store again within the TTL"""
+        store = CountingStore()
+        backend = make_backend(store, capacity=2, lease_tokens=2)
+
+        results = [await backend.consume("user:a") for _ in range(6)]
+
+        assert [r.allowed for r in results] == [True, True, False, False, False, False]
+        assert store.calls == 2
+        assert results[-1].wait_seconds > 0
+
+    @pytest.mark.asyncio
+    async def test_cached_rejection_applies_only_to_costlier_requests(self):
+        """Test a rejected 10-token request does not block 1-token requests that still fit"""
+        store = CountingStore()
+        backend = make_backend(store, capacity=12)
+
+        assert (await backend.consume("user:a", 10)).allowed
+        assert not (await backend.consume("user:a", 10)).allowed
+        assert not (await backend.consume("user:a", 10)).allowed
+        # The repeated costly request was answered from the cached rejection
+        assert store.calls == 2
+
+        cheap = await backend.consume("user:a", 1)
+
+        assert cheap.allowed
+        assert cheap.wait_seconds == 0
+        assert store.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_store_call(self):
+        """Test a burst for one identifier waits on a single in-flight lease"""
+        store = CountingStore(delay=0.01)
+        backend = make_backend(store, capacity=100, lease_tokens=5)
+
+        results = await asyncio.gather(*(backend.consume("user:a") for _ in range(5)))
+
+        assert all(r.allowed for r in results)
+        assert store.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_burst_larger_than_lease_refills_in_turn(self):
+        """Test waiters left without a leased token queue behind the next store call"""
+        store = CountingStore(delay=0.01)
+        backend = make_backend(store, capacity=100, lease_tokens=2)
+
+        results = await asyncio.gather(*(backend.consume("user:a") for _ in range(10)))
+
+        assert all(r.allowed for r in results)
+        assert store.calls == 5
+
+    @pytest.mark.asyncio
+    async def test_store_failure_falls_back_to_local_buckets(self):
+        """Test store errors degrade to the in-process limit"""
+        store = CountingStore(error=ConnectionError("redis down"))
+        backend = make_backend(store, capacity=2)
+
+        results = [await backend.consume("user:a") for _ in range(3)]
+
+        assert [r.allowed for r in results] == [True, True, False]
+
+    @pytest.mark.asyncio
+    async def test_rate_limiter_uses_backend(self):
+        """Test RateLimiter decisions come from the configured backend"""
+        store = LocalRateLimitStore()
+        limiter = RateLimiter(
+            requests_per_minute=2, backend=make_backend(store, capacity=2, lease_tokens=1)
+        )
+
+        decisions = [await limiter.check("user:a", "/reports") for _ in range(3)]
+
+        assert [d.allowed for d in decisions] == [True, True, False]
+        assert decisions[0].remaining == 1
+        assert decisions[2].retry_after >= 1
+        assert "ratelimit:user:a" in store.buckets
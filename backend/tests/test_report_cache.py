@@ -0,0 +1,507 @@
+"""
+Tests for the completed report cache (ETag / 304 support)
+"""
+import gzip
+import json
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, Mock, patch
+
+from src.api.models.report import Report, ReportStatus
+from src.api.routes.reports import _cached_report_response
+from src.api.services import report_service
+from src.api.services.report_cache import (
+    CachedReport,
+    ReportCache,
+    accepts_gzip,
+    compress_body,
+    encode_bytea,
+    etag_matches,
+)
+
+
+CONTENT_JSON = '{"query":"q","summary":"s","sections":[],"total_citations":3}'
+
+
+def make_row(status="completed", content_json=CONTENT_JSON, **fields):
+    """reports row as returned by the trusted-path select"""
+    row = {
+        "id": "report_1",
+        "user_id": "user_1",
+        "query": "Studying Computer Science in UK universities",
+        "status": status,
+        "error": None,
+        "expires_at": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat(),
+        "created_at": "2026-10-19T12:00:00+00:00",
+        "updated_at": "2026-10-19T12:00:00+00:00",
+        "deleted_at": None,
+        "content_json": content_json,
+    }
+    row.update(fields)
+    return row
+
+
+def make_supabase(*results):
+    """Chainable Supabase client mock returning `results` from successive execute() calls"""
+    supabase = MagicMock()
+    for method in ("table", "select", "update", "eq", "is_"):
+        getattr(supabase, method).return_value = supabase
+    supabase.execute.side_effect = [Mock(data=data) for data in results]
+    return supabase
+
+
+def make_report(report_id="report_1", status=ReportStatus.COMPLETED, expires_in_days=30, **fields):
+    now = datetime.now(timezone.utc)
+    data = {
+        "id": report_id,
+        "user_id": "user_1",
+        "query": "Studying Computer Science in UK universities",
+        "status": status,
+        "content": None,
+        "expires_at": now + timedelta(days=expires_in_days),
+        "created_at": now,
+        "updated_at": now,
+    }
+    data.update(fields)
+    return Report(**data)
+
+
+class FakeSharedStore:
+    """In-memory SharedReportStore"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ttl_seconds):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+
+class TestReportCache:
+    """Test suite for ReportCache"""
+
+    @pytest.mark.asyncio
+    async def test_completed_report_cached_with_strong_etag(self):
+        """Test a completed report is cached with its serialized body and ETag"""
+        cache = ReportCache()
+        report = make_report()
+
+        entry = await cache.put(report)
+
+        assert entry.body == report.model_dump_json().encode()
+        assert entry.etag.startswith('"') and not entry.etag.startswith('W/')
+        assert await cache.get("report_1") is entry
+
+    @pytest.mark.asyncio
+    async def test_etag_is_stable_for_same_report(self):
+        """Test two processes serializing the same row agree on the ETag"""
+        report = make_report()
+
+        assert CachedReport.from_report(report).etag == CachedReport.from_report(
+            Report(**report.model_dump())
+        ).etag
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize(
+        "report",
+        [
+            make_report(status=ReportStatus.GENERATING),
+            make_report(deleted_at=datetime.now(timezone.utc)),
+            make_report(expires_in_days=-1),
+        ],
+    )
+    async def test_uncacheable_reports(self, report):
+        """Test in-progress, deleted and expired reports are not cached"""
+        cache = ReportCache()
+
+        assert await cache.put(report) is None
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_expired_entry_not_served(self):
+        """Test an entry stops being served once the report expires"""
+        cache = ReportCache()
+        await cache.put(make_report())
+        entry = cache._entries["report_1"]
+        cache._entries["report_1"] = CachedReport(
+            entry.report_id,
+            entry.user_id,
+            entry.status,
+            entry.body,
+            entry.etag,
+            datetime.now(timezone.utc) - timedelta(seconds=1),
+        )
+
+        assert await cache.get("report_1") is None
+        assert len(cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self):
+        """Test the least recently used report is evicted past max_entries"""
+        cache = ReportCache(max_entries=2)
+        for report_id in ("a", "b"):
+            await cache.put(make_report(report_id))
+        await cache.get("a")
+        await cache.put(make_report("c"))
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") is not None
+        assert await cache.get("c") is not None
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_serves_other_processes(self):
+        """Test a report cached by one worker is served to another from the shared tier"""
+        shared = FakeSharedStore()
+        original = await ReportCache(shared=shared).put(make_report())
+
+        entry = await ReportCache(shared=shared).get("report_1")
+
+        assert entry == original
+
+    @pytest.mark.asyncio
+    async def test_invalidate_clears_both_tiers(self):
+        """Test invalidation removes the report locally and from the shared tier"""
+        shared = FakeSharedStore()
+        cache = ReportCache(shared=shared)
+        await cache.put(make_report())
+
+        await cache.invalidate("report_1")
+
+        assert await cache.get("report_1") is None
+        assert shared.data == {}
+
+    @pytest.mark.asyncio
+    async def test_invalidate_reaches_other_instances(self):
+        """Test a soft delete on one worker stops another serving its local copy"""
+        shared = FakeSharedStore()
+        worker_a = ReportCache(shared=shared, local_ttl_seconds=5)
+        worker_b = ReportCache(shared=shared, local_ttl_seconds=5)
+        await worker_a.put(make_report())
+        assert await worker_b.get("report_1") is not None
+
+        await worker_a.invalidate("report_1")
+
+        with patch("src.api.services.report_cache.time.monotonic", return_value=1e9):
+            assert await worker_b.get("report_1") is None
+        assert len(worker_b) == 0
+
+    @pytest.mark.asyncio
+    async def test_local_entry_served_within_ttl(self):
+        """Test a fresh local entry is served without reading the shared tier"""
+        shared = FakeSharedStore()
+        cache = ReportCache(shared=shared, local_ttl_seconds=60)
+        entry = await cache.put(make_report())
+        shared.data.clear()
+
+        assert await cache.get("report_1") is entry
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_errors_are_misses(self):
+        """Test a failing shared tier degrades to the local tier"""
+        shared = MagicMock()
+        shared.get = AsyncMock(side_effect=ConnectionError("down"))
+        shared.set = AsyncMock(side_effect=ConnectionError("down"))
+        cache = ReportCache(shared=shared)
+
+        assert await cache.put(make_report()) is not None
+        assert await cache.get("missing") is None
+
+
+class TestTrustedRender:
+    """Test suite for CachedReport.from_row (no Pydantic on the read path)"""
+
+    def test_content_spliced_verbatim(self):
+        """Test the stored content JSON text is embedded without re-encoding"""
+        entry = CachedReport.from_row(make_row())
+
+        assert CONTENT_JSON.encode() in entry.body
+        data = json.loads(entry.body)
+        assert data["id"] == "report_1"
+        assert data["status"] == "completed"
+        assert data["content"]["total_citations"] == 3
+        assert set(data) == set(Report.model_fields)
+
+    def test_matches_validated_model_output(self):
+        """Test the trusted body decodes to the same document as the validated path"""
+        row = make_row()
+        validated = Report(**{**row, "content": None})
+
+        trusted = json.loads(CachedReport.from_row({**row, "content_json": None}).body)
+
+        assert trusted.keys() == json.loads(validated.model_dump_json()).keys()
+        assert trusted["content"] is None
+
+    def test_legacy_content_text(self):
+        """Test rows without content_json fall back to content::text"""
+        entry = CachedReport.from_row(make_row(content_json=None, content_text='{"a": 1}'))
+
+        assert json.loads(entry.body)["content"] == {"a": 1}
+
+
+class TestPrecompressedBodies:
+    """Test suite for stored and cached gzip bodies"""
+
+    def test_row_with_body_gzip(self):
+        """Test a stored gzip body is used for both encodings without recompressing"""
+        body = CachedReport.from_row(make_row()).body
+        stored = compress_body(body)
+
+        entry = CachedReport.from_row(make_row(content_json=None, body_gzip=encode_bytea(stored)))
+
+        assert entry.body_gzip == stored
+        assert entry.body == body
+        assert entry.gzip_etag != entry.etag
+
+    def test_compression_is_deterministic(self):
+        """Test the same body always compresses to the same bytes"""
+        body = CachedReport.from_row(make_row()).body
+
+        assert compress_body(body) == compress_body(body)
+        assert gzip.decompress(compress_body(body)) == body
+
+    @pytest.mark.asyncio
+    async def test_cached_entries_are_compressed_once(self):
+        """Test caching an entry without a stored gzip body compresses it once"""
+        cache = ReportCache()
+
+        entry = await cache.put_entry(CachedReport.from_row(make_row()))
+
+        assert gzip.decompress(entry.body_gzip) == entry.body
+        assert await cache.get("report_1") is entry
+
+    @pytest.mark.asyncio
+    async def test_shared_tier_stores_gzip(self):
+        """Test the shared tier keeps the compressed body and restores both encodings"""
+        shared = FakeSharedStore()
+        original = await ReportCache(shared=shared).put_entry(CachedReport.from_row(make_row()))
+
+        assert original.body_gzip in shared.data["report:report_1"]
+        assert await ReportCache(shared=shared).get("report_1") == original
+
+
+class TestAcceptsGzip:
+    """Test suite for Accept-Encoding parsing"""
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            ("gzip, deflate, br", True),
+            ("br;q=1.0, gzip;q=0.8", True),
+            ("*", True),
+            ("gzip;q=0, *", False),
+            ("br", False),
+            ("identity", False),
+            (None, False),
+        ],
+    )
+    def test_accepts_gzip(self, header, expected):
+        """Test gzip is chosen only when the client allows it"""
+        assert accepts_gzip(header) is expected
+
+
+class TestEtagMatches:
+    """Test suite for If-None-Match evaluation"""
+
+    @pytest.mark.parametrize(
+        "header,expected",
+        [
+            ('"abc"', True),
+            ('"xyz", "abc"', True),
+            ('W/"abc"', True),
+            ("*", True),
+            ('"xyz"', False),
+            (None, False),
+        ],
+    )
+    def test_etag_matches(self, header, expected):
+        """Test strong, weak, list and wildcard If-None-Match values"""
+        assert etag_matches(header, '"abc"') is expected
+
+
+class TestCachedReportResponse:
+    """Test suite for the cached GET /reports/{id} response"""
+
+    def test_matching_etag_returns_304(self):
+        """Test a current ETag gets 304 with no body"""
+        entry = CachedReport.from_report(make_report())
+
+        response = _cached_report_response(entry, entry.etag)
+
+        assert response.status_code == 304
+        assert response.body == b""
+        assert response.headers["etag"] == entry.etag
+
+    def test_gzip_client_gets_precompressed_body(self):
+        """Test a gzip-accepting client gets the stored bytes with Content-Encoding"""
+        entry = CachedReport.from_row(make_row()).with_gzip()
+
+        response = _cached_report_response(entry, None, "gzip, br")
+
+        assert response.body == entry.body_gzip
+        assert response.headers["content-encoding"] == "gzip"
+        assert response.headers["etag"] == entry.gzip_etag
+        assert response.headers["vary"] == "Accept-Encoding"
+
+    def test_identity_client_gets_plain_body(self):
+        """Test clients without gzip get the uncompressed body"""
+        entry = CachedReport.from_row(make_row()).with_gzip()
+
+        response = _cached_report_response(entry, None, "br")
+
+        assert response.body == entry.body
+        assert "content-encoding" not in response.headers
+        assert response.headers["etag"] == entry.etag
+
+    def test_either_etag_revalidates(self):
+        """Test a client holding the other encoding's ETag still gets 304"""
+        entry = CachedReport.from_row(make_row()).with_gzip()
+
+        response = _cached_report_response(entry, entry.etag, "gzip")
+
+        assert response.status_code == 304
+        assert response.headers["etag"] == entry.etag
+
+    def test_stale_etag_returns_body(self):
+        """Test a stale ETag gets the full pre-serialized body"""
+        entry = CachedReport.from_report(make_report())
+
+        response = _cached_report_response(entry, '"stale"')
+
+        assert response.status_code == 200
+        assert response.body == entry.body
+        assert response.headers["cache-control"] == "private, no-cache"
+
+
+class TestReportServiceCache:
+    """Test suite for report service cache integration"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_cache(self):
+        with patch.object(report_service, "report_cache", ReportCache()) as cache:
+            yield cache
+
+    @pytest.mark.asyncio
+    async def test_cached_report_checks_ownership(self, fresh_cache):
+        """Test a cached report is not served to another user"""
+        await fresh_cache.put(make_report())
+
+        assert await report_service.get_cached_report("report_1", "user_1") is not None
+        assert await report_service.get_cached_report("report_1", "user_2") is None
+
+    @pytest.mark.asyncio
+    async def test_soft_delete_invalidates(self, fresh_cache):
+        """Test soft deleting a report drops it from the cache"""
+        await fresh_cache.put(make_report())
+        supabase = MagicMock()
+        supabase.table.return_value = supabase
+        supabase.update.return_value = supabase
+        supabase.eq.return_value = supabase
+        supabase.execute.return_value = Mock(data=[{"id": "report_1"}])
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase):
+            assert await report_service.soft_delete_report("report_1", "user_1") is True
+
+        assert await report_service.get_cached_report("report_1", "user_1") is None
+
+    @pytest.mark.asyncio
+    async def test_get_report_document_uses_trusted_path(self, fresh_cache):
+        """Test a completed row is rendered without building Report models and cached"""
+        supabase = make_supabase([make_row()])
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase), \
+             patch.object(report_service, "Report", side_effect=AssertionError("validated")):
+            document = await report_service.get_report_document("report_1", "user_1")
+
+        assert CONTENT_JSON.encode() in document.body
+        supabase.select.assert_called_once_with(report_service._DOCUMENT_COLUMNS)
+        assert await report_service.get_cached_report("report_1", "user_1") is document
+
+    @pytest.mark.asyncio
+    async def test_get_report_document_legacy_row(self, fresh_cache):
+        """Test a completed row without content_json is read via content::text"""
+        supabase = make_supabase([make_row(content_json=None)], [{"content_text": '{"a": 1}'}])
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase):
+            document = await report_service.get_report_document("report_1", "user_1")
+
+        assert json.loads(document.body)["content"] == {"a": 1}
+        supabase.select.assert_called_with("content_text:content::text")
+
+    @pytest.mark.asyncio
+    async def test_get_report_document_gzip_row_single_query(self, fresh_cache):
+        """Test a row stored with body_gzip (no content_json) needs no legacy content read"""
+        body = CachedReport.from_row(make_row()).body
+        row = make_row(content_json=None, body_gzip=encode_bytea(compress_body(body)))
+        supabase = make_supabase([row])
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase):
+            document = await report_service.get_report_document("report_1", "user_1")
+
+        assert document.body == body
+        assert supabase.execute.call_count == 1
+        supabase.select.assert_called_once_with(report_service._DOCUMENT_COLUMNS)
+
+    @pytest.mark.asyncio
+    async def test_get_report_document_not_cached_while_generating(self, fresh_cache):
+        """Test in-progress reports are rendered but not cached"""
+        supabase = make_supabase([make_row(status="generating", content_json=None)])
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase):
+            document = await report_service.get_report_document("report_1", "user_1")
+
+        assert document.status == "generating"
+        assert len(fresh_cache) == 0
+
+    @pytest.mark.asyncio
+    async def test_get_report_document_not_found(self, fresh_cache):
+        """Test a missing or foreign report returns None"""
+        supabase = make_supabase([])
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase):
+            assert await report_service.get_report_document("report_1", "user_2") is None
+
+    @pytest.mark.asyncio
+    async def test_completion_stores_compressed_body(self, fresh_cache):
+        """Test generation writes the gzip body once and caches the stored row"""
+        from src.api.models.report import ReportContent
+
+        content = ReportContent.model_construct(
+            query="q",
+            summary="s",
+            sections=[],
+            total_citations=3,
+            generated_at=datetime.now(timezone.utc),
+        )
+        pending = make_row(status="pending", content_json=None)
+        updates = []
+        supabase = make_supabase()
+        supabase.update.side_effect = lambda data: updates.append(data) or supabase
+        # select, generating update, completed update (returns the stored row)
+        supabase.execute.side_effect = lambda: Mock(
+            data=[{**pending, **updates[-1]}] if updates else [pending]
+        )
+
+        with patch.object(report_service, "_is_supabase_enabled", return_value=True), \
+             patch.object(report_service, "_get_supabase", return_value=supabase), \
+             patch.object(report_service, "generate_report", AsyncMock(return_value=content)), \
+             patch.object(report_service.settings, "REPORT_CONTENT_COMPRESSION", "gzip"):
+            await report_service.trigger_report_generation("report_1")
+
+        completed = updates[-1]
+        assert completed["status"] == "completed"
+        assert "content_json" not in completed
+        body = gzip.decompress(bytes.fromhex(completed["body_gzip"][2:]))
+        assert json.loads(body)["content"]["total_citations"] == 3
+        cached = await report_service.get_cached_report("report_1", "user_1")
+        assert cached.body == body
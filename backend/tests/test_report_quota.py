@@ -0,0 +1,157 @@
+"""
+Tests for the Daily Report Quota
+
+SlidingWindowCounter arithmetic, and ReportQuota loading, enforcing and
+releasing the rolling per-user cap.
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.api.services.report_quota import ReportQuota, SlidingWindowCounter
+
+HOUR = 3600
+
+
+class FakeHistory:
+    """load_recent stand-in: creation times per user, plus call count"""
+
+    def __init__(self, times=None, error=None):
+        self.times = times or {}
+        self.error = error
+        self.calls = 0
+
+    async def __call__(self, user_id, since):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return [t for t in self.times.get(user_id, []) if t >= since]
+
+
+def hours_ago(hours):
+    return datetime.now(timezone.utc) - timedelta(hours=hours)
+
+
+class TestSlidingWindowCounter:
+    """Test suite for SlidingWindowCounter"""
+
+    def test_counts_events_within_window(self):
+        """Test events age out once their slot leaves the window"""
+        counter = SlidingWindowCounter(window_seconds=24 * HOUR, slots=24)
+        now = 1_000_000 * HOUR
+
+        counter.add(now - 30 * HOUR)
+        counter.add(now - 10 * HOUR)
+        counter.add(now)
+
+        assert counter.total(now) == 2
+        assert len(counter.counts) == 2
+
+    def test_seconds_until_below(self):
+        """Test the wait is until enough of the oldest events leave the window"""
+        counter = SlidingWindowCounter(window_seconds=24 * HOUR, slots=24)
+        now = 1_000_000 * HOUR
+        counter.add(now - 20 * HOUR)
+        counter.add(now - 2 * HOUR)
+
+        # Under the limit of 2 once the event from 20h ago has left (5h, slot-rounded)
+        assert counter.seconds_until_below(2, now) == 5 * HOUR
+        assert counter.seconds_until_below(3, now) == 0.0
+
+
+class TestReportQuota:
+    """Test suite for ReportQuota"""
+
+    @pytest.mark.asyncio
+    async def test_allows_up_to_limit(self):
+        """Test the limit is enforced per user with a Retry-After"""
+        quota = ReportQuota(limit=2, load_recent=FakeHistory())
+
+        decisions = [await quota.acquire("user_1") for _ in range(3)]
+
+        assert [d.allowed for d in decisions] == [True, True, False]
+        assert decisions[1].used == 2
+        assert decisions[2].retry_after > 23 * HOUR
+        assert (await quota.acquire("user_2")).allowed
+
+    @pytest.mark.asyncio
+    async def test_counts_reports_from_history(self):
+        """Test reports created before a restart still count; old ones do not"""
+        history = FakeHistory({"user_1": [hours_ago(1), hours_ago(3), hours_ago(30)]})
+        quota = ReportQuota(limit=3, load_recent=history)
+
+        assert (await quota.acquire("user_1")).used == 3
+        assert not (await quota.acquire("user_1")).allowed
+        assert history.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_resyncs_from_history(self):
+        """Test a counter older than resync_seconds is reloaded"""
+        history = FakeHistory()
+        quota = ReportQuota(limit=2, load_recent=history, resync_seconds=0)
+        await quota.acquire("user_1")
+
+        # Another instance created two reports meanwhile
+        history.times["user_1"] = [hours_ago(0), hours_ago(0)]
+
+        assert not (await quota.acquire("user_1")).allowed
+        assert history.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_release_gives_back_quota(self):
+        """Test a failed creation does not use up quota"""
+        quota = ReportQuota(limit=1, load_recent=FakeHistory())
+
+        decision = await quota.acquire("user_1")
+        assert decision.allowed
+        quota.release(decision.reservation)
+
+        assert (await quota.acquire("user_1")).allowed
+
+    @pytest.mark.asyncio
+    async def test_release_after_resync_leaves_fresh_count(self):
+        """Test a release after a reload does not uncount another report"""
+        history = FakeHistory()
+        quota = ReportQuota(limit=1, load_recent=history, resync_seconds=0)
+        decision = await quota.acquire("user_1")
+
+        # Reloaded: another instance's report is counted, ours never existed
+        history.times["user_1"] = [hours_ago(0)]
+        assert not (await quota.acquire("user_1")).allowed
+        quota.release(decision.reservation)
+
+        assert quota._users["user_1"].total(time.time()) == 1
+
+    @pytest.mark.asyncio
+    async def test_load_failure_counts_locally(self):
+        """Test an unreachable database does not block report creation"""
+        quota = ReportQuota(limit=1, load_recent=FakeHistory(error=ConnectionError("down")))
+
+        assert (await quota.acquire("user_1")).allowed
+        assert not (await quota.acquire("user_1")).allowed
+
+    @pytest.mark.asyncio
+    async def test_load_failure_retried_soon(self):
+        """Test a failed load is retried after load_retry_seconds, not resync_seconds"""
+        history = FakeHistory(error=ConnectionError("down"))
+        quota = ReportQuota(limit=5, load_recent=history, load_retry_seconds=0)
+        await quota.acquire("user_1")
+
+        history.error = None
+        history.times["user_1"] = [hours_ago(1), hours_ago(2)]
+
+        assert (await quota.acquire("user_1")).used == 3
+        assert history.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_caps_users_kept(self):
+        """Test counters beyond max_users are dropped least recently used first"""
+        quota = ReportQuota(limit=5, load_recent=FakeHistory(), max_users=2)
+
+        for user_id in ["user_1", "user_2", "user_3"]:
+            await quota.acquire(user_id)
+
+        assert list(quota._users) == ["user_2", "user_3"]
+        assert time.time() - quota._users["user_3"].loaded_at < 60
@@ -2,13 +2,17 @@
 Tests for report service (report lifecycle management)
 """
 import pytest
-from unittest.mock import patch, Mock, MagicMock
+from unittest.mock import call, patch, Mock, MagicMock
 from datetime import datetime, timedelta
 from src.api.services.report_service import (
     create_report,
     trigger_report_generation,
     get_report,
+    get_report_section,
+    get_report_sections_index,
+    get_report_state,
     list_user_reports,
+    search_user_reports,
     soft_delete_report,
 )
 from src.api.models.report import Report, ReportStatus, CreateReportResponse, ReportListItem
@@ -265,7 +269,66 @@ class TestListUserReports:
 
             await list_user_reports(mock_user_id)
 
-            mock_supabase.order.assert_called_once_with("created_at", desc=True)
+            # id breaks ties so keyset cursors are stable
+            assert mock_supabase.order.call_args_list == [
+                call("created_at", desc=True),
+                call("id", desc=True),
+            ]
+
+    @pytest.mark.asyncio
+    async def test_list_user_reports_with_cursor_seeks_past_position(self, mock_user_id):
+        """Test a cursor adds a keyset filter instead of an offset"""
+        from database.pagination import encode_cursor
+
+        with patch("src.api.services.report_service._is_supabase_enabled", return_value=True), \
+             patch("src.api.services.report_service._get_supabase") as mock_get_supabase:
+            mock_supabase = MagicMock()
+            for method in ("table", "select", "eq", "is_", "or_", "order", "limit"):
+                getattr(mock_supabase, method).return_value = mock_supabase
+            mock_supabase.execute.return_value = Mock(data=[])
+            mock_get_supabase.return_value = mock_supabase
+
+            created_at = datetime(2024, 12, 29, 12, 0, 0)
+            last_id = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+            cursor = encode_cursor(created_at, last_id)
+
+            await list_user_reports(mock_user_id, limit=10, cursor=cursor)
+
+            ts = created_at.isoformat()
+            mock_supabase.or_.assert_called_once_with(
+                f'created_at.lt."{ts}",and(created_at.eq."{ts}",id.lt.{last_id})'
+            )
+            mock_supabase.limit.assert_called_once_with(10)
+
+    @pytest.mark.asyncio
+    async def test_list_user_reports_invalid_cursor(self, mock_user_id):
+        """Test a malformed cursor is rejected"""
+        from database.pagination import InvalidCursorError
+
+        with patch("src.api.services.report_service._is_supabase_enabled", return_value=True), \
+             patch("src.api.services.report_service._get_supabase", return_value=MagicMock()):
+
+            with pytest.raises(InvalidCursorError):
+                await list_user_reports(mock_user_id, cursor="not-a-cursor")
+
+    @pytest.mark.asyncio
+    async def test_list_user_reports_tampered_cursor_id(self, mock_user_id):
+        """Test a cursor whose id is not a UUID is rejected before reaching the filter"""
+        from database.pagination import InvalidCursorError, encode_cursor
+
+        cursor = encode_cursor(datetime(2024, 12, 29, 12, 0, 0), "x),user_id.neq.none")
+
+        with patch("src.api.services.report_service._is_supabase_enabled", return_value=True), \
+             patch("src.api.services.report_service._get_supabase") as mock_get_supabase:
+            mock_supabase = MagicMock()
+            for method in ("table", "select", "eq", "is_", "or_", "order", "limit"):
+                getattr(mock_supabase, method).return_value = mock_supabase
+            mock_get_supabase.return_value = mock_supabase
+
+            with pytest.raises(InvalidCursorError):
+                await list_user_reports(mock_user_id, cursor=cursor)
+
+            mock_supabase.or_.assert_not_called()
 
 
 class TestSoftDeleteReport:
@@ -321,3 +384,137 @@ class TestSoftDeleteReport:
             eq_calls = mock_supabase.eq.call_args_list
             assert any(call[0][0] == "id" for call in eq_calls)
             assert any(call[0][0] == "user_id" for call in eq_calls)
+
+
+class TestReportSections:
+    """Test suite for the sections index and single-section reads"""
+
+    @pytest.fixture
+    def supabase(self):
+        mock_supabase = MagicMock()
+        for method in ("table", "select", "eq", "is_", "rpc"):
+            getattr(mock_supabase, method).return_value = mock_supabase
+        with patch("src.api.services.report_service._is_supabase_enabled", return_value=True), \
+             patch("src.api.services.report_service._get_supabase", return_value=mock_supabase):
+            yield mock_supabase
+
+    @pytest.mark.asyncio
+    async def test_get_report_section_selects_json_path(self, supabase, mock_report_id, mock_user_id):
+        """Test only content->sections->n is selected (0-based in JSON, 1-based in the API)"""
+        section = {"heading": "Estimated Cost of Studying", "content": "...", "citations": []}
+        supabase.execute.return_value = Mock(data=[{"section": section}])
+
+        result = await get_report_section(mock_report_id, mock_user_id, 3)
+
+        assert result == section
+        supabase.select.assert_called_once_with("section:content->sections->2")
+        supabase.eq.assert_any_call("user_id", mock_user_id)
+        supabase.is_.assert_called_once_with("deleted_at", "null")
+
+    @pytest.mark.asyncio
+    async def test_get_report_section_missing(self, supabase, mock_report_id, mock_user_id):
+        """Test a missing report or a section past the end returns None"""
+        supabase.execute.return_value = Mock(data=[])
+        assert await get_report_section(mock_report_id, mock_user_id, 1) is None
+
+        supabase.execute.return_value = Mock(data=[{"section": None}])
+        assert await get_report_section(mock_report_id, mock_user_id, 10) is None
+
+        assert await get_report_section(mock_report_id, mock_user_id, 0) is None
+
+    @pytest.mark.asyncio
+    async def test_get_report_sections_index(self, supabase, mock_report_id, mock_user_id):
+        """Test the index is built from report_sections_index() rows"""
+        supabase.execute.return_value = Mock(data=[
+            {"status": "completed", "section_num": 1, "heading": "Executive Summary",
+             "citation_count": 2},
+            {"status": "completed", "section_num": 2, "heading": "Study Options in the UK",
+             "citation_count": 4},
+        ])
+
+        index = await get_report_sections_index(mock_report_id, mock_user_id)
+
+        supabase.rpc.assert_called_once_with(
+            "report_sections_index", {"p_report_id": mock_report_id, "p_user_id": mock_user_id}
+        )
+        assert index.status == ReportStatus.COMPLETED
+        assert [(s.section_num, s.heading, s.citation_count) for s in index.sections] == [
+            (1, "Executive Summary", 2),
+            (2, "Study Options in the UK", 4),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_get_report_sections_index_without_content(
+        self, supabase, mock_report_id, mock_user_id
+    ):
+        """Test a report still generating has an empty index, a missing one has none"""
+        supabase.execute.return_value = Mock(data=[
+            {"status": "generating", "section_num": None, "heading": None, "citation_count": None},
+        ])
+        index = await get_report_sections_index(mock_report_id, mock_user_id)
+        assert index.status == ReportStatus.GENERATING
+        assert index.sections == []
+
+        supabase.execute.return_value = Mock(data=[])
+        assert await get_report_sections_index(mock_report_id, mock_user_id) is None
+
+    @pytest.mark.asyncio
+    async def test_get_report_state_skips_content(self, supabase, mock_report_id, mock_user_id):
+        """Test the ownership/state check selects no content and expands nothing"""
+        state = {"user_id": mock_user_id, "status": "pending", "query": "q"}
+        supabase.execute.return_value = Mock(data=[state])
+
+        assert await get_report_state(mock_report_id, mock_user_id) == state
+        supabase.select.assert_called_once_with("user_id, status, query")
+        supabase.table.assert_called_once_with("reports")
+        supabase.eq.assert_any_call("user_id", mock_user_id)
+
+        supabase.execute.return_value = Mock(data=[])
+        assert await get_report_state(mock_report_id, mock_user_id) is None
+
+    @pytest.mark.asyncio
+    async def test_dev_mode_sections_from_mock_report(self, mock_report_id, mock_user_id):
+        """Test dev mode (no Supabase) indexes and slices the mock report"""
+        with patch("src.api.services.report_service._is_supabase_enabled", return_value=False):
+            index = await get_report_sections_index(mock_report_id, mock_user_id)
+            section = await get_report_section(mock_report_id, mock_user_id, 2)
+
+        assert len(index.sections) == 10
+        assert section["heading"] == index.sections[1].heading
+        assert len(section["citations"]) == index.sections[1].citation_count
+
+
+class TestSearchUserReports:
+    """Test suite for full-text report search"""
+
+    @pytest.mark.asyncio
+    async def test_search_uses_rpc(self, mock_user_id):
+        """Test ranking and snippets come from search_reports() in one call"""
+        mock_supabase = MagicMock()
+        mock_supabase.rpc.return_value = mock_supabase
+        mock_supabase.execute.return_value = Mock(data=[{
+            "id": "report_1",
+            "query": "Computer Science in the UK",
+            "status": "completed",
+            "created_at": "2026-10-01T00:00:00+00:00",
+            "expires_at": "2026-10-31T00:00:00+00:00",
+            "rank": 0.6,
+            "snippet": "Graduate Route lets <mark>graduates</mark> stay for 2 years",
+        }])
+
+        with patch("src.api.services.report_service._is_supabase_enabled", return_value=True), \
+             patch("src.api.services.report_service._get_supabase", return_value=mock_supabase):
+            results = await search_user_reports(mock_user_id, "graduate visa", limit=5)
+
+        mock_supabase.rpc.assert_called_once_with(
+            "search_reports", {"p_user_id": mock_user_id, "p_query": "graduate visa", "p_limit": 5}
+        )
+        mock_supabase.table.assert_not_called()
+        assert results[0].id == "report_1"
+        assert "<mark>graduates</mark>" in results[0].snippet
+
+    @pytest.mark.asyncio
+    async def test_search_dev_mode_empty(self, mock_user_id):
+        """Test dev mode (no Supabase) returns no results"""
+        with patch("src.api.services.report_service._is_supabase_enabled", return_value=False):
+            assert await search_user_reports(mock_user_id, "visa") == []
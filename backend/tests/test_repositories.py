@@ -8,14 +8,23 @@ These tests mock the database adapter to test repository logic in isolation.
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
 from datetime import datetime, timedelta
+import time
 import uuid
 
+from sqlalchemy.dialects import postgresql
+
 from database.repositories.payment import PaymentRepository
 from database.repositories.user import UserRepository
 from database.repositories.report import ReportRepository
 from database.models.payment import Payment
 from database.models.user import User
-from database.models.report import Report, ReportStatus
+from database.models.report import Report, ReportStatus, ReportSummary
+from database.types import ConcurrentUpdateError
+from database.adapters.postgresql import PostgreSQLAdapter
+from database.unit_of_work import UnitOfWorkSession
+from database.instrumentation import _instrumented
+from database.identity_map import current_identity_map, identity_map
+from database.pagination import InvalidCursorError, decode_cursor, encode_cursor
 
 
 def create_mock_adapter():
@@ -30,6 +39,7 @@ def create_mock_adapter():
 
     # get_session returns an awaitable that returns the async context manager
     adapter.get_session = AsyncMock(return_value=async_cm)
+    adapter.get_read_session = adapter.get_session
 
     return adapter, session
 
@@ -403,18 +413,15 @@ class TestUserRepository:
         adapter, session = create_mock_adapter()
         repo = UserRepository(adapter)
 
-        mock_user = MagicMock(spec=User)
-
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_user
+        mock_result.scalar_one_or_none.return_value = "user_123"
         session.execute = AsyncMock(return_value=mock_result)
-        session.delete = AsyncMock()
         session.commit = AsyncMock()
 
         result = await repo.hard_delete("user_123")
 
         assert result is True
-        session.delete.assert_called_once_with(mock_user)
+        session.execute.assert_called_once()
         session.commit.assert_called_once()
 
     @pytest.mark.asyncio
@@ -573,6 +580,168 @@ class TestReportRepository:
 
         assert len(result) == 2
 
+    @pytest.mark.asyncio
+    async def test_find_by_user_without_body_defers_jsonb(self):
+        """Test find_by_user(load_body=False) does not select JSONB columns"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = []
+        mock_result = MagicMock()
+        mock_result.scalars.return_value = mock_scalars
+        session.execute = AsyncMock(return_value=mock_result)
+
+        await repo.find_by_user("user_123", load_body=False)
+
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "reports.subject" in sql
+        assert "reports.content" not in sql
+        assert "reports.citations" not in sql
+        assert "reports.generation_metadata" not in sql
+
+    @pytest.mark.asyncio
+    async def test_list_summaries_by_user(self):
+        """Test list_summaries_by_user returns compact rows from a projection"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        now = datetime.utcnow()
+        report_id = uuid.uuid4()
+        row = (report_id, "Computer Science", ReportStatus.COMPLETED, now, now, now)
+        mock_result = MagicMock()
+        mock_result.all.return_value = [row]
+        session.execute = AsyncMock(return_value=mock_result)
+
+        result = await repo.list_summaries_by_user("user_123", limit=10)
+
+        assert result == [ReportSummary(*row)]
+        assert result[0].report_id == report_id
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "reports.content" not in sql
+        assert "reports.status !=" in sql
+
+    @pytest.mark.asyncio
+    async def test_list_summaries_by_user_include_deleted(self):
+        """Test list_summaries_by_user with include_deleted=True has no status filter"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        mock_result = MagicMock()
+        mock_result.all.return_value = []
+        session.execute = AsyncMock(return_value=mock_result)
+
+        result = await repo.list_summaries_by_user("user_123", include_deleted=True)
+
+        assert result == []
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "reports.status !=" not in sql
+
+    @pytest.mark.asyncio
+    async def test_find_page_by_user_first_page_has_cursor(self):
+        """Test a full page returns a cursor pointing at its last row"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        now = datetime.utcnow()
+        reports = []
+        for i in range(3):
+            report = MagicMock(spec=Report)
+            report.report_id = uuid.uuid4()
+            report.created_at = now - timedelta(minutes=i)
+            reports.append(report)
+
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = reports  # limit + 1 rows => another page exists
+        mock_result = MagicMock()
+        mock_result.scalars.return_value = mock_scalars
+        session.execute = AsyncMock(return_value=mock_result)
+
+        page = await repo.find_page_by_user("user_123", limit=2)
+
+        assert page.items == reports[:2]
+        assert decode_cursor(page.next_cursor) == (
+            reports[1].created_at,
+            str(reports[1].report_id),
+        )
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "OFFSET" not in sql
+        assert "ORDER BY reports.created_at DESC, reports.report_id DESC" in sql
+
+    @pytest.mark.asyncio
+    async def test_find_page_by_user_last_page_has_no_cursor(self):
+        """Test a short page ends pagination"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = [MagicMock(spec=Report)]
+        mock_result = MagicMock()
+        mock_result.scalars.return_value = mock_scalars
+        session.execute = AsyncMock(return_value=mock_result)
+
+        page = await repo.find_page_by_user("user_123", limit=2)
+
+        assert len(page.items) == 1
+        assert page.next_cursor is None
+
+    @pytest.mark.asyncio
+    async def test_find_page_by_user_with_cursor_seeks(self):
+        """Test a cursor becomes a row-value comparison, not an offset"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = []
+        mock_result = MagicMock()
+        mock_result.scalars.return_value = mock_scalars
+        session.execute = AsyncMock(return_value=mock_result)
+
+        cursor = encode_cursor(datetime.utcnow(), uuid.uuid4())
+        await repo.find_page_by_user("user_123", after=cursor, limit=2)
+
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "(reports.created_at, reports.report_id) <" in sql
+        assert "OFFSET" not in sql
+
+    @pytest.mark.asyncio
+    async def test_find_page_by_user_invalid_cursor(self):
+        """Test malformed cursors are rejected before querying"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        session.execute = AsyncMock()
+
+        with pytest.raises(InvalidCursorError):
+            await repo.find_page_by_user("user_123", after="garbage")
+        with pytest.raises(InvalidCursorError):
+            await repo.find_page_by_user(
+                "user_123", after=encode_cursor(datetime.utcnow(), "not-a-uuid")
+            )
+
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_list_summary_page_by_user(self):
+        """Test summary pages use the projection and return a cursor"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        now = datetime.utcnow()
+        rows = [
+            (uuid.uuid4(), f"Subject {i}", ReportStatus.COMPLETED, now, now, now)
+            for i in range(2)
+        ]
+        mock_result = MagicMock()
+        mock_result.all.return_value = rows
+        session.execute = AsyncMock(return_value=mock_result)
+
+        page = await repo.list_summary_page_by_user("user_123", limit=1)
+
+        assert page.items == [ReportSummary(*rows[0])]
+        assert page.next_cursor == encode_cursor(now, rows[0][0])
+        sql = str(session.execute.call_args.args[0].compile(dialect=postgresql.dialect()))
+        assert "reports.content" not in sql
+
     @pytest.mark.asyncio
     async def test_create(self):
         """Test create adds and returns report"""
@@ -631,6 +800,82 @@ class TestReportRepository:
 
         assert result is None
 
+    @pytest.mark.asyncio
+    async def test_update_issues_single_statement(self):
+        """Test update is one UPDATE ... RETURNING round trip"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        mock_report = MagicMock(spec=Report)
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = mock_report
+        session.execute = AsyncMock(return_value=mock_result)
+        session.commit = AsyncMock()
+
+        result = await repo.update("report_123", {"status": ReportStatus.COMPLETED})
+
+        assert result == mock_report
+        session.execute.assert_called_once()
+        adapter.get_session.assert_called_once()
+        sql = str(session.execute.call_args.args[0])
+        assert sql.startswith("UPDATE reports")
+        assert "RETURNING" in sql
+
+    @pytest.mark.asyncio
+    async def test_update_ignores_unknown_keys(self):
+        """Test update with only unknown keys falls back to a read"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        mock_report = MagicMock(spec=Report)
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = mock_report
+        session.execute = AsyncMock(return_value=mock_result)
+
+        result = await repo.update("report_123", {"not_a_column": 1})
+
+        assert result == mock_report
+        assert str(session.execute.call_args.args[0]).startswith("SELECT")
+
+    @pytest.mark.asyncio
+    async def test_update_expected_mismatch_raises(self):
+        """Test optimistic-concurrency check raises when the row changed"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        no_row = MagicMock()
+        no_row.scalar_one_or_none.return_value = None
+        existing = MagicMock()
+        existing.scalar_one_or_none.return_value = MagicMock(spec=Report)
+        session.execute = AsyncMock(side_effect=[no_row, existing])
+        session.commit = AsyncMock()
+
+        with pytest.raises(ConcurrentUpdateError):
+            await repo.update(
+                "report_123",
+                {"status": ReportStatus.COMPLETED},
+                expected={"status": ReportStatus.GENERATING},
+            )
+
+    @pytest.mark.asyncio
+    async def test_update_expected_missing_row_returns_none(self):
+        """Test optimistic-concurrency check returns None when the row is gone"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = None
+        session.execute = AsyncMock(return_value=mock_result)
+        session.commit = AsyncMock()
+
+        result = await repo.update(
+            "report_123",
+            {"status": ReportStatus.COMPLETED},
+            expected={"status": ReportStatus.GENERATING},
+        )
+
+        assert result is None
+
     @pytest.mark.asyncio
     async def test_soft_delete(self):
         """Test soft_delete sets status to EXPIRED"""
@@ -657,18 +902,15 @@ class TestReportRepository:
         adapter, session = create_mock_adapter()
         repo = ReportRepository(adapter)
 
-        mock_report = MagicMock(spec=Report)
-
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_report
+        mock_result.scalar_one_or_none.return_value = "report_123"
         session.execute = AsyncMock(return_value=mock_result)
-        session.delete = AsyncMock()
         session.commit = AsyncMock()
 
         result = await repo.hard_delete("report_123")
 
         assert result is True
-        session.delete.assert_called_once()
+        session.execute.assert_called_once()
         session.commit.assert_called_once()
 
     @pytest.mark.asyncio
@@ -711,11 +953,9 @@ class TestReportRepository:
         adapter, session = create_mock_adapter()
         repo = ReportRepository(adapter)
 
-        mock_report = MagicMock(spec=Report)
-        mock_report.status = ReportStatus.COMPLETED  # Not expired
-
+        # The status guard in the UPDATE matches no row for a non-expired report
         mock_result = MagicMock()
-        mock_result.scalar_one_or_none.return_value = mock_report
+        mock_result.scalar_one_or_none.return_value = None
         session.execute = AsyncMock(return_value=mock_result)
 
         result = await repo.restore("report_123")
@@ -823,3 +1063,403 @@ class TestReportRepository:
         count = await repo.delete_expired_reports()
 
         assert count == 0
+
+    @pytest.mark.asyncio
+    async def test_find_many_by_ids_binds_single_array(self):
+        """Test find_many_by_ids issues one query with pk = ANY(array)"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        ids = [str(uuid.uuid4()) for _ in range(3)]
+
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = [MagicMock(spec=Report)]
+        mock_result = MagicMock()
+        mock_result.scalars.return_value = mock_scalars
+        session.execute = AsyncMock(return_value=mock_result)
+
+        result = await repo.find_many_by_ids(ids)
+
+        assert len(result) == 1
+        session.execute.assert_called_once()
+        stmt = session.execute.call_args.args[0]
+        sql = str(stmt.compile(dialect=postgresql.dialect()))
+        assert "reports.report_id = ANY (%(ids)s::UUID[])" in sql
+        assert "reports.status !=" in sql
+        assert stmt.compile().params["ids"] == [uuid.UUID(i) for i in ids]
+
+    @pytest.mark.asyncio
+    async def test_find_many_by_ids_empty(self):
+        """Test find_many_by_ids skips the query for no IDs"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        assert await repo.find_many_by_ids([]) == []
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_single_executemany(self):
+        """Test bulk_create sends all rows in one INSERT ... RETURNING"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        user_id = uuid.uuid4()
+        rows = [{"user_id": user_id, "subject": f"q{i}", "bogus": 1} for i in range(3)]
+
+        mock_scalars = MagicMock()
+        mock_scalars.all.return_value = [MagicMock(spec=Report) for _ in rows]
+        mock_result = MagicMock()
+        mock_result.scalars.return_value = mock_scalars
+        session.execute = AsyncMock(return_value=mock_result)
+        session.commit = AsyncMock()
+
+        result = await repo.bulk_create(rows)
+
+        assert len(result) == 3
+        session.execute.assert_called_once()
+        stmt, params = session.execute.call_args.args
+        assert str(stmt.compile(dialect=postgresql.dialect())).startswith("INSERT INTO reports")
+        assert params == [{"user_id": user_id, "subject": f"q{i}"} for i in range(3)]
+        session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_requires_primary_key(self):
+        """Test bulk_update rejects rows without the primary key"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+
+        with pytest.raises(ValueError, match="report_id"):
+            await repo.bulk_update([{"subject": "x"}])
+        session.execute.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_single_executemany(self):
+        """Test bulk_update sends all rows in one executemany UPDATE"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        rows = [{"report_id": uuid.uuid4(), "subject": f"q{i}"} for i in range(2)]
+        session.execute = AsyncMock()
+        session.commit = AsyncMock()
+
+        await repo.bulk_update(rows)
+
+        session.execute.assert_called_once()
+        assert session.execute.call_args.args[1] == rows
+        session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_copy_ingest_uses_copy_records(self):
+        """Test copy_ingest streams processed records through asyncpg COPY"""
+        from sqlalchemy.dialects.postgresql.asyncpg import dialect as asyncpg_dialect
+
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        user_id = uuid.uuid4()
+
+        driver = MagicMock()
+        driver.copy_records_to_table = AsyncMock(return_value="COPY 2")
+        raw = MagicMock(driver_connection=driver)
+        connection = MagicMock(dialect=asyncpg_dialect())
+        connection.get_raw_connection = AsyncMock(return_value=raw)
+        session.connection = AsyncMock(return_value=connection)
+        session.commit = AsyncMock()
+
+        count = await repo.copy_ingest(
+            [
+                {"user_id": user_id, "subject": "a", "content": {"k": 1}},
+                {"user_id": user_id, "subject": "b", "content": {"k": 2}},
+            ]
+        )
+
+        assert count == 2
+        args, kwargs = driver.copy_records_to_table.call_args
+        assert args == ("reports",)
+        columns = kwargs["columns"]
+        assert columns[:3] == ["user_id", "subject", "content"]
+        assert "report_id" in columns and "expires_at" in columns
+        first = dict(zip(columns, kwargs["records"][0]))
+        assert first["content"] == '{"k": 1}'
+        assert isinstance(first["report_id"], uuid.UUID)
+        session.commit.assert_called_once()
+
+
+def create_uow_adapter():
+    """Create a real PostgreSQLAdapter whose session maker returns a mock session"""
+    adapter = PostgreSQLAdapter("postgresql+asyncpg://localhost/test")
+    session = AsyncMock()
+    session.add = MagicMock()
+    adapter.session_maker = MagicMock(return_value=session)
+    return adapter, session
+
+
+class TestUnitOfWork:
+    """Tests for UnitOfWork"""
+
+    @pytest.mark.asyncio
+    async def test_repositories_share_session_and_commit_once(self):
+        """Test repositories in a unit of work share one session and one commit"""
+        adapter, session = create_uow_adapter()
+
+        async with adapter.unit_of_work() as uow:
+            await uow.reports.create({"user_id": uuid.uuid4(), "subject": "q"})
+            await uow.payments.create({"user_id": uuid.uuid4(), "amount_gbp": 2.99})
+            shared = await adapter.get_session()
+            assert isinstance(shared, UnitOfWorkSession)
+            session.commit.assert_not_called()
+
+        adapter.session_maker.assert_called_once()
+        assert session.add.call_count == 2
+        assert session.flush.call_count == 2
+        session.commit.assert_called_once()
+        session.rollback.assert_not_called()
+        session.close.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_rolls_back_on_error(self):
+        """Test an exception rolls back and unbinds the shared session"""
+        adapter, session = create_uow_adapter()
+
+        with pytest.raises(RuntimeError, match="boom"):
+            async with adapter.unit_of_work() as uow:
+                await uow.users.create({"clerk_user_id": "u", "email": "a@b.c"})
+                raise RuntimeError("boom")
+
+        session.commit.assert_not_called()
+        session.rollback.assert_called_once()
+        session.close.assert_called_once()
+        assert await adapter.get_session() is session
+
+    @pytest.mark.asyncio
+    async def test_savepoint_uses_nested_transaction(self):
+        """Test savepoint() wraps the block in begin_nested()"""
+        adapter, session = create_uow_adapter()
+        nested = AsyncMock()
+        session.begin_nested = MagicMock(return_value=nested)
+
+        async with adapter.unit_of_work() as uow:
+            async with uow.savepoint():
+                pass
+
+        session.begin_nested.assert_called_once()
+        nested.__aenter__.assert_called_once()
+        nested.__aexit__.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_nested_unit_of_work_rejected(self):
+        """Test a second unit of work on the same adapter is rejected"""
+        adapter, session = create_uow_adapter()
+
+        async with adapter.unit_of_work():
+            with pytest.raises(RuntimeError, match="already active"):
+                async with adapter.unit_of_work():
+                    pass
+
+
+class TestReadReplicas:
+    """Tests for read-replica routing"""
+
+    def create_replica_adapter(self):
+        adapter = PostgreSQLAdapter(
+            "postgresql+asyncpg://localhost/test",
+            replica_urls=["postgresql+asyncpg://replica-1/test", "postgresql+asyncpg://replica-2/test"],
+            max_replica_lag_seconds=5.0,
+        )
+        # Skip the background lag check
+        adapter.replicas._last_check = time.monotonic()
+        return adapter
+
+    @pytest.mark.asyncio
+    async def test_reads_round_robin_across_replicas(self):
+        """Test read sessions alternate between healthy replicas"""
+        adapter = self.create_replica_adapter()
+
+        hosts = []
+        for _ in range(4):
+            session = await adapter.get_read_session()
+            hosts.append(session.bind.url.host)
+
+        assert hosts == ["replica-1", "replica-2", "replica-1", "replica-2"]
+
+    @pytest.mark.asyncio
+    async def test_reads_stick_to_primary_after_write(self):
+        """Test reads go to the primary after the request wrote (read-your-writes)"""
+        adapter = self.create_replica_adapter()
+
+        assert (await adapter.get_read_session()).bind is not adapter.engine
+        await adapter.get_session()
+        assert (await adapter.get_read_session()).bind is adapter.engine
+
+    @pytest.mark.asyncio
+    async def test_reads_fall_back_to_primary_when_all_ejected(self):
+        """Test reads use the primary when no replica is healthy"""
+        adapter = self.create_replica_adapter()
+        for replica in adapter.replicas.replicas:
+            replica.healthy = False
+
+        assert (await adapter.get_read_session()).bind is adapter.engine
+
+    def test_replicas_instrumented_like_primary(self):
+        """Test replica engines get query timing and pool telemetry"""
+        adapter = self.create_replica_adapter()
+
+        for replica in adapter.replicas.replicas:
+            assert replica.engine.sync_engine in _instrumented
+            assert replica.engine.sync_engine.pool.telemetry is replica.telemetry
+            assert replica.telemetry.stats().size == 20
+
+    @pytest.mark.asyncio
+    async def test_lagging_replica_is_ejected_and_readmitted(self):
+        """Test lag checks eject replicas over the threshold and re-admit them"""
+        adapter = self.create_replica_adapter()
+        replica_set = adapter.replicas
+        replica = replica_set.replicas[0]
+
+        def connect_returning(lag):
+            conn = AsyncMock()
+            result = MagicMock()
+            result.scalar_one.return_value = lag
+            conn.execute = AsyncMock(return_value=result)
+            cm = AsyncMock()
+            cm.__aenter__.return_value = conn
+            return MagicMock(return_value=cm)
+
+        with patch.object(type(replica.engine), "connect", connect_returning(12.0)):
+            await replica_set._check_replica(replica)
+        assert replica.healthy is False
+        assert replica.lag_seconds == 12.0
+
+        with patch.object(type(replica.engine), "connect", connect_returning(0)):
+            await replica_set._check_replica(replica)
+        assert replica.healthy is True
+
+    @pytest.mark.asyncio
+    async def test_unreachable_replica_is_ejected(self):
+        """Test a replica whose lag query fails is ejected"""
+        adapter = self.create_replica_adapter()
+        replica_set = adapter.replicas
+        replica = replica_set.replicas[1]
+
+        with patch.object(
+            type(replica.engine), "connect", MagicMock(side_effect=OSError("refused"))
+        ):
+            await replica_set._check_replica(replica)
+
+        assert replica.healthy is False
+        assert replica.lag_seconds is None
+
+
+class TestIdentityMap:
+    """Tests for the request-scoped identity map"""
+
+    def mock_found(self, session, entity):
+        mock_result = MagicMock()
+        mock_result.scalar_one_or_none.return_value = entity
+        mock_result.scalars.return_value.all.return_value = []
+        session.execute = AsyncMock(return_value=mock_result)
+
+    @pytest.mark.asyncio
+    async def test_repeated_find_by_id_hits_cache(self):
+        """Test a second lookup of the same row in a request skips the query"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        report = MagicMock(spec=Report)
+        self.mock_found(session, report)
+
+        with identity_map() as entities:
+            assert await repo.find_by_id("rep_1") is report
+            assert await ReportRepository(adapter).find_by_id("rep_1") is report
+
+        assert session.execute.call_count == 1
+        assert entities.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_no_caching_outside_a_request(self):
+        """Test lookups are not cached without an enclosing identity_map()"""
+        adapter, session = create_mock_adapter()
+        repo = UserRepository(adapter)
+        self.mock_found(session, MagicMock(spec=User))
+
+        await repo.find_by_id("user_1")
+        await repo.find_by_id("user_1")
+
+        assert session.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_include_deleted_cached_separately(self):
+        """Test a lookup including soft-deleted rows does not answer one excluding them"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        self.mock_found(session, MagicMock(spec=Report))
+
+        with identity_map():
+            await repo.find_by_id("rep_1", include_deleted=True)
+            await repo.find_by_id("rep_1")
+
+        assert session.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_misses_are_not_cached(self):
+        """Test a row that was not found is looked up again"""
+        adapter, session = create_mock_adapter()
+        repo = PaymentRepository(adapter)
+        self.mock_found(session, None)
+
+        with identity_map():
+            await repo.find_by_id("pay_1")
+            await repo.find_by_id("pay_1")
+
+        assert session.execute.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_update_invalidates_row(self):
+        """Test a write through the repository forces the next lookup to query"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        self.mock_found(session, MagicMock(spec=Report))
+
+        with identity_map() as entities:
+            await repo.find_by_id("rep_1")
+            await repo.find_by_id("rep_2")
+            await repo.update("rep_1", {"subject": "changed"})
+            await repo.find_by_id("rep_1")
+            await repo.find_by_id("rep_2")
+
+        # two loads, one UPDATE, one reload of rep_1; rep_2 stays cached
+        assert session.execute.call_count == 4
+        assert entities.hits == 1
+
+    @pytest.mark.asyncio
+    async def test_bulk_write_invalidates_model(self):
+        """Test a predicate-based bulk write drops every cached row of the model"""
+        adapter, session = create_mock_adapter()
+        repo = ReportRepository(adapter)
+        self.mock_found(session, MagicMock(spec=Report))
+        user = MagicMock(spec=User)
+
+        with identity_map() as entities:
+            await repo.find_by_id("rep_1")
+            entities.add(User, "user_1", False, user)
+            await repo.expire_old_reports()
+
+            assert entities.get(Report, "rep_1", False) is None
+            assert entities.get(User, "user_1", False) is user
+
+    @pytest.mark.asyncio
+    async def test_map_stops_serving_after_block(self):
+        """Test a task that outlives the request does not keep using its map"""
+        with identity_map() as entities:
+            assert current_identity_map() is entities
+
+        assert entities.closed
+        assert current_identity_map() is None
+
+    @pytest.mark.asyncio
+    async def test_unit_of_work_rollback_clears_map(self):
+        """Test entities read in a rolled-back unit of work are forgotten"""
+        adapter, _ = create_uow_adapter()
+
+        with identity_map() as entities:
+            entities.add(Report, "rep_1", False, MagicMock(spec=Report))
+            with pytest.raises(RuntimeError):
+                async with adapter.unit_of_work():
+                    raise RuntimeError("boom")
+
+            assert len(entities) == 0
@@ -0,0 +1,259 @@
+"""
+Tests for the Request Context Middleware
+
+Drives RequestContextMiddleware and RateLimitMiddleware around small
+Starlette apps: correlation/request IDs, rate limiting, error handling
+and streaming pass-through.
+"""
+
+import asyncio
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from starlette.routing import Route
+
+from logging_lib.correlation import current_correlation_id
+from src.middleware.rate_limiter import RateLimiter, RateLimitMiddleware, RoutePolicy
+from src.middleware.request_context import RequestContextMiddleware
+
+
+async def echo_correlation(request):
+    return JSONResponse({"correlation_id": current_correlation_id()})
+
+
+async def fail(request):
+    raise RuntimeError("boom")
+
+
+async def stream(request):
+    async def chunks():
+        for n in range(3):
+            yield f"data: {n}\n\n"
+            await asyncio.sleep(0)
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+def make_app(middleware=()):
+    return Starlette(
+        middleware=list(middleware),
+        routes=[
+            Route("/echo", echo_correlation),
+            Route("/fail", fail),
+            Route("/stream", stream),
+            Route("/health", lambda request: PlainTextResponse("ok")),
+            Route("/reports/initiate", echo_correlation, methods=["POST"]),
+            Route("/stream/reports/1", stream),
+        ]
+    )
+
+
+def make_client(rate_limiter=None):
+    """App with the middleware installed as main.py does (inside Starlette's error handler)"""
+    app = make_app([Middleware(RequestContextMiddleware, rate_limiter=rate_limiter)])
+    return TestClient(app, raise_server_exceptions=False)
+
+
+class TestRequestContextMiddleware:
+    """Test suite for RequestContextMiddleware"""
+
+    def test_generates_ids(self):
+        """Test a request without X-Correlation-ID uses its request ID for both"""
+        response = make_client().get("/echo")
+
+        request_id = response.headers["X-Request-ID"]
+        assert response.headers["X-Correlation-ID"] == request_id
+        assert response.json() == {"correlation_id": request_id}
+
+    def test_propagates_correlation_id(self):
+        """Test an incoming correlation ID is bound for the app and echoed back"""
+        response = make_client().get("/echo", headers={"X-Correlation-ID": "trace-123"})
+
+        assert response.headers["X-Correlation-ID"] == "trace-123"
+        assert response.headers["X-Request-ID"] != "trace-123"
+        assert response.json() == {"correlation_id": "trace-123"}
+
+    def test_unhandled_error_returns_500_with_correlation_id(self):
+        """Test exceptions become a JSON 500 carrying the correlation ID"""
+        response = make_client().get("/fail", headers={"X-Correlation-ID": "trace-500"})
+
+        assert response.status_code == 500
+        assert response.json()["correlation_id"] == "trace-500"
+        assert response.json()["message"] == "boom"
+        assert response.headers["X-Correlation-ID"] == "trace-500"
+
+    def test_streams_pass_through(self):
+        """Test streamed chunks arrive unchanged, with the context headers"""
+        with make_client().stream("GET", "/stream") as response:
+            chunks = list(response.iter_text())
+
+        assert "".join(chunks) == "data: 0\n\ndata: 1\n\ndata: 2\n\n"
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert "X-Request-ID" in response.headers
+
+    def test_rate_limit_headers_and_429(self):
+        """Test allowed requests carry X-RateLimit-*; the first over the limit gets 429"""
+        client = make_client(RateLimiter(requests_per_minute=2))
+
+        first = client.get("/echo")
+        client.get("/echo")
+        rejected = client.get("/echo", headers={"X-Correlation-ID": "trace-429"})
+
+        assert first.headers["X-RateLimit-Limit"] == "2"
+        assert first.headers["X-RateLimit-Remaining"] == "1"
+        assert rejected.status_code == 429
+        assert rejected.json()["error"] == "Rate limit exceeded"
+        assert int(rejected.headers["Retry-After"]) >= 1
+        assert rejected.headers["X-Correlation-ID"] == "trace-429"
+
+    def test_exempt_paths_not_limited(self):
+        """Test health checks bypass the limiter"""
+        client = make_client(RateLimiter(requests_per_minute=1))
+
+        assert [client.get("/health").status_code for _ in range(3)] == [200, 200, 200]
+        assert "X-RateLimit-Limit" not in client.get("/health").headers
+
+    def test_limits_by_user_header(self):
+        """Test X-User-ID identifies the caller instead of the client IP"""
+        client = make_client(RateLimiter(requests_per_minute=1))
+
+        assert client.get("/echo", headers={"X-User-ID": "a"}).status_code == 200
+        assert client.get("/echo", headers={"X-User-ID": "b"}).status_code == 200
+        assert client.get("/echo", headers={"X-User-ID": "a"}).status_code == 429
+
+
+class TestRateLimitMiddleware:
+    """Test suite for the standalone pure ASGI RateLimitMiddleware"""
+
+    def test_standalone(self):
+        """Test the standalone middleware applies the same limiter"""
+        client = TestClient(RateLimitMiddleware(make_app(), requests_per_minute=1))
+
+        assert client.get("/echo").headers["X-RateLimit-Remaining"] == "0"
+        response = client.get("/echo")
+        assert response.status_code == 429
+        assert response.json()["limit"] == 1
+
+    @pytest.mark.asyncio
+    async def test_non_http_scopes_pass_through(self):
+        """Test lifespan and websocket scopes are not touched"""
+        seen = []
+
+        async def app(scope, receive, send):
+            seen.append(scope["type"])
+
+        await RateLimitMiddleware(app)({"type": "lifespan"}, None, None)
+        await RequestContextMiddleware(app)({"type": "lifespan"}, None, None)
+
+        assert seen == ["lifespan", "lifespan"]
+
+
+class TestRoutePolicies:
+    """Test suite for per-route costs and bucket groups"""
+
+    @pytest.mark.asyncio
+    async def test_expensive_route_costs_more(self):
+        """Test POST /reports/initiate is charged its cost; other routes one token"""
+        limiter = RateLimiter(requests_per_minute=20)
+
+        initiate = await limiter.check("user:a", "/reports/initiate", "POST")
+        listing = await limiter.check("user:a", "/reports/", "GET")
+
+        assert initiate.remaining == 10
+        assert listing.remaining == 9
+        assert not (await limiter.check("user:a", "/reports/initiate", "POST")).allowed
+
+    @pytest.mark.asyncio
+    async def test_streams_use_own_bucket(self):
+        """Test stream connections neither spend nor are blocked by the API bucket"""
+        limiter = RateLimiter(requests_per_minute=1, stream_requests_per_minute=2)
+
+        assert (await limiter.check("user:a", "/reports/", "GET")).allowed
+        streams = [await limiter.check("user:a", "/stream/reports/1", "GET") for _ in range(3)]
+
+        assert [d.allowed for d in streams] == [True, True, False]
+        assert streams[0].limit == 2
+
+    @pytest.mark.asyncio
+    async def test_cost_capped_at_bucket_size(self):
+        """Test a cost above the limit is charged as the whole bucket, not refused forever"""
+        limiter = RateLimiter(
+            requests_per_minute=5, policies=[RoutePolicy("POST", "/reports/initiate", cost=10)]
+        )
+
+        assert (await limiter.check("user:a", "/reports/initiate", "POST")).allowed
+        assert not (await limiter.check("user:a", "/reports/", "GET")).allowed
+
+    def test_headers_report_bucket_limit(self):
+        """Test X-RateLimit-Limit reflects the bucket group of the route"""
+        client = make_client(RateLimiter(requests_per_minute=50, stream_requests_per_minute=5))
+
+        with client.stream("GET", "/stream/reports/1") as response:
+            assert response.headers["X-RateLimit-Limit"] == "5"
+        assert client.post("/reports/initiate").headers["X-RateLimit-Remaining"] == "40"
+
+
+class TestDelayMode:
+    """Test suite for holding bursts instead of rejecting them"""
+
+    @staticmethod
+    def drained_limiter(requests_per_minute, **kwargs):
+        """Limiter whose POST /drain empties the caller's bucket"""
+        return RateLimiter(
+            requests_per_minute=requests_per_minute,
+            policies=[RoutePolicy("POST", "/drain", cost=requests_per_minute)],
+            **kwargs,
+        )
+
+    @pytest.mark.asyncio
+    async def test_burst_held_until_tokens_refill(self):
+        """Test requests just over the limit are delayed and then allowed"""
+        limiter = self.drained_limiter(1200, max_delay_seconds=0.5)
+        await limiter.check("user:a", "/drain", "POST")
+
+        start = time.monotonic()
+        decisions = await asyncio.gather(*[limiter.check("user:a", "/echo") for _ in range(3)])
+
+        assert all(d.allowed for d in decisions)
+        # 20 tokens/s: the third waits for three refills
+        assert time.monotonic() - start >= 0.1
+        assert limiter._queued == {}
+
+    @pytest.mark.asyncio
+    async def test_rejects_past_max_delay(self):
+        """Test a request whose tokens take longer than the bound is rejected at once"""
+        limiter = self.drained_limiter(60, max_delay_seconds=0.2)
+        await limiter.check("user:a", "/drain", "POST")
+
+        start = time.monotonic()
+        decision = await limiter.check("user:a", "/echo")
+
+        assert not decision.allowed
+        assert decision.retry_after >= 1
+        assert time.monotonic() - start < 0.1
+
+    @pytest.mark.asyncio
+    async def test_queue_capped_per_identifier(self):
+        """Test requests beyond max_queued are rejected; other users are unaffected"""
+        limiter = self.drained_limiter(1200, max_delay_seconds=1.0, max_queued=2)
+        await limiter.check("user:a", "/drain", "POST")
+
+        decisions = await asyncio.gather(
+            *[limiter.check("user:a", "/echo") for _ in range(4)],
+            limiter.check("user:b", "/echo"),
+        )
+
+        assert [d.allowed for d in decisions] == [True, True, False, False, True]
+
+    def test_middleware_delay_mode(self):
+        """Test the standalone middleware passes delay settings to its limiter"""
+        client = TestClient(
+            RateLimitMiddleware(make_app(), requests_per_minute=1200, max_delay_seconds=0.5)
+        )
+
+        assert client.app.limiter.max_delay_seconds == 0.5
+        assert client.get("/echo").status_code == 200
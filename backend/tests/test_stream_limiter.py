@@ -0,0 +1,222 @@
+"""
+Tests for the Stream Concurrency Limiter
+
+StreamLimiter slot accounting, and the stream route taking a slot per
+authenticated user and releasing it however the stream ends.
+"""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+import structlog
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import ClientDisconnect
+
+from api.services.auth_service import get_current_user_id
+from dependencies import get_db, get_request_logger
+from src.api.routes import stream
+from src.api.routes.health import check_streams_health
+from src.middleware.stream_limiter import SERVER_SCOPE, USER_SCOPE, StreamLimiter, StreamSlot
+
+
+async def chunks(report_id, query):
+    for n in range(3):
+        yield f'{{"type": "section", "n": {n}}}'
+
+
+def make_client(stream_limiter, user_id="user_1"):
+    app = FastAPI()
+    app.include_router(stream.router)
+    app.state.stream_limiter = stream_limiter
+    app.dependency_overrides[get_current_user_id] = lambda: user_id
+    app.dependency_overrides[get_db] = lambda: None
+    app.dependency_overrides[get_request_logger] = lambda: structlog.get_logger()
+    return TestClient(app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def report_state():
+    """Stream route collaborators: a pending report and a three-section stream"""
+    with patch.object(stream, "get_report_state", new_callable=AsyncMock) as state, \
+         patch.object(stream, "update_report_status", new_callable=AsyncMock), \
+         patch.object(stream, "generate_report_stream", chunks):
+        state.return_value = {"user_id": "user_1", "status": "pending", "query": "q"}
+        yield state
+
+
+class TestStreamLimiter:
+    """Test suite for StreamLimiter"""
+
+    def test_per_user_cap(self):
+        """Test a user over their cap is refused while others still get slots"""
+        limiter = StreamLimiter(max_per_user=2, max_concurrent=10)
+
+        results = [limiter.acquire("user:a") for _ in range(3)]
+
+        assert results == [None, None, USER_SCOPE]
+        assert limiter.acquire("user:b") is None
+        assert limiter.active("user:a") == 2
+        assert limiter.active() == 3
+
+    def test_server_cap(self):
+        """Test the worker-wide cap applies across users"""
+        limiter = StreamLimiter(max_per_user=5, max_concurrent=2)
+
+        assert limiter.acquire("user:a") is None
+        assert limiter.acquire("user:b") is None
+        assert limiter.acquire("user:c") == SERVER_SCOPE
+
+    def test_release_frees_slot(self):
+        """Test released slots are reusable and idle users are forgotten"""
+        limiter = StreamLimiter(max_per_user=1)
+        limiter.acquire("user:a")
+
+        limiter.release("user:a")
+        limiter.release("user:a")
+
+        assert limiter.active() == 0
+        assert limiter._active == {}
+        assert limiter.acquire("user:a") is None
+
+    def test_stats(self):
+        """Test gauges report current, peak and rejected streams"""
+        limiter = StreamLimiter(max_per_user=1, max_concurrent=4)
+        limiter.acquire("user:a")
+        limiter.acquire("user:a")
+        limiter.acquire("user:b")
+        limiter.release("user:b")
+
+        stats = limiter.stats()
+
+        assert stats.active == 1
+        assert stats.active_users == 1
+        assert stats.utilization == 0.25
+        assert stats.peak == 2
+        assert stats.started == 2
+        assert stats.rejected_user == 1
+        assert stats.to_dict()["rejected_server"] == 0
+
+    def test_exceeded_detail(self):
+        """Test the 429 detail names the cap that was hit"""
+        body = StreamLimiter(max_per_user=3).exceeded_detail(USER_SCOPE)
+
+        assert body["scope"] == "user"
+        assert body["limit"] == 3
+        assert body["retry_after"] == 10
+
+
+class TestStreamSlot:
+    """Test suite for stream slots taken by the stream route"""
+
+    def test_rejects_over_cap_with_retry_after(self, report_state):
+        """Test a stream over the user's cap gets a 429 before the report is read"""
+        limiter = StreamLimiter(max_per_user=1)
+        limiter.acquire("user:user_1")
+
+        response = make_client(limiter).get("/stream/reports/r1")
+
+        assert response.status_code == 429
+        assert response.json()["detail"]["scope"] == "user"
+        assert response.headers["Retry-After"] == "10"
+        report_state.assert_not_called()
+
+    def test_keyed_by_authenticated_user(self, report_state):
+        """Test X-User-ID does not change whose slots a stream takes"""
+        limiter = StreamLimiter(max_per_user=1)
+        limiter.acquire("user:user_1")
+        client = make_client(limiter)
+
+        response = client.get("/stream/reports/r1", headers={"X-User-ID": "someone_else"})
+
+        assert response.status_code == 429
+        assert limiter.active("user:someone_else") == 0
+
+    def test_releases_when_stream_ends(self, report_state):
+        """Test the slot is freed once a stream completes"""
+        limiter = StreamLimiter(max_per_user=1)
+        client = make_client(limiter)
+
+        with client.stream("GET", "/stream/reports/r1") as response:
+            body = "".join(response.iter_text())
+
+        assert body.count('"type": "section"') == 3
+        assert '"type": "complete"' in body
+        assert limiter.stats().peak == 1
+        assert limiter.active() == 0
+        assert client.get("/stream/reports/r1").status_code == 200
+
+    def test_releases_when_no_stream_started(self, report_state):
+        """Test a missing report or failed setup frees the slot"""
+        limiter = StreamLimiter(max_per_user=1)
+        client = make_client(limiter)
+
+        report_state.return_value = None
+        assert client.get("/stream/reports/r1").status_code == 404
+        report_state.side_effect = RuntimeError("db down")
+        assert client.get("/stream/reports/r1").status_code == 500
+
+        assert limiter.active() == 0
+        assert limiter.stats().started == 2
+
+    @pytest.mark.asyncio
+    async def test_releases_on_disconnect_before_first_chunk(self):
+        """Test a generator that never starts still frees the slot"""
+        limiter = StreamLimiter(max_per_user=1)
+        limiter.acquire("user:user_1")
+        started = []
+
+        async def body():
+            started.append(True)
+            yield "data: 0\n\n"
+
+        async def send(message):
+            raise OSError("client gone")
+
+        response = stream.SlotStreamingResponse(
+            body(), slot=StreamSlot(limiter, "user:user_1")
+        )
+        scope = {"type": "http", "asgi": {"spec_version": "2.4"}}
+        with pytest.raises(ClientDisconnect):
+            await response(scope, None, send)
+
+        assert not started
+        assert limiter.active() == 0
+
+    def test_slot_released_once(self):
+        """Test releasing a slot twice frees only one stream"""
+        limiter = StreamLimiter(max_per_user=2)
+        limiter.acquire("user:a")
+        limiter.acquire("user:a")
+        slot = StreamSlot(limiter, "user:a")
+
+        slot.release()
+        slot.release()
+
+        assert limiter.active("user:a") == 1
+
+
+class TestCheckStreamsHealth:
+    """Test suite for check_streams_health function"""
+
+    def test_streams_disabled(self):
+        """Test no limiter reports disabled"""
+        assert check_streams_health(None).status == "disabled"
+
+    def test_streams_up(self):
+        """Test gauges are reported in details"""
+        limiter = StreamLimiter(max_concurrent=10)
+        limiter.acquire("user:a")
+
+        result = check_streams_health(limiter)
+
+        assert result.status == "up"
+        assert result.details["active"] == 1
+
+    def test_streams_near_capacity_degraded(self):
+        """Test a worker near its stream cap reports degraded"""
+        limiter = StreamLimiter(max_per_user=10, max_concurrent=10)
+        for _ in range(9):
+            limiter.acquire("user:a")
+
+        assert check_streams_health(limiter).status == "degraded"
@@ -47,6 +47,7 @@ class TestExpireOldReports:
 
         mock_adapter = MagicMock()
         mock_adapter.get_session = AsyncMock(return_value=mock_context_manager)
+        mock_adapter.get_read_session = mock_adapter.get_session
 
         repo = ReportRepository(mock_adapter)
 
@@ -77,6 +78,7 @@ class TestExpireOldReports:
 
         mock_adapter = MagicMock()
         mock_adapter.get_session = AsyncMock(return_value=mock_context_manager)
+        mock_adapter.get_read_session = mock_adapter.get_session
 
         repo = ReportRepository(mock_adapter)
 
@@ -108,6 +110,7 @@ class TestExpireOldReports:
 
         mock_adapter = MagicMock()
         mock_adapter.get_session = AsyncMock(return_value=mock_context_manager)
+        mock_adapter.get_read_session = mock_adapter.get_session
 
         repo = ReportRepository(mock_adapter)
 
@@ -147,6 +150,7 @@ class TestDeleteExpiredReports:
 
         mock_adapter = MagicMock()
         mock_adapter.get_session = AsyncMock(return_value=mock_context_manager)
+        mock_adapter.get_read_session = mock_adapter.get_session
 
         repo = ReportRepository(mock_adapter)
 
@@ -181,6 +185,7 @@ class TestDeleteExpiredReports:
 
         mock_adapter = MagicMock()
         mock_adapter.get_session = AsyncMock(return_value=mock_context_manager)
+        mock_adapter.get_read_session = mock_adapter.get_session
 
         repo = ReportRepository(mock_adapter)
 
@@ -315,17 +320,12 @@ class TestGDPRCompliance:
 
         report_id = str(uuid.uuid4())
 
-        # Mock finding report
-        mock_report = Mock()
-        mock_report.id = report_id
-
-        # Mock result using scalar_one_or_none() pattern (used by find_by_id)
-        mock_find_result = Mock()
-        mock_find_result.scalar_one_or_none.return_value = mock_report
+        # DELETE ... RETURNING yields the deleted primary key
+        mock_delete_result = Mock()
+        mock_delete_result.scalar_one_or_none.return_value = report_id
 
         mock_session = AsyncMock()
-        mock_session.execute = AsyncMock(return_value=mock_find_result)
-        mock_session.delete = AsyncMock()
+        mock_session.execute = AsyncMock(return_value=mock_delete_result)
         mock_session.commit = AsyncMock()
 
         mock_context_manager = AsyncMock()
@@ -334,6 +334,7 @@ class TestGDPRCompliance:
 
         mock_adapter = MagicMock()
         mock_adapter.get_session = AsyncMock(return_value=mock_context_manager)
+        mock_adapter.get_read_session = mock_adapter.get_session
 
         repo = ReportRepository(mock_adapter)
 
@@ -341,7 +342,9 @@ class TestGDPRCompliance:
         deleted = await repo.hard_delete(report_id)
 
         assert deleted is True
-        mock_session.delete.assert_called_once_with(mock_report)
+        statement = mock_session.execute.call_args.args[0]
+        assert str(statement).startswith("DELETE FROM reports")
+        mock_session.commit.assert_called_once()
 
 
 class TestDataRetentionLifecycle:
@@ -382,6 +385,7 @@ class TestDataRetentionLifecycle:
 
         mock_adapter = MagicMock()
         mock_adapter.get_session = AsyncMock(return_value=mock_context_manager)
+        mock_adapter.get_read_session = mock_adapter.get_session
 
         repo = ReportRepository(mock_adapter)
 
@@ -1,7 +1,8 @@
 """
 Database connection and session management
 """
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 import logging
@@ -13,14 +14,27 @@ database_url = settings.DATABASE_URL
 if database_url.startswith("postgresql://"):
     database_url = database_url.replace("postgresql://", "postgresql+asyncpg://", 1)
 
-# Create async engine
-engine = create_async_engine(
-    database_url,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
-)
+# Process-wide engines keyed by URL and pool settings, so every caller
+# shares one pool instead of opening its own
+_engines: dict[tuple, AsyncEngine] = {}
+
+
+def get_engine(url: str = database_url, **options) -> AsyncEngine:
+    """Get the shared engine for a URL and engine options, creating it on first use"""
+    options = {
+        "echo": settings.DEBUG,
+        "pool_pre_ping": True,
+        "pool_size": 10,
+        "max_overflow": 20,
+        **options,
+    }
+    key = (url, tuple(sorted(options.items())))
+    if key not in _engines:
+        _engines[key] = create_async_engine(url, **options)
+    return _engines[key]
+
+
+engine = get_engine()
 
 # Create async session factory
 AsyncSessionLocal = async_sessionmaker(
@@ -63,7 +77,30 @@ async def init_db():
     logger.info("Database initialized")
 
 
+async def warm_up_db(min_size: int = 2) -> int:
+    """
+    Open `min_size` connections at startup and return them to the pool,
+    so the first requests after a cold start skip the TLS/auth handshake.
+    Failures are logged, not raised.
+    """
+    results = await asyncio.gather(
+        *(engine.connect() for _ in range(min_size)), return_exceptions=True
+    )
+    opened = 0
+    for conn in results:
+        if isinstance(conn, BaseException):
+            logger.warning(f"Database warm-up connection failed: {conn}")
+            continue
+        opened += 1
+        await conn.close()
+    logger.info(f"Database pool warmed with {opened} connections")
+    return opened
+
+
 async def close_db():
     """Close database connections"""
-    await engine.dispose()
+    engines = list(_engines.values())
+    _engines.clear()
+    for shared_engine in engines:
+        await shared_engine.dispose()
     logger.info("Database connections closed")